@@ -0,0 +1,256 @@
+"""
+Batch mutations.
+
+A batch is an ordered list of operations mirroring the write routes. It is
+split into waves of operations on unrelated paths: the operations of a wave
+run concurrently on worker threads, and waves run one after another, so an
+operation always sees the effects of earlier operations on the same path.
+An atomic batch holds the locks of all its paths from its first wave until
+it commits or rolls back, so no other write lands in between. It stops after
+the first wave with a failure and undoes every applied operation, newest
+first; an undo skips a file that was changed outside the API since, and logs
+the conflict.
+"""
+import logging
+import os
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import anyio
+from fastapi import HTTPException, status
+
+from app.index import VaultIndex, get_vault_index
+from app.locks import get_path_locks
+from app.models import (
+    BatchOperation,
+    BatchOperationResult,
+    BatchResponse,
+    CreateFileOperation,
+    MergeFrontmatterOperation,
+    MoveOperation,
+    PutBodyOperation,
+)
+from app.path_validation import (
+    validate_destination_path,
+    validate_existing_folder,
+    validate_existing_markdown_file,
+    validate_new_markdown_file,
+)
+from app.utils import dump_markdown, get_vault_path, merge_frontmatter_text, read_text, replace_body_text, write_text
+from app.workers import run_in_worker
+
+logger = logging.getLogger(__name__)
+
+# Operations a batch keeps in flight at once.
+BATCH_WRITE_CONCURRENCY = 16
+
+@dataclass
+class AppliedOperation:
+    path: str
+    # Returns the stat of the file it restored, if it wrote one.
+    undo: Optional[Callable[[], Optional[os.stat_result]]] = field(default=None, repr=False)
+    # The file the operation wrote and its stat right after, which it must
+    # still have for the operation to be undone.
+    full_file_path: Optional[str] = None
+    written: Optional[os.stat_result] = None
+    # The full source and destination paths of a move.
+    moved: Optional[tuple[str, str]] = None
+
+def _operation_paths(operation: BatchOperation) -> list[str]:
+    paths = [operation.path]
+    if isinstance(operation, MoveOperation):
+        paths.append(operation.destination)
+    return [os.path.normpath(path) for path in paths]
+
+def _parents(path: str) -> list[str]:
+    parts = path.split(os.sep)
+    return [os.sep.join(parts[:i]) for i in range(1, len(parts))]
+
+def plan_waves(operations: list[BatchOperation]) -> list[list[int]]:
+    """Group operation positions into waves whose operations touch unrelated paths."""
+    waves: list[list[int]] = []
+    wave: list[int] = []
+    claimed: set[str] = set()
+    ancestors: set[str] = set()
+    for position, operation in enumerate(operations):
+        paths = _operation_paths(operation)
+        # Two paths are related if they are equal or one contains the other.
+        if any(path in claimed or path in ancestors or any(parent in claimed for parent in _parents(path)) for path in paths):
+            waves.append(wave)
+            wave, claimed, ancestors = [], set(), set()
+        wave.append(position)
+        for path in paths:
+            claimed.add(path)
+            ancestors.update(_parents(path))
+    if wave:
+        waves.append(wave)
+    return waves
+
+def _missing_folders(full_file_path: str) -> list[str]:
+    missing = []
+    folder = os.path.dirname(full_file_path)
+    while not os.path.exists(folder):
+        missing.append(folder)
+        folder = os.path.dirname(folder)
+    return missing
+
+def _unchanged(full_file_path: str, written: os.stat_result) -> bool:
+    try:
+        stats = os.stat(full_file_path)
+    except FileNotFoundError:
+        stats = None
+    if stats is not None and (stats.st_ino, stats.st_mtime_ns, stats.st_size) == (written.st_ino, written.st_mtime_ns, written.st_size):
+        return True
+    logger.warning("Not rolling back %s, which changed after the batch wrote it", full_file_path)
+    return False
+
+def _remove_folders(index: VaultIndex, folders: list[str]) -> None:
+    # Folders are listed deepest first, as _missing_folders returns them.
+    for folder in folders:
+        try:
+            os.rmdir(folder)
+        except OSError:
+            return
+        index.sync_path(folder)
+
+# Operations
+#
+# Each operation runs on a worker thread, applies itself to the disk and the
+# vault index, and returns how to undo itself.
+
+def _create(index: VaultIndex, operation: CreateFileOperation) -> AppliedOperation:
+    full_file_path = validate_new_markdown_file(operation.path)
+    created_folders = _missing_folders(full_file_path)
+    os.makedirs(os.path.dirname(full_file_path), exist_ok=True)
+    written = write_text(full_file_path, dump_markdown(operation.frontmatter, operation.body))
+    index.update_file(full_file_path)
+
+    def undo() -> None:
+        os.remove(full_file_path)
+        index.sync_path(full_file_path)
+        _remove_folders(index, created_folders)
+    return AppliedOperation(operation.path, undo, full_file_path, written)
+
+def _rewrite(index: VaultIndex, operation: BatchOperation, transform: Callable[[str], str]) -> AppliedOperation:
+    full_file_path = validate_existing_markdown_file(operation.path)
+    original = read_text(full_file_path)
+    written = write_text(full_file_path, transform(original))
+    index.update_file(full_file_path)
+
+    def undo() -> os.stat_result:
+        restored = write_text(full_file_path, original)
+        index.update_file(full_file_path)
+        return restored
+    return AppliedOperation(operation.path, undo, full_file_path, written)
+
+def _put_body(index: VaultIndex, operation: PutBodyOperation) -> AppliedOperation:
+    return _rewrite(index, operation, lambda content: replace_body_text(content, operation.body))
+
+def _merge_frontmatter(index: VaultIndex, operation: MergeFrontmatterOperation) -> AppliedOperation:
+    return _rewrite(index, operation, lambda content: merge_frontmatter_text(content, operation.frontmatter))
+
+def _move(index: VaultIndex, operation: MoveOperation) -> AppliedOperation:
+    if operation.path.endswith('.md'):
+        full_source_path = validate_existing_markdown_file(operation.path)
+    else:
+        full_source_path = validate_existing_folder(operation.path)
+    full_destination_path = validate_destination_path(operation.destination, operation.path)
+    created_folders = _missing_folders(full_destination_path)
+    os.makedirs(os.path.dirname(full_destination_path), exist_ok=True)
+    os.rename(full_source_path, full_destination_path)
+    index.move(full_source_path, full_destination_path)
+
+    def undo() -> None:
+        os.rename(full_destination_path, full_source_path)
+        index.move(full_destination_path, full_source_path)
+        _remove_folders(index, created_folders)
+    return AppliedOperation(operation.destination, undo, moved=(full_source_path, full_destination_path))
+
+OPERATIONS = {
+    "create": _create,
+    "put_body": _put_body,
+    "merge_frontmatter": _merge_frontmatter,
+    "move": _move,
+}
+
+def _failure(operation: BatchOperation, exc: Exception) -> BatchOperationResult:
+    # Mirrors the status codes of the single-file routes and app.main's handlers.
+    if isinstance(exc, HTTPException):
+        status_code, detail = exc.status_code, str(exc.detail)
+    elif isinstance(exc, FileNotFoundError):
+        status_code, detail = status.HTTP_404_NOT_FOUND, "Resource not found"
+    elif isinstance(exc, PermissionError):
+        status_code, detail = status.HTTP_403_FORBIDDEN, "Permission denied"
+    elif isinstance(exc, FileExistsError):
+        status_code, detail = status.HTTP_400_BAD_REQUEST, "Resource already exists"
+    elif isinstance(exc, (UnicodeDecodeError, ValueError)):
+        status_code, detail = status.HTTP_400_BAD_REQUEST, str(exc)
+    else:
+        logger.exception("Batch operation %s on %s failed", operation.op, operation.path)
+        status_code, detail = status.HTTP_500_INTERNAL_SERVER_ERROR, "Operation failed"
+    return BatchOperationResult(status=status_code, path=operation.path, detail=detail)
+
+def _rollback(applied: list[AppliedOperation]) -> None:
+    # The stat each written file must still have: that of the newest write to
+    # it, then that of each restore as the undos walk back.
+    expected = {operation.full_file_path: operation.written for operation in applied if operation.written is not None}
+    for operation in reversed(applied):
+        if operation.written is not None and not _unchanged(operation.full_file_path, expected[operation.full_file_path]):
+            continue
+        try:
+            restored = operation.undo()
+        except Exception:
+            logger.exception("Could not roll back batch operation on %s", operation.path)
+            continue
+        if restored is not None:
+            expected[operation.full_file_path] = restored
+        if operation.moved is not None:
+            # Files the batch wrote at or below the destination are back at the source.
+            source, destination = operation.moved
+            for full_file_path in [path for path in expected if path == destination or path.startswith(os.path.join(destination, ""))]:
+                expected[source + full_file_path[len(destination):]] = expected.pop(full_file_path)
+
+async def apply_batch(operations: list[BatchOperation], atomic: bool = False) -> BatchResponse:
+    index = await get_vault_index()
+    vault_path = get_vault_path()
+    limiter = anyio.CapacityLimiter(BATCH_WRITE_CONCURRENCY)
+    results: list[Optional[BatchOperationResult]] = [None] * len(operations)
+    applied: list[tuple[int, AppliedOperation]] = []
+
+    def full_paths(operation: BatchOperation) -> list[str]:
+        return [os.path.join(vault_path, path) for path in _operation_paths(operation)]
+
+    async def run(position: int) -> None:
+        operation = operations[position]
+        try:
+            # An atomic batch already holds the locks of all its paths.
+            async with limiter, nullcontext() if atomic else get_path_locks().hold(*full_paths(operation)):
+                done = await run_in_worker(OPERATIONS[operation.op], index, operation)
+        except Exception as exc:
+            results[position] = _failure(operation, exc)
+            return
+        applied.append((position, done))
+        results[position] = BatchOperationResult(status=status.HTTP_200_OK, path=done.path)
+
+    batch_paths = [full_path for operation in operations for full_path in full_paths(operation)] if atomic else []
+    async with get_path_locks().hold(*batch_paths):
+        for wave in plan_waves(operations):
+            async with anyio.create_task_group() as task_group:
+                for position in wave:
+                    task_group.start_soon(run, position)
+            if atomic and any(results[position].status != status.HTTP_200_OK for position in wave):
+                break
+
+        failed = any(result is not None and result.status != status.HTTP_200_OK for result in results)
+        if not (atomic and failed):
+            return BatchResponse(committed=True, results=results)
+
+        await run_in_worker(_rollback, [done for _, done in applied])
+
+    for position, _ in applied:
+        results[position] = BatchOperationResult(status=status.HTTP_424_FAILED_DEPENDENCY, path=operations[position].path, detail="Rolled back")
+    for position, result in enumerate(results):
+        if result is None:
+            results[position] = BatchOperationResult(status=status.HTTP_424_FAILED_DEPENDENCY, path=operations[position].path, detail="Not applied")
+    return BatchResponse(committed=False, results=results)
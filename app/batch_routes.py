@@ -0,0 +1,25 @@
+# Third-party imports
+from fastapi import APIRouter, Depends
+
+# Local application imports
+from app.authentication import ObsidianHTTPBearer
+from app.batch import apply_batch
+from app.models import BatchRequest, BatchResponse
+
+# Router setup
+obsidian_security = ObsidianHTTPBearer()
+batch_router = APIRouter(
+    prefix="/batch",
+    tags=["batch"],
+    dependencies=[Depends(obsidian_security)]
+)
+
+# Write operations
+@batch_router.post(
+    "/",
+    operation_id="applyBatch",
+    summary="Apply Batch",
+    description="Apply many create, put_body, merge_frontmatter and move operations in one request. Operations on unrelated paths run concurrently, while operations on the same file or folder run in request order. Each operation gets its own result with the status the matching single-file route would return. Set `atomic` to undo every applied operation if any of them fails."
+)
+async def post_batch(request_model: BatchRequest) -> BatchResponse:
+    return await apply_batch(request_model.operations, request_model.atomic)
@@ -0,0 +1,116 @@
+"""
+Byte-budgeted LRU cache of note content.
+
+Entries hold the raw text of a note and, once something asks for it, the
+parsed (body, frontmatter) pair. They are keyed by full path and validated
+against the (mtime, size) of a fresh os.stat, and the write routes and vault
+watcher invalidate them explicitly as well.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+@dataclass
+class CachedContent:
+    text: str
+    mtime_ns: int
+    size: int
+    body: Optional[str] = None
+    frontmatter: Optional[dict] = None
+    parsed: bool = False
+
+    @property
+    def cost(self) -> int:
+        # The parsed frontmatter is charged at the size of its YAML source.
+        cost = sys.getsizeof(self.text)
+        if self.parsed:
+            cost += sys.getsizeof(self.body) + len(self.text) - len(self.body)
+        return cost
+
+class ContentCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedContent] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, full_file_path: str, stats: os.stat_result) -> Optional[CachedContent]:
+        with self._lock:
+            content = self._entries.get(full_file_path)
+            if content is None or content.mtime_ns != stats.st_mtime_ns or content.size != stats.st_size:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(full_file_path)
+            self.hits += 1
+            return content
+
+    def put(self, full_file_path: str, stats: os.stat_result, text: str) -> CachedContent:
+        content = CachedContent(text=text, mtime_ns=stats.st_mtime_ns, size=stats.st_size)
+        self._store(full_file_path, content)
+        return content
+
+    def set_parsed(self, full_file_path: str, content: CachedContent, body: str, frontmatter_data: Optional[dict]) -> None:
+        with self._lock:
+            cached = self._entries.get(full_file_path) is content
+            previous_cost = content.cost
+            content.body, content.frontmatter, content.parsed = body, frontmatter_data, True
+            if cached:
+                self._bytes += content.cost - previous_cost
+                self._evict()
+
+    def invalidate(self, full_path: str) -> None:
+        # Invalidating a folder drops every note below it.
+        prefix = full_path.rstrip(os.sep) + os.sep
+        with self._lock:
+            for key in [key for key in self._entries if key == full_path or key.startswith(prefix)]:
+                self._bytes -= self._entries.pop(key).cost
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _store(self, full_file_path: str, content: CachedContent) -> None:
+        cost = content.cost
+        with self._lock:
+            previous = self._entries.pop(full_file_path, None)
+            if previous is not None:
+                self._bytes -= previous.cost
+            if cost > self.max_bytes:
+                return
+            self._entries[full_file_path] = content
+            self._bytes += cost
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.cost
+            self.evictions += 1
+
+_content_cache: Optional[ContentCache] = None
+
+def get_content_cache() -> ContentCache:
+    global _content_cache
+    if _content_cache is None:
+        _content_cache = ContentCache(int(os.getenv("OBSIDIAN_API_CACHE_BYTES", DEFAULT_CACHE_BYTES)))
+    return _content_cache
@@ -0,0 +1,70 @@
+# Standard library imports
+import asyncio
+import json
+from dataclasses import asdict
+# Third-party imports
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Annotated, AsyncIterator, Optional
+
+# Local application imports
+from app.authentication import ObsidianHTTPBearer
+from app.changes import Change, ChangeJournal
+from app.index import get_change_journal
+
+# Router setup
+obsidian_security = ObsidianHTTPBearer()
+change_router = APIRouter(
+    prefix="/changes",
+    tags=["changes"],
+    dependencies=[Depends(obsidian_security)]
+)
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+# Seconds between comments that keep an idle stream from timing out in proxies.
+KEEPALIVE_INTERVAL = 15.0
+
+def _event(change: Change) -> str:
+    return f"id: {change.seq}\nevent: {change.change}\ndata: {json.dumps(asdict(change))}\n\n"
+
+async def _change_events(journal: ChangeJournal, changes: list[Change], seq: int, follow: bool) -> AsyncIterator[str]:
+    while True:
+        for change in changes:
+            yield _event(change)
+        if not follow:
+            return
+        try:
+            await asyncio.wait_for(journal.wait(seq), KEEPALIVE_INTERVAL)
+        except TimeoutError:
+            yield ": keepalive\n\n"
+            changes = []
+            continue
+        update = journal.since(seq)
+        if update is None:
+            # The stream fell further behind than the journal reaches; the
+            # client's reconnect with Last-Event-ID gets a 410.
+            return
+        changes, seq = update
+
+# Read operations
+@change_router.get(
+    "/",
+    operation_id="streamChanges",
+    summary="Stream Changes",
+    description="Stream the notes and folders created, modified, moved or deleted in the vault as Server-Sent Events, whether through this API or by other apps. Each event carries a sequence number as its id. Pass `since`, or reconnect with `Last-Event-ID`, to replay the changes after a sequence number first; a 410 means the journal no longer reaches back that far, and the vault should be listed again. Pass `follow=false` to return the changes since the cursor and close, with the cursor to resume from in the `X-Last-Sequence` header."
+)
+async def stream_changes(
+    since: Annotated[Optional[int], Query(description="Sequence number of the last change seen. Omit to stream only changes made from now on.")] = None,
+    follow: Annotated[bool, Query(description="Keep the stream open and push changes as they happen")] = True,
+    last_event_id: Annotated[Optional[int], Header(description="Sent by EventSource clients when they reconnect; takes precedence over `since`")] = None
+) -> StreamingResponse:
+    journal = await get_change_journal()
+    update = journal.since(last_event_id if last_event_id is not None else since)
+    if update is None:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Changes since this sequence number are no longer journaled; list the vault again")
+    changes, seq = update
+    return StreamingResponse(
+        _change_events(journal, changes, seq, follow),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Last-Sequence": str(seq)}
+    )
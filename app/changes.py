@@ -0,0 +1,111 @@
+"""
+Journal of vault changes, streamed by the change feed.
+
+The vault index records every note it creates, modifies, moves or deletes and
+every folder it creates, moves or deletes, whether through the write routes
+or the watcher, as a change with a sequence number. The journal keeps the
+latest OBSIDIAN_API_CHANGE_JOURNAL_SIZE changes and is saved with the index
+snapshot, so a consumer that resumes after the last sequence number it saw
+replays only what changed since.
+
+Sequence numbers increase monotonically and are never below the current time
+in microseconds, so they are not reused after a restart, even one that lost
+the journal. A cursor older than what the journal still holds is refused, and
+the consumer re-lists the vault instead of silently missing changes.
+"""
+import asyncio
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+from app.models import ResourceType
+
+DEFAULT_CHANGE_JOURNAL_SIZE = 10000
+
+ChangeType = Literal["created", "modified", "moved", "deleted"]
+
+@dataclass(slots=True)
+class Change:
+    seq: int
+    change: ChangeType
+    type: ResourceType
+    path: str
+    previous_path: Optional[str] = None
+
+def get_change_journal_size() -> int:
+    return int(os.getenv("OBSIDIAN_API_CHANGE_JOURNAL_SIZE", DEFAULT_CHANGE_JOURNAL_SIZE))
+
+def _clock() -> int:
+    return time.time_ns() // 1000
+
+class ChangeJournal:
+    def __init__(self, max_changes: int):
+        self._changes: deque[Change] = deque(maxlen=max_changes)
+        self._lock = threading.Lock()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self.last_seq = _clock()
+        # The journal holds every change after this sequence number.
+        self.horizon = self.last_seq
+
+    def record(self, change: ChangeType, resource_type: ResourceType, path: str, previous_path: Optional[str] = None) -> Change:
+        with self._lock:
+            self.last_seq = max(self.last_seq + 1, _clock())
+            entry = Change(self.last_seq, change, resource_type, path, previous_path)
+            if len(self._changes) == self._changes.maxlen:
+                self.horizon = self._changes[0].seq if self._changes else entry.seq
+            self._changes.append(entry)
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                # The loop of a stream that has gone away is closed.
+                pass
+        return entry
+
+    def since(self, seq: Optional[int]) -> Optional[tuple[list[Change], int]]:
+        """Return the changes after seq and the sequence number to resume after.
+
+        Without seq, return no changes and the latest sequence number. Return
+        None if the journal no longer holds every change after seq.
+        """
+        with self._lock:
+            if seq is None:
+                return [], self.last_seq
+            if seq < self.horizon:
+                return None
+            # Newest first, so the cost is that of the changes returned.
+            changes = list(itertools.takewhile(lambda entry: entry.seq > seq, reversed(self._changes)))
+            changes.reverse()
+            return changes, max(seq, self.last_seq)
+
+    async def wait(self, seq: int) -> None:
+        """Wait until a change after seq is recorded."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self.last_seq > seq:
+                return
+            self._waiters.append(waiter)
+        try:
+            await waiter[1].wait()
+        finally:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def export_state(self) -> dict:
+        with self._lock:
+            return {"changes": list(self._changes), "last_seq": self.last_seq, "horizon": self.horizon}
+
+    def restore_state(self, state: dict) -> None:
+        with self._lock:
+            changes = state["changes"]
+            self._changes = deque(changes, maxlen=self._changes.maxlen)
+            self.horizon = state["horizon"]
+            if len(changes) > len(self._changes):
+                self.horizon = changes[-len(self._changes) - 1].seq
+            self.last_seq = max(self.last_seq, state["last_seq"])
@@ -0,0 +1,270 @@
+"""
+Negotiated response compression.
+
+JSON, NDJSON and text responses are compressed with zstd when the client
+accepts it, and otherwise with gzip, as Accept-Encoding allows. Responses smaller than
+OBSIDIAN_API_COMPRESSION_MIN_BYTES are sent as they are. Streams are
+compressed chunk by chunk and flushed after every chunk, so NDJSON listings
+still arrive incrementally.
+
+A response with an ETag is one version of a representation, so its
+compressed body is kept in a byte-budgeted LRU cache keyed by the request,
+the encoding and the ETag: a hot listing or big note is compressed once per
+version, and later requests for it only copy bytes. A compressed body is a
+different representation, so it gets the ETag with the encoding appended and
+no Accept-Ranges: a Range request with that ETag in If-Range gets the whole
+body instead of identity bytes at a compressed offset. The validators strip
+the suffix, so If-None-Match and If-Match still work whatever the encoding.
+"""
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.workers import run_in_worker
+
+DEFAULT_MIN_BYTES = 1024
+DEFAULT_COMPRESSION_CACHE_BYTES = 64 * 1024 * 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+# Chunks at least this large are compressed on a worker, off the event loop.
+OFFLOAD_BYTES = 64 * 1024
+
+COMPRESSIBLE_MEDIA_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Server-Sent Events must reach the client unbuffered.
+INCOMPRESSIBLE_MEDIA_TYPES = ("text/event-stream",)
+
+# The encodings this server can produce, most preferred first.
+SUPPORTED_ENCODINGS = ("zstd", "gzip")
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else etag
+
+def identity_etag(etag: str) -> str:
+    """Return the ETag of the identity representation an ETag from a compressed response stands for."""
+    for encoding in SUPPORTED_ENCODINGS:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the encoding for an Accept-Encoding header, or None to send the response as it is."""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, parameters = item.partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        parameter = parameters.strip().lower()
+        if parameter.startswith("q="):
+            try:
+                quality = float(parameter[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            qualities[coding] = quality
+    best, best_quality = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+class _Compressor:
+    """A streaming compressor for one response."""
+
+    def __init__(self, encoding: str):
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+            self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            # wbits=31 writes a gzip header and trailer.
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._flush_block = zlib.Z_SYNC_FLUSH
+
+    def compress(self, data: bytes, last: bool) -> bytes:
+        compressed = self._compressor.compress(data)
+        return compressed + (self._compressor.flush() if last else self._compressor.flush(self._flush_block))
+
+class CompressedBodyCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            if len(body) > self.max_bytes:
+                return
+            self._entries[key] = body
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+_compression_cache: Optional[CompressedBodyCache] = None
+
+def get_compression_cache() -> CompressedBodyCache:
+    global _compression_cache
+    if _compression_cache is None:
+        _compression_cache = CompressedBodyCache(int(os.getenv("OBSIDIAN_API_COMPRESSION_CACHE_BYTES", DEFAULT_COMPRESSION_CACHE_BYTES)))
+    return _compression_cache
+
+def get_compression_min_bytes() -> int:
+    return int(os.getenv("OBSIDIAN_API_COMPRESSION_MIN_BYTES", DEFAULT_MIN_BYTES))
+
+async def _run(compress: Callable[[bytes, bool], bytes], data: bytes, last: bool) -> bytes:
+    if len(data) >= OFFLOAD_BYTES:
+        return await run_in_worker(compress, data, last)
+    return compress(data, last)
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(scope, send, encoding).send)
+
+class _CompressingSend:
+    def __init__(self, scope: Scope, send: Send, encoding: str):
+        self.scope = scope
+        self.downstream = send
+        self.encoding = encoding
+        self.start: Optional[Message] = None
+        # "identity" passes the body through, "compress" compresses it and
+        # "cached" has sent a cached body and drops what the app still sends.
+        self.mode: Optional[str] = None
+        self.compressor: Optional[_Compressor] = None
+        self.cache_key: Optional[tuple] = None
+        self.parts: Optional[list[bytes]] = None
+        self.cached_bytes = 0
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if self.mode is None:
+            if message["type"] != "http.response.body":
+                self.mode = "identity"
+                await self.downstream(self.start)
+            else:
+                await self._begin(message)
+                return
+
+        if self.mode == "identity":
+            await self.downstream(message)
+        elif self.mode == "compress":
+            await self._compress(message.get("body", b""), message.get("more_body", False))
+
+    async def _begin(self, message: Message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=self.start["headers"])
+        if not more_body:
+            size = len(body)
+        elif "content-length" in headers:
+            size = int(headers["content-length"])
+        else:
+            size = None
+
+        media_type = headers.get("content-type", "").lower()
+        if (
+            self.start["status"] != 200
+            or "content-encoding" in headers
+            or not media_type.startswith(COMPRESSIBLE_MEDIA_TYPES)
+            or media_type.startswith(INCOMPRESSIBLE_MEDIA_TYPES)
+            or (size is not None and size < get_compression_min_bytes())
+        ):
+            self.mode = "identity"
+            await self.downstream(self.start)
+            await self.downstream(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # Ranges address the identity bytes, which this response does not carry.
+        if "accept-ranges" in headers:
+            del headers["Accept-Ranges"]
+        etag = headers.get("etag")
+        if etag is not None:
+            headers["ETag"] = encoded_etag(etag, self.encoding)
+            self.cache_key = (self.scope["path"], self.scope["query_string"], media_type, self.encoding, etag)
+            cached = get_compression_cache().get(self.cache_key)
+            if cached is not None:
+                self.mode = "cached"
+                headers["Content-Length"] = str(len(cached))
+                await self.downstream(self.start)
+                await self.downstream({"type": "http.response.body", "body": cached})
+                return
+            self.parts = []
+
+        self.mode = "compress"
+        self.compressor = _Compressor(self.encoding)
+        if more_body:
+            del headers["Content-Length"]
+            await self.downstream(self.start)
+            await self._compress(body, more_body)
+        else:
+            compressed = await _run(self.compressor.compress, body, True)
+            headers["Content-Length"] = str(len(compressed))
+            await self.downstream(self.start)
+            await self.downstream({"type": "http.response.body", "body": compressed})
+            if self.cache_key is not None:
+                get_compression_cache().put(self.cache_key, compressed)
+
+    async def _compress(self, body: bytes, more_body: bool) -> None:
+        compressed = await _run(self.compressor.compress, body, not more_body)
+        if self.parts is not None:
+            self.parts.append(compressed)
+            self.cached_bytes += len(compressed)
+            if self.cached_bytes > get_compression_cache().max_bytes:
+                self.parts = None
+        await self.downstream({"type": "http.response.body", "body": compressed, "more_body": more_body})
+        if not more_body and self.parts is not None:
+            get_compression_cache().put(self.cache_key, b"".join(self.parts))
@@ -0,0 +1,70 @@
+"""
+Conditional request support.
+
+Files and folders are versioned by a strong ETag built from their stat
+(inode, mtime and size) and by Last-Modified, so a 304 never needs to open
+the file. Listings and link lookups, which depend on many files, are
+versioned by the generation of the vault index instead. Writes accept
+If-Match with a file ETag and fail with 412 if the file has changed since;
+the check runs under the path lock, right before the write.
+"""
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response, status
+
+from app.index import get_vault_index
+from app.utils import etag_matches, stat_etag
+
+def _modified_since(header: str, mtime: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return True
+    if since is None or since.tzinfo is None:
+        return True
+    # Last-Modified has a resolution of one second.
+    return int(mtime) > since.timestamp()
+
+def not_modified_headers(request: Request, etag: str, mtime: Optional[float] = None) -> dict:
+    """Return the validator headers for a representation, or raise a 304 if the client's copy is current."""
+    headers = {"ETag": etag}
+    if mtime is not None:
+        headers["Last-Modified"] = formatdate(mtime, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, etag)
+    else:
+        not_modified = if_modified_since is not None and mtime is not None and not _modified_since(if_modified_since, mtime)
+    if not_modified:
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return headers
+
+def check_not_modified(request: Request, response: Response, etag: str, mtime: Optional[float] = None) -> dict:
+    headers = not_modified_headers(request, etag, mtime)
+    response.headers.update(headers)
+    return headers
+
+def stat_validators(request: Request, stats: os.stat_result) -> dict:
+    # Safe to call on a worker thread: it only raises, and leaves setting the
+    # headers to the route.
+    return not_modified_headers(request, stat_etag(stats), stats.st_mtime)
+
+async def vault_validators(request: Request, response: Response) -> dict:
+    index = await get_vault_index()
+    return check_not_modified(request, response, f'"vault-{index.generation_token}-{index.generation:x}"')
+
+async def if_match_header(request: Request) -> Optional[str]:
+    # Checked by the write helpers under the path lock, not here, so two
+    # writers holding the same ETag cannot both pass the check.
+    return request.headers.get("if-match")
+
+async def prefers_minimal_return(request: Request) -> bool:
+    # RFC 7240: "Prefer: return=minimal" asks for no representation in the response.
+    for preference in request.headers.get("prefer", "").split(","):
+        if preference.split(";", 1)[0].strip().lower().replace(" ", "") == "return=minimal":
+            return True
+    return False
@@ -1,24 +1,31 @@
 # Standard library imports
 import os
 # Third-party imports
-from fastapi import APIRouter, Depends, Request, Path
-from fastapi.responses import PlainTextResponse
-from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Path, Query, status
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from typing import Annotated, AsyncIterator, Callable, Optional, TypeVar, Union
 # Local application imports
 from app.authentication import ObsidianHTTPBearer
+from app.conditional import if_match_header, prefers_minimal_return, stat_etag, stat_validators, vault_validators
+from app.locks import get_path_locks
 from app.path_validation import (
-    validate_existing_markdown_file,
-    validate_new_markdown_file,
+    stat_markdown_file,
+    validate_existing_markdown_file_path,
+    validate_markdown_file_path,
+    validate_new_markdown_file_path,
     validate_destination_path,
-    validate_utf8_content
+    validate_utf8_content,
+    validate_cursor,
+    validate_fields,
+    validate_markdown_file_batch,
+    check_fields
 )
 from app.utils import (
+    build_stats,
+    check_if_match,
+    encode_cursor,
     # Read operations
-    read_file,
-    read_markdown_file,
-    read_stats,
-    walk_files,
-    get_markdown_file_model,
+    load_markdown,
     # Write operations
     write_content,
     write_body,
@@ -26,12 +33,34 @@ from app.utils import (
     merge_frontmatter,
     write_markdown_file,
 )
+from app.index import (
+    FileEntry,
+    VaultIndex,
+    encode_json,
+    get_file_entries,
+    get_markdown_files_json,
+    get_vault_index,
+    lookup_markdown_file,
+    iter_markdown_file_data,
+    get_note_links,
+    get_note_backlinks,
+    read_markdown_file_batch,
+    move_path,
+    record_written_file,
+)
 from app.models import (
     MarkdownFile,
     FileMetadata,
+    NoteLink,
+    Backlink,
+    BatchGetRequest,
+    BatchGetResult,
     PathModel,
     MarkdownContent
 )
+from app.workers import run_in_worker
+
+T = TypeVar("T")
 
 # Router setup
 obsidian_security = ObsidianHTTPBearer()
@@ -41,29 +70,81 @@ file_router = APIRouter(
     dependencies=[Depends(obsidian_security)]
 )
 
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def _json_response(content: bytes, headers: Optional[dict] = None) -> Response:
+    # Read routes encode the index's dicts with pydantic-core themselves, which
+    # skips FastAPI's validation against the route's response model.
+    return Response(content, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+async def _ndjson_lines(entries: list[FileEntry], fields: Optional[list[str]]) -> AsyncIterator[bytes]:
+    async for data in iter_markdown_file_data(entries, fields):
+        yield encode_json(data) + b"\n"
+
+async def _written_file_response(response: Response, full_file_path: str, markdown_file: MarkdownFile, return_minimal: bool) -> Union[MarkdownFile, Response]:
+    stats = await record_written_file(full_file_path, markdown_file)
+    etag = stat_etag(stats)
+    if return_minimal:
+        return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"ETag": etag, "Preference-Applied": "return=minimal"})
+    response.headers["ETag"] = etag
+    return markdown_file
+
+def _read_file(request: Request, vault_file_path: str, full_file_path: str, read: Callable[[os.stat_result], T]) -> tuple[dict, T]:
+    # Runs on a worker: checks, stats and reads the file in a single hop off
+    # the event loop, or raises the 404, 400 or 304 the route answers with.
+    stats = stat_markdown_file(vault_file_path, full_file_path)
+    return stat_validators(request, stats), read(stats)
+
+def _stat_file(index: VaultIndex, full_file_path: str) -> tuple[os.stat_result, bytes]:
+    stats = os.stat(full_file_path)
+    return stats, encode_json(lookup_markdown_file(index, full_file_path, stats=stats))
+
 # List operations
 @file_router.get(
     "/",
     operation_id="getAllFiles",
     summary="Get All Files",
-    description="List all markdown files in your vault with their metadata, including path, size, and modification dates."
+    description="List all markdown files in your vault with their metadata, including path, size, and modification dates. Files are returned in path order; pass `limit` to page through them with the cursor returned in the `X-Next-Cursor` header, or send `Accept: application/x-ndjson` to stream one file per line. Pass `fields` to return only part of each file; bodies are only read when requested.",
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
 )
-async def list_files() -> list[MarkdownFile]:
-    return await walk_files()
+async def list_files(
+    request: Request,
+    cache_headers: Annotated[dict, Depends(vault_validators)],
+    limit: Annotated[Optional[int], Query(ge=1, description="Maximum number of files to return")] = None,
+    after_path: Annotated[Optional[str], Depends(validate_cursor)] = None,
+    fields: Annotated[Optional[list[str]], Depends(validate_fields)] = None
+) -> list[MarkdownFile]:
+    entries, next_path = await get_file_entries(after_path, limit)
+    headers = {**cache_headers, "Vary": "Accept"}
+    if next_path:
+        headers["X-Next-Cursor"] = encode_cursor(next_path)
+
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return StreamingResponse(_ndjson_lines(entries, fields), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    if fields:
+        items = [data async for data in iter_markdown_file_data(entries, fields)]
+        return _json_response(encode_json(items), headers)
+    return _json_response(await get_markdown_files_json(entries), headers)
 
 # Read operations
 @file_router.get(
     "/{vault_file_path:path}/raw", 
     operation_id="getFileAsText",
     summary="Get File As Text",
-    response_description='Get the raw contents of the markdown file at the specified path, including frontmatter and body content exactly as stored.',
+    response_description='Get the raw contents of the markdown file at the specified path, including frontmatter and body content exactly as stored. The file is streamed from disk and supports `Range` requests, e.g. `Range: bytes=0-1023` for the first KiB.',
     response_class=PlainTextResponse
 )
 async def read_raw_file(
+    request: Request,
     vault_file_path: Annotated[str, Path(..., description="The path of the file to read")],
-    full_file_path: Annotated[str, Depends(validate_existing_markdown_file)]
-) -> str:
-    return await read_file(full_file_path)
+    full_file_path: Annotated[str, Depends(validate_markdown_file_path)]
+) -> FileResponse:
+    cache_headers, stats = await run_in_worker(_read_file, request, vault_file_path, full_file_path, lambda stats: stats)
+    # FileResponse streams in fixed-size chunks and answers Range and If-Range
+    # against the ETag and Last-Modified in cache_headers.
+    return FileResponse(full_file_path, media_type="text/plain", headers=cache_headers, stat_result=stats)
 
 @file_router.get(
     "/{vault_file_path:path}/metadata", 
@@ -72,10 +153,14 @@ async def read_raw_file(
     response_description='Get the file\'s metadata including name, path, size, creation date, and last modification date.'
 )
 async def read_file_metadata(
+    request: Request,
+    response: Response,
     vault_file_path: Annotated[str, Path(..., description="The path of the file to read")],
-    full_file_path: Annotated[str, Depends(validate_existing_markdown_file)]
+    full_file_path: Annotated[str, Depends(validate_markdown_file_path)]
 ) -> FileMetadata:
-    return await read_stats(full_file_path)
+    cache_headers, metadata = await run_in_worker(_read_file, request, vault_file_path, full_file_path, lambda stats: build_stats(full_file_path, stats))
+    response.headers.update(cache_headers)
+    return metadata
 
 @file_router.get(
     "/{vault_file_path:path}/frontmatter", 
@@ -84,10 +169,13 @@ async def read_file_metadata(
     response_description='Get the YAML frontmatter of the file as a JSON object.'
 )
 async def read_file_frontmatter(
+    request: Request,
+    response: Response,
     vault_file_path: Annotated[str, Path(..., description="The path of the file to read")],
-    full_file_path: Annotated[str, Depends(validate_existing_markdown_file)]
+    full_file_path: Annotated[str, Depends(validate_markdown_file_path)]
 ) -> dict:
-    _, frontmatter = await read_markdown_file(full_file_path)
+    cache_headers, (_, frontmatter) = await run_in_worker(_read_file, request, vault_file_path, full_file_path, lambda stats: load_markdown(full_file_path, stats))
+    response.headers.update(cache_headers)
     return frontmatter or {}
 
 @file_router.get(
@@ -98,23 +186,90 @@ async def read_file_frontmatter(
     response_class=PlainTextResponse
 )
 async def read_file_body(
+    request: Request,
+    response: Response,
     vault_file_path: Annotated[str, Path(..., description="The path of the file to read")],
-    full_file_path: Annotated[str, Depends(validate_existing_markdown_file)]
+    full_file_path: Annotated[str, Depends(validate_markdown_file_path)]
 ) -> str:
-    body, _ = await read_markdown_file(full_file_path)
+    cache_headers, (body, _) = await run_in_worker(_read_file, request, vault_file_path, full_file_path, lambda stats: load_markdown(full_file_path, stats))
+    response.headers.update(cache_headers)
     return body
 
+@file_router.get(
+    "/{vault_file_path:path}/links",
+    operation_id="getFileLinks",
+    summary="Get File Links",
+    response_description='Get the outgoing [[wikilinks]], embeds and markdown links of the file, with the path each one resolves to, or null for unresolved links.'
+)
+async def read_file_links(
+    vault_file_path: Annotated[str, Path(..., description="The path of the file to read")],
+    full_file_path: Annotated[str, Depends(validate_markdown_file_path)],
+    cache_headers: Annotated[dict, Depends(vault_validators)]
+) -> list[NoteLink]:
+    await run_in_worker(stat_markdown_file, vault_file_path, full_file_path)
+    return await get_note_links(full_file_path)
+
+@file_router.get(
+    "/{vault_file_path:path}/backlinks",
+    operation_id="getFileBacklinks",
+    summary="Get File Backlinks",
+    response_description='Get every link in the vault that resolves to the file, with the path of the linking file.'
+)
+async def read_file_backlinks(
+    vault_file_path: Annotated[str, Path(..., description="The path of the file to read")],
+    full_file_path: Annotated[str, Depends(validate_markdown_file_path)],
+    cache_headers: Annotated[dict, Depends(vault_validators)]
+) -> list[Backlink]:
+    await run_in_worker(stat_markdown_file, vault_file_path, full_file_path)
+    return await get_note_backlinks(full_file_path)
+
 @file_router.get(
     "/{vault_file_path:path}", 
     operation_id="getFileAsJson",
     summary="Get File As Json",
-    response_description='Get the complete file representation including metadata, YAML frontmatter, and markdown body content.'
+    response_description='Get the complete file representation including metadata, YAML frontmatter, and markdown body content. Pass `fields` to return only part of it.'
 )
 async def read_file_structured(
+    request: Request,
     vault_file_path: Annotated[str, Path(..., description="The path of the file to read")],
-    full_file_path: Annotated[str, Depends(validate_existing_markdown_file)]
+    full_file_path: Annotated[str, Depends(validate_markdown_file_path)],
+    fields: Annotated[Optional[list[str]], Depends(validate_fields)] = None
 ) -> MarkdownFile:
-    return await get_markdown_file_model(full_file_path)
+    index = await get_vault_index()
+    cache_headers, content = await run_in_worker(
+        _read_file,
+        request,
+        vault_file_path,
+        full_file_path,
+        lambda stats: encode_json(lookup_markdown_file(index, full_file_path, fields, stats))
+    )
+    return _json_response(content, cache_headers)
+
+# Batch operations
+@file_router.post(
+    "/batch:get",
+    operation_id="getFilesBatch",
+    summary="Get Files Batch",
+    description="Read many markdown files in one request. Returns one result per requested path, in request order, each with its own HTTP status: a missing or invalid path yields a 404 or 400 item instead of failing the whole batch. Pass `fields` to return only part of each file, as with `GET /files/{path}`."
+)
+async def read_files_batch(request_model: BatchGetRequest) -> list[BatchGetResult]:
+    fields = check_fields(request_model.fields) if request_model.fields else None
+    validated = await run_in_worker(validate_markdown_file_batch, request_model.paths)
+    full_file_paths = [item for item in validated if isinstance(item, str)]
+    files = iter(await read_markdown_file_batch(full_file_paths, fields))
+
+    results = []
+    for path, item in zip(request_model.paths, validated):
+        if isinstance(item, HTTPException):
+            results.append({"path": path, "status": item.status_code, "file": None, "detail": item.detail})
+            continue
+        file = next(files)
+        if file is None:
+            results.append({"path": path, "status": status.HTTP_404_NOT_FOUND, "file": None, "detail": f"Path not found: {path}"})
+        else:
+            results.append({"path": path, "status": status.HTTP_200_OK, "file": file, "detail": None})
+
+    return _json_response(encode_json(results))
 
 # Create operations
 
@@ -125,13 +280,15 @@ async def read_file_structured(
     response_description='Create a new markdown file at the specified path with raw text content. The content should include YAML frontmatter (between --- markers) followed by markdown body content.'
 )
 async def create_file_raw(
+    response: Response,
     request: Request,
     vault_file_path: Annotated[str, Path(..., description="The path of the file to create")],
-    full_file_path: Annotated[str, Depends(validate_new_markdown_file)],
-    content: Annotated[str, Depends(validate_utf8_content)]
+    full_file_path: Annotated[str, Depends(validate_new_markdown_file_path)],
+    content: Annotated[str, Depends(validate_utf8_content)],
+    return_minimal: Annotated[bool, Depends(prefers_minimal_return)]
 ) -> MarkdownFile:
-    await write_content(full_file_path, content)
-    return await get_markdown_file_model(full_file_path)
+    markdown_file = await write_content(full_file_path, content)
+    return await _written_file_response(response, full_file_path, markdown_file, return_minimal)
 
 @file_router.post(
     "/{vault_file_path:path}", 
@@ -140,12 +297,14 @@ async def create_file_raw(
     response_description='Create a new markdown file at the specified path using a JSON object with \'frontmatter\' (YAML object) and \'body\' (markdown string) fields.'
 )
 async def create_file_structured(
+    response: Response,
     vault_file_path: Annotated[str, Path(..., description="The path of the file to create")],
-    full_file_path: Annotated[str, Depends(validate_new_markdown_file)],
-    request_model: MarkdownContent
+    full_file_path: Annotated[str, Depends(validate_new_markdown_file_path)],
+    request_model: MarkdownContent,
+    return_minimal: Annotated[bool, Depends(prefers_minimal_return)]
 ) -> MarkdownFile:
-    await write_markdown_file(full_file_path, request_model.frontmatter, request_model.body)
-    return await get_markdown_file_model(full_file_path)
+    markdown_file = await write_markdown_file(full_file_path, request_model.frontmatter, request_model.body)
+    return await _written_file_response(response, full_file_path, markdown_file, return_minimal)
 
 
 # Update operations
@@ -155,13 +314,16 @@ async def create_file_structured(
     response_description='Replace the entire raw content of the file. The content should include YAML frontmatter (between --- markers) followed by markdown body content.'
 )
 async def put_raw_file(
+    response: Response,
     vault_file_path: Annotated[str, Path(..., description="The path of the file to update")],
-    full_file_path: Annotated[str, Depends(validate_existing_markdown_file)],
+    full_file_path: Annotated[str, Depends(validate_existing_markdown_file_path)],
     request: Request,
-    content: Annotated[str, Depends(validate_utf8_content)]
+    content: Annotated[str, Depends(validate_utf8_content)],
+    return_minimal: Annotated[bool, Depends(prefers_minimal_return)],
+    if_match: Annotated[Optional[str], Depends(if_match_header)]
 ) -> MarkdownFile:
-    await write_content(full_file_path, content)
-    return await get_markdown_file_model(full_file_path)
+    markdown_file = await write_content(full_file_path, content, if_match)
+    return await _written_file_response(response, full_file_path, markdown_file, return_minimal)
 
 @file_router.put(
     "/{vault_file_path:path}/frontmatter",
@@ -169,12 +331,15 @@ async def put_raw_file(
     response_description='Replace the entire YAML frontmatter of the file with a new JSON object containing frontmatter data.'
 )
 async def put_file_frontmatter(
+    response: Response,
     vault_file_path: Annotated[str, Path(..., description="The path of the file to update")],
-    full_file_path: Annotated[str, Depends(validate_existing_markdown_file)],
-    json_body: dict
+    full_file_path: Annotated[str, Depends(validate_existing_markdown_file_path)],
+    json_body: dict,
+    return_minimal: Annotated[bool, Depends(prefers_minimal_return)],
+    if_match: Annotated[Optional[str], Depends(if_match_header)]
 ) -> MarkdownFile:
-    await write_frontmatter(full_file_path, json_body)
-    return await get_markdown_file_model(full_file_path)
+    markdown_file = await write_frontmatter(full_file_path, json_body, if_match)
+    return await _written_file_response(response, full_file_path, markdown_file, return_minimal)
 
 @file_router.put(
     "/{vault_file_path:path}/body",
@@ -182,13 +347,16 @@ async def put_file_frontmatter(
     response_description='Replace the entire markdown body content of the file, preserving the frontmatter.'
 )
 async def put_file_body(
+    response: Response,
     request: Request,
     vault_file_path: Annotated[str, Path(..., description="The path of the file to update")],
-    full_file_path: Annotated[str, Depends(validate_existing_markdown_file)],
-    content: Annotated[str, Depends(validate_utf8_content)]
+    full_file_path: Annotated[str, Depends(validate_existing_markdown_file_path)],
+    content: Annotated[str, Depends(validate_utf8_content)],
+    return_minimal: Annotated[bool, Depends(prefers_minimal_return)],
+    if_match: Annotated[Optional[str], Depends(if_match_header)]
 ) -> MarkdownFile:
-    await write_body(full_file_path, content)
-    return await get_markdown_file_model(full_file_path)
+    markdown_file = await write_body(full_file_path, content, if_match)
+    return await _written_file_response(response, full_file_path, markdown_file, return_minimal)
 
 @file_router.patch(
     "/{vault_file_path:path}/metadata",
@@ -198,15 +366,22 @@ async def put_file_body(
 )
 async def patch_file_metadata(
     vault_file_path: Annotated[str, Path(..., description="The path of the file to update")],
-    full_file_path: Annotated[str, Depends(validate_existing_markdown_file)],
-    request_model: PathModel
+    full_file_path: Annotated[str, Depends(validate_existing_markdown_file_path)],
+    request_model: PathModel,
+    if_match: Annotated[Optional[str], Depends(if_match_header)]
 ) -> MarkdownFile:
+    full_destination_path = full_file_path
     if request_model.path is not None:
-        full_destination_path = validate_destination_path(request_model.path, vault_file_path)
-        os.makedirs(os.path.dirname(full_destination_path), exist_ok=True)
-        os.rename(full_file_path, full_destination_path)
-    
-    return await get_markdown_file_model(full_destination_path)
+        full_destination_path = await run_in_worker(validate_destination_path, request_model.path, vault_file_path)
+        async with get_path_locks().hold(full_file_path, full_destination_path):
+            await run_in_worker(check_if_match, full_file_path, if_match)
+            await move_path(full_file_path, full_destination_path)
+    else:
+        await run_in_worker(check_if_match, full_file_path, if_match)
+
+    index = await get_vault_index()
+    stats, content = await run_in_worker(_stat_file, index, full_destination_path)
+    return _json_response(content, {"ETag": stat_etag(stats)})
 
 @file_router.patch(
     "/{vault_file_path:path}/frontmatter",
@@ -215,9 +390,12 @@ async def patch_file_metadata(
     response_description='Merge a new JSON object containing frontmatter data with the existing YAML frontmatter.'
 )
 async def patch_file_frontmatter(
+    response: Response,
     vault_file_path: Annotated[str, Path(..., description="The path of the file to update")],
-    full_file_path: Annotated[str, Depends(validate_existing_markdown_file)],
-    json_body: dict
+    full_file_path: Annotated[str, Depends(validate_existing_markdown_file_path)],
+    json_body: dict,
+    return_minimal: Annotated[bool, Depends(prefers_minimal_return)],
+    if_match: Annotated[Optional[str], Depends(if_match_header)]
 ) -> MarkdownFile:
-    await merge_frontmatter(full_file_path, json_body)
-    return await get_markdown_file_model(full_file_path)
\ No newline at end of file
+    markdown_file = await merge_frontmatter(full_file_path, json_body, if_match)
+    return await _written_file_response(response, full_file_path, markdown_file, return_minimal)
\ No newline at end of file
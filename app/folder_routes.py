@@ -1,26 +1,31 @@
-# Standard library imports
-import os
-
 # Third-party imports
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Request, Response
 from typing import Annotated
 
 # Local application imports
 from app.authentication import ObsidianHTTPBearer
+from app.conditional import stat_validators, vault_validators
 from app.path_validation import (
-    validate_existing_folder,
-    validate_new_folder,
+    stat_folder,
+    validate_existing_folder_path,
+    validate_folder_path,
+    validate_new_folder_path,
     validate_destination_path
 )
-from app.utils import (
-    # Read operations
-    walk_folders,
+from app.index import (
+    VaultIndex,
+    create_folder_model,
+    folder_model,
     get_folder_model,
+    get_folder_models,
+    get_vault_index,
+    move_path,
 )
 from app.models import (
     Folder,
     PathModel
 )
+from app.workers import run_in_worker
 
 # Router setup
 obsidian_security = ObsidianHTTPBearer()
@@ -30,6 +35,11 @@ folder_router = APIRouter(
     dependencies=[Depends(obsidian_security)]
 )
 
+def _read_folder(request: Request, index: VaultIndex, vault_folder_path: str, full_folder_path: str) -> tuple[dict, dict]:
+    # Runs on a worker, like file_routes._read_file.
+    stats = stat_folder(vault_folder_path, full_folder_path)
+    return stat_validators(request, stats), index.update_folder(full_folder_path, stats)
+
 # List operations
 @folder_router.get(
     "/", 
@@ -37,8 +47,10 @@ folder_router = APIRouter(
     summary="Get All Folders",
     description="List all folders in your vault."
 )
-async def list_folders() -> list[Folder]:
-    return await walk_folders()
+async def list_folders(
+    cache_headers: Annotated[dict, Depends(vault_validators)]
+) -> list[Folder]:
+    return await get_folder_models()
 
 # Read operations
 @folder_router.get(
@@ -48,10 +60,15 @@ async def list_folders() -> list[Folder]:
     response_description='Get the folder\'s metadata including name, path, size, creation date, and last modification date.'
 )
 async def read_folder(
+    request: Request,
+    response: Response,
     vault_folder_path: Annotated[str, Path(..., description="The path of the folder to read")],
-    full_folder_path: Annotated[str, Depends(validate_existing_folder)]
+    full_folder_path: Annotated[str, Depends(validate_folder_path)]
 ) -> Folder:
-    return await get_folder_model(full_folder_path)
+    index = await get_vault_index()
+    cache_headers, metadata = await run_in_worker(_read_folder, request, index, vault_folder_path, full_folder_path)
+    response.headers.update(cache_headers)
+    return folder_model(metadata)
 
 # Create operations
 @folder_router.post(
@@ -62,10 +79,9 @@ async def read_folder(
 )
 async def create_folder(
     vault_folder_path: Annotated[str, Path(..., description="The path of the folder to create")],
-    full_folder_path: Annotated[str, Depends(validate_new_folder)]
+    full_folder_path: Annotated[str, Depends(validate_new_folder_path)]
 ) -> Folder:
-    os.makedirs(full_folder_path, exist_ok=True)
-    return await get_folder_model(full_folder_path)
+    return await create_folder_model(full_folder_path)
 
 # Update operations
 @folder_router.patch(
@@ -76,10 +92,9 @@ async def create_folder(
 )
 async def move_folder(
     vault_folder_path: Annotated[str, Path(..., description="The path of the folder to move")],
-    full_folder_path: Annotated[str, Depends(validate_existing_folder)],
+    full_folder_path: Annotated[str, Depends(validate_existing_folder_path)],
     request_model: PathModel
 ) -> Folder:
-    full_destination_path = validate_destination_path(request_model.path, vault_folder_path)
-    os.makedirs(os.path.dirname(full_destination_path), exist_ok=True)
-    os.rename(full_folder_path, full_destination_path)
+    full_destination_path = await run_in_worker(validate_destination_path, request_model.path, vault_folder_path)
+    await move_path(full_folder_path, full_destination_path)
     return await get_folder_model(full_destination_path)
\ No newline at end of file
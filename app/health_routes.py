@@ -0,0 +1,24 @@
+# Third-party imports
+from fastapi import APIRouter, HTTPException, status
+
+# Local application imports
+from app.index import vault_index_ready
+
+# Router setup
+# Health checks come from orchestrators, which carry no API key.
+health_router = APIRouter(
+    prefix="/health",
+    tags=["health"]
+)
+
+# Read operations
+@health_router.get(
+    "/ready",
+    operation_id="getReadiness",
+    summary="Get Readiness",
+    description="Report whether the vault index is loaded. Returns 503 while the server is still building or restoring it, so orchestrators only route traffic to a warm server."
+)
+async def read_readiness() -> dict:
+    if not vault_index_ready():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Vault index is loading")
+    return {"status": "ready"}
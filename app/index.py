@@ -0,0 +1,683 @@
+"""
+In-memory index of the vault.
+
+The index is built once per vault path and holds the metadata of every folder
+and markdown file, plus the parsed frontmatter of every note. The write routes
+update it synchronously and a filesystem watcher (inotify on Linux) picks up
+edits made outside the API, so listings never have to walk the vault.
+"""
+import atexit
+import bisect
+import logging
+import os
+import stat
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+import anyio
+from pydantic_core import to_json
+from watchfiles import watch
+
+from app.cache import get_content_cache
+from app.changes import ChangeJournal, ChangeType, get_change_journal_size
+from app.links import LinkIndex
+from app.manifest import ChildDigest, build_manifests, hash_note
+from app.parse_pool import PARSE_BATCH_SIZE, close_parse_pool, get_parse_pool, iter_parsed_notes
+from app.search import SearchIndex, get_search_database_path
+from app.snapshot import get_snapshot_interval, get_snapshot_path, load_snapshot, save_snapshot
+from app.tags import TagIndex
+from app.walker import close_walker_pool, walk_tree
+from app.workers import run_in_worker
+from app.models import Folder, FolderManifest, FolderMetadata, ManifestEntry, ResourceType, MarkdownFile, FileMetadata, NoteLink, Backlink, TagCount
+from app.utils import (
+    get_vault_path,
+    is_hidden,
+    build_stats,
+    fields_overlap,
+    project_fields,
+    parse_markdown,
+    read_frontmatter,
+    read_text,
+    load_content,
+    split_markdown_body,
+)
+
+logger = logging.getLogger(__name__)
+
+# Files a batch read keeps in flight at once.
+BATCH_READ_CONCURRENCY = 16
+
+@dataclass
+class FileEntry:
+    metadata: dict
+    frontmatter: Optional[dict]
+    mtime_ns: int
+    size: int
+    # SHA-256 of the note, computed when a manifest first needs it.
+    content_hash: Optional[str] = None
+
+    def matches(self, stats: os.stat_result) -> bool:
+        return self.mtime_ns == stats.st_mtime_ns and self.size == stats.st_size
+
+class VaultIndex:
+    def __init__(self, vault_path: str):
+        self.vault_path = vault_path
+        self._files: dict[str, FileEntry] = {}
+        self._file_paths: list[str] = []
+        self._folders: dict[str, dict] = {}
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        # Bumped on every change to the indexed files or folders. Together with
+        # the token, which differs per index instance, it versions the vault.
+        self.generation = 0
+        self.generation_token = uuid.uuid4().hex[:12]
+        self.search = SearchIndex(vault_path, get_search_database_path())
+        self.links = LinkIndex(vault_path)
+        self.tags = TagIndex(vault_path)
+        # Derived indexes notified of every file this index stores or drops.
+        self._listeners = [self.search, self.links, self.tags]
+        self.snapshot_path = get_snapshot_path()
+        self._snapshot_generation: Optional[int] = None
+        self.changes = ChangeJournal(get_change_journal_size())
+        # Changes are journaled once the index is built, or from the start of
+        # a warm build, which journals what changed while the API was down.
+        self._journaling = False
+        # Destinations of the moves in progress, mapped to their sources.
+        self._moves: dict[str, str] = {}
+        self._manifests: Optional[tuple[int, dict[str, tuple[str, list[ChildDigest]]]]] = None
+
+    def relative(self, full_path: str) -> str:
+        return os.path.relpath(full_path, self.vault_path)
+
+    # Build and Watch
+
+    def build(self) -> None:
+        for listener in self._listeners:
+            listener.build_started()
+        restored = self._restore_snapshot()
+        self._journaling = restored
+        walked = self._scan_tree(self.vault_path)
+        if restored:
+            # Drop what was deleted while the API was down.
+            with self._lock:
+                deleted = (set(self._files) | set(self._folders)) - walked
+            for path in sorted(deleted):
+                self.remove(os.path.join(self.vault_path, path))
+        with self._lock:
+            paths = set(self._files)
+        for listener in self._listeners:
+            listener.build_finished(paths)
+        self._journaling = True
+        if not restored:
+            # A warm start leaves saving its changes to the snapshot thread.
+            self.save_snapshot()
+
+    def start_watching(self) -> None:
+        self._watcher = threading.Thread(target=self._watch, name="vault-watcher", daemon=True)
+        self._watcher.start()
+
+    def start_snapshots(self) -> None:
+        if self.snapshot_path is not None:
+            threading.Thread(target=self._save_snapshots, name="vault-snapshots", daemon=True).start()
+
+    def close(self) -> None:
+        self._stop_event.set()
+        if self._watcher is not None:
+            # A watcher still inside watchfiles when the interpreter finalizes
+            # crashes the process, so wait for it to notice the stop event.
+            self._watcher.join(timeout=5)
+        self.save_snapshot()
+        self.search.close()
+
+    def _watch(self) -> None:
+        try:
+            for changes in watch(
+                self.vault_path,
+                watch_filter=lambda _, full_path: not is_hidden(full_path),
+                debounce=200,
+                stop_event=self._stop_event,
+                raise_interrupt=False
+            ):
+                for _, full_path in changes:
+                    self.sync_path(full_path)
+        except Exception:
+            if not self._stop_event.is_set():
+                logger.exception("Vault watcher stopped for %s", self.vault_path)
+
+    # Snapshots
+
+    def save_snapshot(self) -> None:
+        """Save a snapshot if snapshots are enabled and the index changed since the last one."""
+        if self.snapshot_path is None or self.generation == self._snapshot_generation:
+            return
+        with self._lock:
+            generation = self.generation
+            state = {
+                "files": {path: (entry.metadata, entry.frontmatter, entry.mtime_ns, entry.size, entry.content_hash) for path, entry in self._files.items()},
+                "folders": dict(self._folders)
+            }
+        state["changes"] = self.changes.export_state()
+        state["listeners"] = [listener.export_state() for listener in self._listeners]
+        try:
+            save_snapshot(self.snapshot_path, self.vault_path, state)
+        except OSError:
+            logger.exception("Could not save the index snapshot to %s", self.snapshot_path)
+            return
+        self._snapshot_generation = generation
+
+    def _restore_snapshot(self) -> bool:
+        if self.snapshot_path is None:
+            return False
+        state = load_snapshot(self.snapshot_path, self.vault_path)
+        if state is None:
+            return False
+        with self._lock:
+            self._files = {
+                path: FileEntry(metadata=metadata, frontmatter=frontmatter_data, mtime_ns=mtime_ns, size=size, content_hash=content_hash)
+                for path, (metadata, frontmatter_data, mtime_ns, size, content_hash) in state["files"].items()
+            }
+            self._file_paths = sorted(self._files)
+            self._folders = state["folders"]
+        for listener, listener_state in zip(self._listeners, state["listeners"]):
+            listener.restore_state(listener_state)
+        self.changes.restore_state(state["changes"])
+        self._snapshot_generation = self.generation
+        return True
+
+    def _save_snapshots(self) -> None:
+        while not self._stop_event.wait(get_snapshot_interval()):
+            self.save_snapshot()
+
+    # Lookups
+
+    def files(self, after: Optional[str] = None, limit: Optional[int] = None) -> list[FileEntry]:
+        with self._lock:
+            start = bisect.bisect_right(self._file_paths, after) if after is not None else 0
+            stop = start + limit if limit is not None else None
+            return [self._files[path] for path in self._file_paths[start:stop]]
+
+    def entries(self, paths: list[str]) -> list[FileEntry]:
+        with self._lock:
+            return [self._files[path] for path in paths if path in self._files]
+
+    def folders(self) -> list[dict]:
+        with self._lock:
+            return [self._folders[path] for path in sorted(self._folders)]
+
+    def lookup_file(self, full_file_path: str, include_body: bool = True, include_frontmatter: bool = True, stats: Optional[os.stat_result] = None) -> tuple[FileEntry, Optional[str]]:
+        stats = stats or os.stat(full_file_path)
+        entry = self._files.get(self.relative(full_file_path))
+
+        if include_body:
+            content = load_content(full_file_path, stats)
+            if entry is not None and entry.matches(stats):
+                return entry, content.body if content.parsed else split_markdown_body(content.text)
+            return self._store_file(full_file_path, stats, content.text)
+
+        if entry is not None and entry.matches(stats):
+            return entry, None
+        if include_frontmatter:
+            return self._store_entry(full_file_path, stats, read_frontmatter(full_file_path)), None
+        return FileEntry(
+            metadata=build_stats(full_file_path, stats),
+            frontmatter=None,
+            mtime_ns=stats.st_mtime_ns,
+            size=stats.st_size
+        ), None
+
+    def manifest(self, folder: str) -> Optional[tuple[str, list[ChildDigest]]]:
+        """Return the digest and children of a folder ("" for the vault root), or None if it is not indexed."""
+        with self._lock:
+            generation = self.generation
+            if self._manifests is not None and self._manifests[0] == generation:
+                return self._manifests[1].get(folder)
+            entries = [(path, self._files[path]) for path in self._file_paths]
+            folders = list(self._folders)
+        note_hashes = {}
+        hashed = False
+        for path, entry in entries:
+            hashed = hashed or entry.content_hash is None
+            content_hash = self._content_hash(path, entry)
+            if content_hash is not None:
+                note_hashes[path] = content_hash
+        manifests = build_manifests(note_hashes, folders)
+        with self._lock:
+            self._manifests = (generation, manifests)
+            if hashed:
+                # New hashes do not change the generation but are worth saving.
+                self._snapshot_generation = None
+        return manifests.get(folder)
+
+    def read_files(self, entries: list[FileEntry]) -> list[tuple[FileEntry, str]]:
+        # Bulk reads bypass the content cache so a listing does not evict hot notes.
+        items = []
+        for entry in entries:
+            try:
+                content = read_text(os.path.join(self.vault_path, entry.metadata["path"]))
+            except FileNotFoundError:
+                continue
+            items.append((entry, split_markdown_body(content)))
+        return items
+
+    # Updates
+
+    def update_file(self, full_file_path: str) -> tuple[FileEntry, str]:
+        # Parents first, so a new folder is journaled before the notes in it.
+        self._touch_parents(full_file_path)
+        return self._store_file(full_file_path, os.stat(full_file_path), read_text(full_file_path))
+
+    def store_written_file(self, full_file_path: str, markdown_file: MarkdownFile) -> os.stat_result:
+        # The written file describes the note completely, so it is only
+        # re-read if something else replaced the note since it was written.
+        stats = os.stat(full_file_path)
+        metadata = markdown_file.metadata
+        if stats.st_size != metadata.size or datetime.fromtimestamp(stats.st_mtime) != metadata.modified:
+            self.update_file(full_file_path)
+            return stats
+        self._touch_parents(full_file_path)
+        self._store_entry(full_file_path, stats, markdown_file.content.frontmatter, markdown_file.content.body)
+        return stats
+
+    def update_folder(self, full_folder_path: str, stats: Optional[os.stat_result] = None) -> dict:
+        metadata = build_stats(full_folder_path, stats or os.stat(full_folder_path))
+        self._store_folder(metadata)
+        self._touch_parents(full_folder_path)
+        return metadata
+
+    def remove(self, full_path: str) -> None:
+        get_content_cache().invalidate(full_path)
+        path = self.relative(full_path)
+        prefix = path + os.sep
+        removed = []
+        removed_folders = []
+        with self._lock:
+            if self._files.pop(path, None) is not None:
+                self._file_paths.pop(bisect.bisect_left(self._file_paths, path))
+                removed.append(path)
+            if self._folders.pop(path, None) is not None:
+                removed.extend(key for key in self._files if key.startswith(prefix))
+                for key in removed:
+                    self._files.pop(key, None)
+                self._file_paths = [key for key in self._file_paths if not key.startswith(prefix)]
+                removed_folders = [key for key in self._folders if key.startswith(prefix)]
+                for key in removed_folders:
+                    del self._folders[key]
+                removed_folders.append(path)
+                self.generation += 1
+            elif removed:
+                self.generation += 1
+            for removed_path in removed:
+                self._record_change("deleted", ResourceType.FILE, removed_path)
+            # Subfolders before the folders that contain them.
+            for removed_path in sorted(removed_folders, reverse=True):
+                self._record_change("deleted", ResourceType.FOLDER, removed_path)
+
+        for removed_path in removed:
+            for listener in self._listeners:
+                listener.file_removed(removed_path)
+
+    def move(self, full_source_path: str, full_destination_path: str) -> None:
+        # The paths are dropped and indexed again, which the journal records as
+        # moves rather than as deletions and creations.
+        destination = self.relative(full_destination_path)
+        with self._lock:
+            self._moves[destination] = self.relative(full_source_path)
+        try:
+            self.remove(full_source_path)
+            self._touch_parents(full_source_path)
+            if os.path.isdir(full_destination_path):
+                self.update_folder(full_destination_path)
+                self._scan_tree(full_destination_path)
+            else:
+                self.update_file(full_destination_path)
+        finally:
+            with self._lock:
+                del self._moves[destination]
+
+    def sync_path(self, full_path: str) -> None:
+        try:
+            stats = os.stat(full_path)
+        except FileNotFoundError:
+            self.remove(full_path)
+            self._touch_parents(full_path)
+            return
+
+        path = self.relative(full_path)
+        if stat.S_ISDIR(stats.st_mode):
+            if is_hidden(full_path, is_folder=True):
+                return
+            is_new = path not in self._folders
+            self.update_folder(full_path)
+            if is_new:
+                self._scan_tree(full_path)
+        elif full_path.endswith('.md'):
+            entry = self._files.get(path)
+            if entry is None or not entry.matches(stats):
+                get_content_cache().invalidate(full_path)
+                try:
+                    self.update_file(full_path)
+                except (FileNotFoundError, UnicodeDecodeError):
+                    pass
+
+    # Internal Helpers
+
+    def _content_hash(self, path: str, entry: FileEntry) -> Optional[str]:
+        if entry.content_hash is None:
+            try:
+                content_hash, stats = hash_note(os.path.join(self.vault_path, path))
+            except FileNotFoundError:
+                return None
+            if not entry.matches(stats):
+                # Changed since it was indexed, so the hash is not kept.
+                return content_hash
+            entry.content_hash = content_hash
+        return entry.content_hash
+
+    def _store_file(self, full_file_path: str, stats: os.stat_result, content: str) -> tuple[FileEntry, str]:
+        try:
+            body, frontmatter_data = parse_markdown(content)
+        except Exception:
+            logger.warning("Could not parse frontmatter of %s", full_file_path)
+            body, frontmatter_data = split_markdown_body(content), None
+        return self._store_entry(full_file_path, stats, frontmatter_data, body), body
+
+    def _store_entry(self, full_file_path: str, stats: os.stat_result, frontmatter_data: Optional[dict], body: Optional[str] = None) -> FileEntry:
+        entry = FileEntry(
+            metadata=build_stats(full_file_path, stats),
+            frontmatter=frontmatter_data,
+            mtime_ns=stats.st_mtime_ns,
+            size=stats.st_size
+        )
+        path = entry.metadata["path"]
+        with self._lock:
+            if path not in self._files:
+                bisect.insort(self._file_paths, path)
+                self._record_change("created", ResourceType.FILE, path)
+            else:
+                self._record_change("modified", ResourceType.FILE, path)
+            self._files[path] = entry
+            self.generation += 1
+
+        for listener in self._listeners:
+            listener.file_updated(entry, body)
+        return entry
+
+    def _scan_tree(self, root_path: str) -> set[str]:
+        """Index the folders and notes below root_path and return their relative paths."""
+        # Walked entries carry the stat of their scandir entry, so notes that
+        # are already indexed at that stat, e.g. restored from a snapshot, are
+        # not read again. Derived indexes check their own stamps and only read
+        # a note if they are behind.
+        walked = set()
+        notes = []
+        # Walked paths extend root_path as given, so only the root needs relpath.
+        root = self.relative(root_path)
+        offset = len(os.path.join(root_path, ""))
+        for entry in walk_tree(root_path):
+            path = entry.path[offset:] if root == "." else os.path.join(root, entry.path[offset:])
+            walked.add(path)
+            known = self._files.get(path)
+            if entry.is_folder:
+                self._store_folder(build_stats(entry.path, entry.stats))
+            elif known is not None and known.matches(entry.stats):
+                for listener in self._listeners:
+                    listener.file_updated(known, None)
+            else:
+                notes.append(entry)
+
+        pool = get_parse_pool()
+        if pool is not None and len(notes) > PARSE_BATCH_SIZE:
+            self._store_parsed_notes(pool, [entry.path for entry in notes])
+            return walked
+
+        for entry in notes:
+            try:
+                self._store_file(entry.path, entry.stats, read_text(entry.path))
+            except (FileNotFoundError, UnicodeDecodeError):
+                logger.warning("Skipping unreadable file %s", entry.path)
+        return walked
+
+    def _store_parsed_notes(self, pool: ProcessPoolExecutor, full_file_paths: list[str]) -> None:
+        # Workers skip unreadable notes, so only the notes they read come back.
+        for note in iter_parsed_notes(pool, full_file_paths):
+            self._store_entry(note.path, note.stats, note.frontmatter, note.body)
+
+    def _touch_parents(self, full_path: str) -> None:
+        # Creating or removing an entry changes the mtime of its parent, and
+        # os.makedirs() may have created several missing ancestors at once.
+        parent = os.path.dirname(full_path)
+        while os.path.abspath(parent) != os.path.abspath(self.vault_path):
+            try:
+                metadata = build_stats(parent, os.stat(parent))
+            except FileNotFoundError:
+                return
+            known = self._store_folder(metadata)
+            if known:
+                return
+            parent = os.path.dirname(parent)
+
+    def _store_folder(self, metadata: dict) -> bool:
+        """Store folder metadata and return whether the folder was already indexed."""
+        with self._lock:
+            previous = self._folders.get(metadata["path"])
+            if previous != metadata:
+                self._folders[metadata["path"]] = metadata
+                self.generation += 1
+            if previous is None:
+                self._record_change("created", ResourceType.FOLDER, metadata["path"])
+            return previous is not None
+
+    def _record_change(self, change: ChangeType, resource_type: ResourceType, path: str) -> None:
+        # Called with the lock held, so the journal orders changes as the index applied them.
+        if not self._journaling:
+            return
+        for destination, source in self._moves.items():
+            if path == source or path.startswith(source + os.sep):
+                if change == "deleted":
+                    return
+            elif change == "created" and (path == destination or path.startswith(destination + os.sep)):
+                self.changes.record("moved", resource_type, path, source + path[len(destination):])
+                return
+        self.changes.record(change, resource_type, path)
+
+# Index Lifecycle
+
+_vault_index: Optional[VaultIndex] = None
+_vault_index_lock = threading.Lock()
+
+def _load_vault_index(vault_path: str) -> VaultIndex:
+    global _vault_index
+    with _vault_index_lock:
+        if _vault_index is None or _vault_index.vault_path != vault_path:
+            close_vault_index()
+            index = VaultIndex(vault_path)
+            if os.getenv("OBSIDIAN_API_WATCH_ENABLED", "true").lower() == "true":
+                index.start_watching()
+            index.build()
+            index.start_snapshots()
+            _vault_index = index
+        return _vault_index
+
+def vault_index_ready() -> bool:
+    index = _vault_index
+    return index is not None and index.vault_path == get_vault_path()
+
+async def get_vault_index() -> VaultIndex:
+    vault_path = get_vault_path()
+    index = _vault_index
+    if index is not None and index.vault_path == vault_path:
+        return index
+    return await run_in_worker(_load_vault_index, vault_path)
+
+def close_vault_index() -> None:
+    global _vault_index
+    if _vault_index is not None:
+        _vault_index.close()
+        _vault_index = None
+    # Only the index uses the parse and walker pools, and the next build
+    # starts them again.
+    close_parse_pool()
+    close_walker_pool()
+
+# For processes that never run the app's lifespan, like the MCP server.
+atexit.register(close_vault_index)
+
+# Response Generators
+
+def markdown_file_data(entry: FileEntry, body: Optional[str]) -> dict:
+    return {
+        "metadata": entry.metadata,
+        "content": {
+            "frontmatter": entry.frontmatter,
+            "body": body
+        }
+    }
+
+# Read routes encode these dicts with pydantic-core as they are: the index
+# built them from trusted stats and parsed frontmatter, so validating them into
+# MarkdownFile models first would only cost time. The models still describe
+# the responses in the OpenAPI schema.
+
+def encode_json(data) -> bytes:
+    # YAML's .nan and .inf are not valid JSON; the response models encode them as null too.
+    return to_json(data, inf_nan_mode="null")
+
+def lookup_markdown_file(index: VaultIndex, full_file_path: str, fields: Optional[list[str]] = None, stats: Optional[os.stat_result] = None) -> dict:
+    """Read a file through the index, whole or, if fields are given, as a projection that only reads what they need."""
+    include_body = fields is None or fields_overlap(fields, "content.body")
+    include_frontmatter = fields is None or fields_overlap(fields, "content.frontmatter")
+    entry, body = index.lookup_file(full_file_path, include_body, include_frontmatter, stats)
+    if fields is None:
+        return markdown_file_data(entry, body)
+    return project_fields(markdown_file_data(entry, body), fields)
+
+async def read_markdown_file_batch(full_file_paths: list[str], fields: Optional[list[str]] = None) -> list[Optional[dict]]:
+    """Read many files with bounded concurrency, in order; None marks a file that vanished before it was read."""
+    index = await get_vault_index()
+    limiter = anyio.CapacityLimiter(BATCH_READ_CONCURRENCY)
+    results: list[Optional[dict]] = [None] * len(full_file_paths)
+
+    async def read(position: int, full_file_path: str) -> None:
+        try:
+            async with limiter:
+                results[position] = await run_in_worker(lookup_markdown_file, index, full_file_path, fields)
+        except FileNotFoundError:
+            return
+
+    async with anyio.create_task_group() as task_group:
+        for position, full_file_path in enumerate(full_file_paths):
+            task_group.start_soon(read, position, full_file_path)
+    return results
+
+async def record_written_file(full_file_path: str, markdown_file: MarkdownFile) -> os.stat_result:
+    """Index a file returned by a write helper and return its current stat."""
+    index = await get_vault_index()
+    return await run_in_worker(index.store_written_file, full_file_path, markdown_file)
+
+async def get_file_entries(after: Optional[str] = None, limit: Optional[int] = None) -> tuple[list[FileEntry], Optional[str]]:
+    """Return a page of file entries in path order and the path the next page starts after."""
+    index = await get_vault_index()
+    entries = index.files(after, limit + 1 if limit is not None else None)
+    if limit is not None and len(entries) > limit:
+        entries = entries[:limit]
+        return entries, entries[-1].metadata["path"]
+    return entries, None
+
+def _markdown_files_json(index: VaultIndex, entries: list[FileEntry]) -> bytes:
+    return encode_json([markdown_file_data(entry, body) for entry, body in index.read_files(entries)])
+
+async def get_markdown_files_json(entries: list[FileEntry]) -> bytes:
+    """Read and encode a listing of whole files on a worker."""
+    index = await get_vault_index()
+    return await run_in_worker(_markdown_files_json, index, entries)
+
+async def iter_markdown_file_data(entries: list[FileEntry], fields: Optional[list[str]] = None, batch_size: int = 64) -> AsyncIterator[dict]:
+    # Bodies are only read from disk when a selected field needs them; metadata
+    # and frontmatter come straight from the index.
+    if fields is not None and not fields_overlap(fields, "content.body"):
+        for entry in entries:
+            yield project_fields(markdown_file_data(entry, None), fields)
+        return
+
+    index = await get_vault_index()
+    for start in range(0, len(entries), batch_size):
+        items = await run_in_worker(index.read_files, entries[start:start + batch_size])
+        for entry, body in items:
+            data = markdown_file_data(entry, body)
+            yield data if fields is None else project_fields(data, fields)
+
+def folder_model(metadata: dict) -> Folder:
+    return Folder(
+        metadata=FolderMetadata(**metadata)
+    )
+
+async def get_folder_model(full_folder_path: str) -> Folder:
+    index = await get_vault_index()
+    return folder_model(await run_in_worker(index.update_folder, full_folder_path))
+
+def _create_folder(index: VaultIndex, full_folder_path: str) -> dict:
+    os.makedirs(full_folder_path, exist_ok=True)
+    return index.update_folder(full_folder_path)
+
+async def create_folder_model(full_folder_path: str) -> Folder:
+    index = await get_vault_index()
+    return folder_model(await run_in_worker(_create_folder, index, full_folder_path))
+
+async def get_folder_models() -> list[Folder]:
+    index = await get_vault_index()
+    return [folder_model(metadata) for metadata in index.folders()]
+
+async def get_note_links(full_file_path: str) -> list[NoteLink]:
+    index = await get_vault_index()
+    return [NoteLink(**link) for link in index.links.links(index.relative(full_file_path))]
+
+async def get_note_backlinks(full_file_path: str) -> list[Backlink]:
+    index = await get_vault_index()
+    return [Backlink(**link) for link in index.links.backlinks(index.relative(full_file_path))]
+
+async def get_folder_manifest(full_folder_path: str) -> Optional[FolderManifest]:
+    index = await get_vault_index()
+    folder = index.relative(full_folder_path)
+    folder = "" if folder == "." else folder
+    manifest = await run_in_worker(index.manifest, folder)
+    if manifest is None:
+        return None
+    digest, entries = manifest
+    return FolderManifest(
+        path=folder,
+        digest=digest,
+        entries=[ManifestEntry(name=name, type=resource_type, hash=content_hash) for name, resource_type, content_hash in entries]
+    )
+
+async def get_change_journal() -> ChangeJournal:
+    index = await get_vault_index()
+    return index.changes
+
+async def get_tag_counts() -> list[TagCount]:
+    index = await get_vault_index()
+    return [TagCount(**tag) for tag in index.tags.tags()]
+
+async def get_tagged_file_metadata(tag: str, after: Optional[str] = None, limit: Optional[int] = None) -> tuple[list[FileMetadata], Optional[str]]:
+    """Return a page of the metadata of the files carrying a tag, in path order, and the path the next page starts after."""
+    index = await get_vault_index()
+    paths = index.tags.files(tag, after, limit + 1 if limit is not None else None)
+    next_path = None
+    if limit is not None and len(paths) > limit:
+        paths = paths[:limit]
+        next_path = paths[-1]
+    return [FileMetadata(**entry.metadata) for entry in index.entries(paths)], next_path
+
+def _move_path(index: VaultIndex, full_source_path: str, full_destination_path: str) -> None:
+    os.makedirs(os.path.dirname(full_destination_path), exist_ok=True)
+    os.rename(full_source_path, full_destination_path)
+    index.move(full_source_path, full_destination_path)
+
+async def move_path(full_source_path: str, full_destination_path: str) -> None:
+    """Move a file or folder on disk and in the index."""
+    index = await get_vault_index()
+    return await run_in_worker(_move_path, index, full_source_path, full_destination_path)
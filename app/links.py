@@ -0,0 +1,183 @@
+"""
+Outgoing-link and backlink graph of the vault.
+
+Each note is parsed once for [[wikilinks]], ![[embeds]] and relative markdown
+links when the vault index stores it. Links are kept by normalized target, and
+resolved against the current set of notes at query time. A link therefore
+resolves as soon as its target note is created, and backlink lookups only
+touch the links pointing at the note's possible names.
+"""
+import os
+import posixpath
+import re
+import threading
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import unquote
+
+from app.utils import read_text, split_markdown_body
+
+if TYPE_CHECKING:
+    from app.index import FileEntry
+
+WIKILINK_PATTERN = re.compile(r"!?\[\[([^\[\]|#^]*)(?:[#^][^\[\]|]*)?(?:\|[^\[\]]*)?\]\]")
+MARKDOWN_LINK_PATTERN = re.compile(r"!?\[[^\]]*\]\(<?([^)<>\s]+)>?(?:\s+\"[^\"]*\")?\)")
+FENCED_CODE_PATTERN = re.compile(r"^(```|~~~).*?^\1", re.MULTILINE | re.DOTALL)
+INLINE_CODE_PATTERN = re.compile(r"`[^`\n]*`")
+ATTACHMENT_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".svg", ".webp", ".avif",
+    ".pdf", ".mp3", ".wav", ".ogg", ".m4a", ".flac", ".mp4", ".webm", ".mov", ".mkv",
+    ".canvas", ".base", ".excalidraw"
+}
+
+def _link_key(target: str) -> str:
+    key = target.strip().lower()
+    return key[:-3] if key.endswith('.md') else key
+
+def _vault_path(path: str) -> str:
+    return path.replace(os.sep, '/')
+
+def _suffix_keys(path: str) -> set[str]:
+    # Every key a link can use to reach a note, e.g. "c", "b/c" and "a/b/c" for a/b/c.md.
+    parts = _link_key(path).split('/')
+    return {'/'.join(parts[i:]) for i in range(len(parts))}
+
+def strip_code(body: str) -> str:
+    return INLINE_CODE_PATTERN.sub("", FENCED_CODE_PATTERN.sub("", body))
+
+def parse_links(source_path: str, body: str, frontmatter_data: Optional[dict] = None) -> list[tuple[str, str]]:
+    """Return the (target as written, normalized key) of every note link in a note, in order."""
+    text = strip_code(body)
+    if frontmatter_data:
+        text = repr(frontmatter_data) + "\n" + text
+
+    links = []
+    for match in WIKILINK_PATTERN.finditer(text):
+        target = match.group(1).strip()
+        if target and os.path.splitext(target)[1].lower() not in ATTACHMENT_EXTENSIONS:
+            links.append((target, _link_key(target)))
+
+    source_folder = posixpath.dirname(_vault_path(source_path))
+    for match in MARKDOWN_LINK_PATTERN.finditer(text):
+        target = unquote(match.group(1).split('#', 1)[0])
+        if not target.endswith('.md') or '://' in target or target.startswith('mailto:'):
+            continue
+        if target.startswith('/'):
+            resolved = posixpath.normpath(target.lstrip('/'))
+        else:
+            resolved = posixpath.normpath(posixpath.join(source_folder, target))
+        if not resolved.startswith('..'):
+            links.append((target, _link_key(resolved)))
+    return links
+
+class LinkIndex:
+    def __init__(self, vault_path: str):
+        self.vault_path = vault_path
+        self._outgoing: dict[str, list[tuple[str, str]]] = {}
+        self._incoming: dict[str, set[str]] = {}
+        self._stamps: dict[str, tuple[int, int]] = {}
+        self._suffixes: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    # Vault Index Events
+
+    def build_started(self) -> None:
+        pass
+
+    def build_finished(self, paths: set[str]) -> None:
+        pass
+
+    def file_updated(self, entry: "FileEntry", body: Optional[str]) -> None:
+        path = _vault_path(entry.metadata["path"])
+        if self._stamps.get(path) == (entry.mtime_ns, entry.size):
+            return
+        if body is None:
+            try:
+                body = split_markdown_body(read_text(os.path.join(self.vault_path, entry.metadata["path"])))
+            except (FileNotFoundError, UnicodeDecodeError):
+                return
+
+        links = parse_links(path, body, entry.frontmatter)
+        with self._lock:
+            self._drop(path)
+            self._stamps[path] = (entry.mtime_ns, entry.size)
+            for key in _suffix_keys(path):
+                self._suffixes.setdefault(key, set()).add(path)
+            self._outgoing[path] = links
+            for _, key in links:
+                self._incoming.setdefault(key, set()).add(path)
+
+    def file_removed(self, path: str) -> None:
+        with self._lock:
+            self._drop(_vault_path(path))
+
+    # Snapshots
+
+    def export_state(self) -> dict:
+        with self._lock:
+            return {
+                "outgoing": dict(self._outgoing),
+                "incoming": {key: set(paths) for key, paths in self._incoming.items()},
+                "stamps": dict(self._stamps),
+                "suffixes": {key: set(paths) for key, paths in self._suffixes.items()}
+            }
+
+    def restore_state(self, state: dict) -> None:
+        with self._lock:
+            self._outgoing = state["outgoing"]
+            self._incoming = state["incoming"]
+            self._stamps = state["stamps"]
+            self._suffixes = state["suffixes"]
+
+    # Queries
+
+    def links(self, path: str) -> list[dict]:
+        path = _vault_path(path)
+        with self._lock:
+            return [
+                {"target": target, "path": self._resolve(key, path)}
+                for target, key in self._outgoing.get(path, [])
+            ]
+
+    def backlinks(self, path: str) -> list[dict]:
+        path = _vault_path(path)
+        backlinks = []
+        with self._lock:
+            for key in _suffix_keys(path):
+                for source in self._incoming.get(key, ()):
+                    if self._resolve(key, source) != path:
+                        continue
+                    for target, link_key in self._outgoing[source]:
+                        if link_key == key:
+                            backlinks.append({"path": source, "target": target})
+        return sorted(backlinks, key=lambda link: (link["path"], link["target"]))
+
+    # Internal Helpers
+
+    def _resolve(self, key: str, source: str) -> Optional[str]:
+        matches = self._suffixes.get(key)
+        if not matches:
+            return None
+        # Like Obsidian, prefer an exact path, then a note next to the linking
+        # note, then the shortest path.
+        source_folder = posixpath.dirname(source)
+        return min(matches, key=lambda match: (
+            _link_key(match) != key,
+            posixpath.dirname(match) != source_folder,
+            match.count('/'),
+            match
+        ))
+
+    def _drop(self, path: str) -> None:
+        for _, key in self._outgoing.pop(path, []):
+            sources = self._incoming.get(key)
+            if sources is not None:
+                sources.discard(path)
+                if not sources:
+                    del self._incoming[key]
+        if self._stamps.pop(path, None) is not None:
+            for key in _suffix_keys(path):
+                paths = self._suffixes.get(key)
+                if paths is not None:
+                    paths.discard(path)
+                    if not paths:
+                        del self._suffixes[key]
@@ -0,0 +1,124 @@
+"""
+Per-path locks for read-modify-write operations.
+
+Operations on the same path are serialized, while operations on different
+paths never wait for each other. A lock only exists while it is held or
+awaited, so the manager holds no state for idle paths.
+
+Frontmatter merges are group-committed: merges that arrive while an earlier
+write to the same note holds its lock join a batch, and the first of them to
+get the lock applies them all, in arrival order, in one parse and write.
+Only merges that queue back to back share a batch: any other writer that
+queues on the note closes it, so a merge that arrives after that writer is
+applied after it. A merge whose caller is cancelled while it waits is dropped
+from its batch.
+"""
+import asyncio
+import os
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+@dataclass
+class _PathLock:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+@dataclass
+class _MergeBatch:
+    merges: list[tuple[dict, asyncio.Future]] = field(default_factory=list)
+
+class PathLockManager:
+    def __init__(self):
+        self._locks: dict[str, _PathLock] = {}
+        # The batch a merge arriving now would join, per path.
+        self._open_batches: dict[str, _MergeBatch] = {}
+        self.max_queue_depth = 0
+        self.coalesced_writes = 0
+
+    @asynccontextmanager
+    async def hold(self, *full_paths: str) -> AsyncIterator[None]:
+        """Hold the locks of one or more paths, always acquired in sorted order."""
+        full_paths = sorted({os.path.normpath(full_path) for full_path in full_paths})
+        # Merges arriving after this writer must not be folded into a batch
+        # that is applied before it.
+        for full_path in full_paths:
+            self._open_batches.pop(full_path, None)
+        async with AsyncExitStack() as stack:
+            for full_path in full_paths:
+                await stack.enter_async_context(self._hold(full_path))
+            yield
+
+    @asynccontextmanager
+    async def _hold(self, full_path: str) -> AsyncIterator[None]:
+        path_lock = self._locks.setdefault(full_path, _PathLock())
+        path_lock.users += 1
+        self.max_queue_depth = max(self.max_queue_depth, path_lock.users - 1)
+        try:
+            async with path_lock.lock:
+                yield
+        finally:
+            path_lock.users -= 1
+            if path_lock.users == 0:
+                del self._locks[full_path]
+
+    async def merge(self, full_path: str, frontmatter_data: dict, write: Callable[[str, dict], Awaitable[T]]) -> T:
+        """Merge frontmatter into a note, coalescing with merges queued right behind it.
+
+        Every coalesced caller gets the result of the single write that applied its merge.
+        """
+        full_path = os.path.normpath(full_path)
+        future = asyncio.get_running_loop().create_future()
+        batch = self._open_batches.setdefault(full_path, _MergeBatch())
+        batch.merges.append((frontmatter_data, future))
+        try:
+            async with self._hold(full_path):
+                if future.done():
+                    # A merge of the same batch got the lock first and has written this one.
+                    return future.result()
+
+                if self._open_batches.get(full_path) is batch:
+                    del self._open_batches[full_path]
+                merges, batch.merges = batch.merges, []
+                merged: dict = {}
+                for data, _ in merges:
+                    merged.update(data)
+                self.coalesced_writes += len(merges) - 1
+                try:
+                    result = await write(full_path, merged)
+                except BaseException as exc:
+                    for _, waiter in merges:
+                        if waiter is not future and not waiter.done():
+                            waiter.set_exception(exc)
+                    raise
+                for _, waiter in merges:
+                    if not waiter.done():
+                        waiter.set_result(result)
+                return result
+        finally:
+            # Only still in the batch if the caller was cancelled while waiting
+            # for the lock; its client saw the request fail, so it must not be applied.
+            batch.merges = [merge for merge in batch.merges if merge[1] is not future]
+            if not batch.merges and self._open_batches.get(full_path) is batch:
+                del self._open_batches[full_path]
+
+    def queue_depth(self) -> int:
+        return sum(path_lock.users - 1 for path_lock in self._locks.values())
+
+    def stats(self) -> dict:
+        return {
+            "locked_paths": len(self._locks),
+            "queue_depth": self.queue_depth(),
+            "max_queue_depth": self.max_queue_depth,
+            "coalesced_writes": self.coalesced_writes
+        }
+
+_path_locks: Optional[PathLockManager] = None
+
+def get_path_locks() -> PathLockManager:
+    global _path_locks
+    if _path_locks is None:
+        _path_locks = PathLockManager()
+    return _path_locks
@@ -1,14 +1,45 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, status
 from fastapi.exceptions import RequestValidationError
 from fastmcp import FastMCP
+from fastmcp.server.openapi import RouteMap, RouteType
+from app.batch_routes import batch_router
+from app.change_routes import change_router
+from app.compression import CompressionMiddleware
 from app.file_routes import file_router
 from app.folder_routes import folder_router
+from app.health_routes import health_router
+from app.index import close_vault_index, get_vault_index
+from app.manifest_routes import manifest_router
+from app.metrics_routes import metrics_router
+from app.search_routes import search_router
+from app.tag_routes import tag_router
 from app.path_validation import validation_exception_handler
 
+logger = logging.getLogger(__name__)
+
+async def warm_vault_index():
+    try:
+        await get_vault_index()
+    except Exception:
+        logger.exception("Could not load the vault index")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the index in the background, so the server answers /health/ready
+    # with 503 until it is warm, and save its snapshot on shutdown.
+    warm_up = asyncio.create_task(warm_vault_index())
+    yield
+    await warm_up
+    close_vault_index()
+
 app = FastAPI(
     title="Obsidian API",
     version="0.4.0",
-    description="A personal RESTful API for managing markdown files and folders in your Obsidian vault."
+    description="A personal RESTful API for managing markdown files and folders in your Obsidian vault.",
+    lifespan=lifespan
 )
 
 @app.exception_handler(FileNotFoundError)
@@ -34,12 +65,23 @@ async def file_exists_error_handler(request, exc):
 
 app.include_router(file_router)
 app.include_router(folder_router)
+app.include_router(batch_router)
+app.include_router(metrics_router)
+app.include_router(search_router)
+app.include_router(tag_router)
+app.include_router(health_router)
+app.include_router(change_router)
+app.include_router(manifest_router)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
+app.add_middleware(CompressionMiddleware)
 
 if __name__ == "__main__":
-    mcp = FastMCP.from_fastapi(app=app, exclude={
-        "put_raw_file",
-        "put_file_frontmatter",
-        "put_file_body"
-    })
+    mcp = FastMCP.from_fastapi(app=app, route_maps=[
+        # Search takes arguments, so expose it as a tool rather than a resource
+        RouteMap(methods=["GET"], pattern=r"^/search/$", route_type=RouteType.TOOL),
+        # The change feed streams until the client disconnects, and health
+        # checks are for orchestrators, so neither is an MCP resource
+        RouteMap(methods=["GET"], pattern=r"^/changes/$", route_type=RouteType.IGNORE),
+        RouteMap(methods=["GET"], pattern=r"^/health/", route_type=RouteType.IGNORE)
+    ])
     mcp.run(transport="streamable-http", host="0.0.0.0", port=8001)
@@ -0,0 +1,52 @@
+"""
+Merkle manifests of the vault for delta sync.
+
+A note's hash is the SHA-256 of its bytes. A folder's digest is the SHA-256
+of one line per child, "file <hash> <name>\\n" or "folder <digest> <name>\\n",
+in name order, so it changes whenever a note or folder below it is added,
+removed, renamed or edited. A client mirroring the vault compares the digest
+of the root with its copy and descends only into the folders that differ, so
+a sync round on an unchanged vault costs a single small response.
+
+Note hashes are computed on first use and kept on the index entry, where
+they stay valid while the note keeps its (mtime, size), and are saved with
+the index snapshot. Folder digests are computed for the whole vault at once
+and reused until the index changes.
+"""
+import hashlib
+import os
+
+from app.models import ResourceType
+
+# A child of a folder: (name, type, hash of a note or digest of a folder).
+ChildDigest = tuple[str, ResourceType, str]
+
+def hash_note(full_file_path: str) -> tuple[str, os.stat_result]:
+    """Return the SHA-256 of a note and the stat it was read at."""
+    with open(full_file_path, 'rb') as f:
+        stats = os.fstat(f.fileno())
+        return hashlib.file_digest(f, "sha256").hexdigest(), stats
+
+def folder_digest(entries: list[ChildDigest]) -> str:
+    lines = "".join(f"{resource_type} {content_hash} {name}\n" for name, resource_type, content_hash in sorted(entries))
+    return hashlib.sha256(lines.encode('utf-8')).hexdigest()
+
+def build_manifests(note_hashes: dict[str, str], folders: list[str]) -> dict[str, tuple[str, list[ChildDigest]]]:
+    """Return the digest and sorted children of every folder, keyed by relative path; "" is the vault root."""
+    children: dict[str, list[ChildDigest]] = {"": []}
+    for folder in folders:
+        children[folder] = []
+    for path, content_hash in note_hashes.items():
+        parent, name = os.path.split(path)
+        children.setdefault(parent, []).append((name, ResourceType.FILE, content_hash))
+
+    # Deepest folders first, so every digest is ready before its parent's.
+    manifests = {}
+    for folder in sorted(children, key=lambda folder: folder.count(os.sep) + 1 if folder else 0, reverse=True):
+        entries = sorted(children[folder])
+        digest = folder_digest(entries)
+        manifests[folder] = (digest, entries)
+        if folder:
+            parent, name = os.path.split(folder)
+            children[parent].append((name, ResourceType.FOLDER, digest))
+    return manifests
@@ -0,0 +1,51 @@
+# Third-party imports
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response, status
+from typing import Annotated
+
+# Local application imports
+from app.authentication import ObsidianHTTPBearer
+from app.conditional import check_not_modified
+from app.index import get_folder_manifest
+from app.models import FolderManifest
+from app.path_validation import validate_folder_path
+from app.utils import get_vault_path
+
+# Router setup
+obsidian_security = ObsidianHTTPBearer()
+manifest_router = APIRouter(
+    prefix="/manifest",
+    tags=["manifest"],
+    dependencies=[Depends(obsidian_security)]
+)
+
+async def _read_manifest(request: Request, response: Response, vault_folder_path: str, full_folder_path: str) -> FolderManifest:
+    manifest = await get_folder_manifest(full_folder_path)
+    if manifest is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Folder not found: {vault_folder_path}")
+    # The digest versions everything below the folder, so it is the ETag.
+    check_not_modified(request, response, f'"{manifest.digest}"')
+    return manifest
+
+# Read operations
+@manifest_router.get(
+    "/",
+    operation_id="getVaultManifest",
+    summary="Get Vault Manifest",
+    description="Get the Merkle manifest of the vault root: its digest and the hash of every note and digest of every folder directly in it. A folder's digest changes whenever anything below it does, so a client syncing a copy of the vault only descends, with `GET /manifest/{path}`, into the folders whose digest differs from its copy. The digest is also the ETag."
+)
+async def read_vault_manifest(request: Request, response: Response) -> FolderManifest:
+    return await _read_manifest(request, response, "", get_vault_path())
+
+@manifest_router.get(
+    "/{vault_folder_path:path}",
+    operation_id="getFolderManifest",
+    summary="Get Folder Manifest",
+    description="Get the Merkle manifest of a folder: its digest and the hash of every note and digest of every folder directly in it, as for `GET /manifest`."
+)
+async def read_folder_manifest(
+    request: Request,
+    response: Response,
+    vault_folder_path: Annotated[str, Path(..., description="The path of the folder")],
+    full_folder_path: Annotated[str, Depends(validate_folder_path)]
+) -> FolderManifest:
+    return await _read_manifest(request, response, vault_folder_path, full_folder_path)
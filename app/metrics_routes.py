@@ -0,0 +1,32 @@
+# Third-party imports
+from fastapi import APIRouter, Depends
+
+# Local application imports
+from app.authentication import ObsidianHTTPBearer
+from app.cache import get_content_cache
+from app.compression import get_compression_cache
+from app.locks import get_path_locks
+from app.workers import get_loop_lag_monitor
+
+# Router setup
+obsidian_security = ObsidianHTTPBearer()
+metrics_router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(obsidian_security)]
+)
+
+# Read operations
+@metrics_router.get(
+    "/",
+    operation_id="getMetrics",
+    summary="Get Metrics",
+    description="Report runtime metrics of the API, such as the hits, misses and evictions of the note content cache and of the cache of compressed responses, the queue depth and coalesced writes of the per-path write locks, and how late the event loop runs scheduled callbacks."
+)
+async def read_metrics() -> dict:
+    return {
+        "content_cache": get_content_cache().stats(),
+        "compression_cache": get_compression_cache().stats(),
+        "path_locks": get_path_locks().stats(),
+        "loop_lag": get_loop_lag_monitor().stats()
+    }
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import Annotated, Optional, Literal, Union
 from enum import StrEnum
 from datetime import datetime
 
@@ -35,3 +35,79 @@ class Folder(BaseModel):
 
 class PathModel(BaseModel):
     path: Optional[str] = Field(None, description="Target path for moving or renaming a file, relative to the vault root")
+
+class SearchResult(BaseModel):
+    path: str = Field(..., description="Full relative path of the matching file from the vault root")
+    score: float = Field(..., description="Relevance of the match; higher is better")
+    snippet: str = Field(..., description="Excerpt around the best match, with matched terms wrapped in **")
+
+class NoteLink(BaseModel):
+    target: str = Field(..., description="Link target as written in the note, e.g. 'Project Plan' for [[Project Plan|the plan]]")
+    path: Optional[str] = Field(None, description="Full relative path of the file the link resolves to, or null if no such file exists yet")
+
+class Backlink(BaseModel):
+    path: str = Field(..., description="Full relative path of the file containing the link")
+    target: str = Field(..., description="Link target as written in the linking file")
+
+class TagCount(BaseModel):
+    tag: str = Field(..., description="Tag name without the leading #, lowercased; nested tags use / as in 'project/alpha'")
+    count: int = Field(..., description="Number of files carrying the tag or one of its nested tags")
+
+class BatchGetRequest(BaseModel):
+    paths: list[str] = Field(..., min_length=1, max_length=500, description="Paths of the files to read, relative to the vault root")
+    fields: Optional[list[str]] = Field(None, description="Fields to return for each file, e.g. ['metadata.path', 'content.frontmatter.tags']. Omit to return whole files.")
+
+class BatchGetResult(BaseModel):
+    path: str = Field(..., description="Path of the file as given in the request")
+    status: int = Field(..., description="HTTP status of this item, e.g. 200, or 404 if the file does not exist")
+    file: Optional[MarkdownFile] = Field(None, description="The file, or the selected fields of it, when status is 200")
+    detail: Optional[str] = Field(None, description="Why the file could not be read, when status is not 200")
+
+class CreateFileOperation(BaseModel):
+    op: Literal["create"] = Field(..., description="Create a new markdown file, like POST /files/{path}")
+    path: str = Field(..., description="Path of the file to create, relative to the vault root")
+    frontmatter: Optional[dict] = Field(None, description="YAML frontmatter of the new file")
+    body: Optional[str] = Field(None, description="Markdown body of the new file")
+
+class PutBodyOperation(BaseModel):
+    op: Literal["put_body"] = Field(..., description="Replace the body of a file, like PUT /files/{path}/body")
+    path: str = Field(..., description="Path of the file to update, relative to the vault root")
+    body: str = Field(..., description="New markdown body of the file")
+
+class MergeFrontmatterOperation(BaseModel):
+    op: Literal["merge_frontmatter"] = Field(..., description="Merge into the frontmatter of a file, like PATCH /files/{path}/frontmatter")
+    path: str = Field(..., description="Path of the file to update, relative to the vault root")
+    frontmatter: dict = Field(..., description="Frontmatter keys to add or replace")
+
+class MoveOperation(BaseModel):
+    op: Literal["move"] = Field(..., description="Move or rename a file or folder, like PATCH /files/{path}/metadata or PATCH /folders/{path}")
+    path: str = Field(..., description="Path of the file or folder to move, relative to the vault root")
+    destination: str = Field(..., description="New path of the file or folder, relative to the vault root")
+
+BatchOperation = Annotated[
+    Union[CreateFileOperation, PutBodyOperation, MergeFrontmatterOperation, MoveOperation],
+    Field(discriminator="op")
+]
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(..., min_length=1, max_length=10000, description="Operations to apply, in order")
+    atomic: bool = Field(False, description="If true, undo every applied operation as soon as one fails")
+
+class BatchOperationResult(BaseModel):
+    status: int = Field(..., description="HTTP status of this operation, as the matching single-file route would return it; 424 if it was rolled back or skipped because another operation failed")
+    path: str = Field(..., description="Path of the file or folder after the operation")
+    detail: Optional[str] = Field(None, description="Why the operation failed or was not applied")
+
+class BatchResponse(BaseModel):
+    committed: bool = Field(..., description="False if the batch was atomic and an operation failed, in which case no operation was kept")
+    results: list[BatchOperationResult] = Field(..., description="One result per operation, in request order")
+
+class ManifestEntry(BaseModel):
+    name: str = Field(..., description="Name of the file or folder")
+    type: ResourceType = Field(..., description="Whether the entry is a file or a folder")
+    hash: str = Field(..., description="SHA-256 of the file's bytes, or the digest of the folder, in hex")
+
+class FolderManifest(BaseModel):
+    path: str = Field(..., description="Full relative path of the folder from the vault root; empty for the root itself")
+    digest: str = Field(..., description="SHA-256 over one line per entry, '<type> <hash> <name>\\n', in name order; changes whenever anything below the folder does")
+    entries: list[ManifestEntry] = Field(..., description="Notes and subfolders directly in the folder, in name order")
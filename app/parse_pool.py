@@ -0,0 +1,100 @@
+"""
+Process pool for parsing frontmatter in bulk.
+
+YAML parsing is CPU-bound and holds the GIL, so a scan that parses every note
+uses one core however many the host has. With OBSIDIAN_API_PARSE_PROCESSES
+set, index builds and rescans send batches of paths to worker processes,
+which read and parse the notes and send back the stat each note was read
+at, its frontmatter and its body. The index stores them as they are, without
+opening the notes again, so the parent does no file I/O per note; a note
+changed after its worker read it is picked up by the watcher like any other
+change.
+The frontmatter codec is resolved when the pool starts and handed to the
+workers, so codecs registered at runtime reach them too.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import yaml
+
+from app.utils import FrontmatterCodec, get_frontmatter_codec, parse_markdown, read_text_with_stats, register_frontmatter_codec, split_markdown_body
+
+logger = logging.getLogger(__name__)
+
+# Notes sent to a worker process at once.
+PARSE_BATCH_SIZE = 256
+
+@dataclass(slots=True)
+class ParsedNote:
+    path: str
+    stats: os.stat_result
+    frontmatter: Optional[dict]
+    body: str
+
+def parse_notes(full_file_paths: list[str]) -> list[ParsedNote]:
+    """Read and parse a batch of notes; runs in a worker process and skips unreadable notes."""
+    notes = []
+    for full_file_path in full_file_paths:
+        try:
+            content, stats = read_text_with_stats(full_file_path)
+        except (FileNotFoundError, UnicodeDecodeError):
+            continue
+        try:
+            body, frontmatter_data = parse_markdown(content)
+        except (yaml.YAMLError, ValueError):
+            # ValueError covers malformed JSON and TOML frontmatter.
+            logger.warning("Could not parse frontmatter of %s", full_file_path)
+            body, frontmatter_data = split_markdown_body(content), None
+        notes.append(ParsedNote(full_file_path, stats, frontmatter_data, body))
+    return notes
+
+def _init_worker(codec: FrontmatterCodec) -> None:
+    register_frontmatter_codec(codec)
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the parse pool, or None unless OBSIDIAN_API_PARSE_PROCESSES enables it."""
+    global _parse_pool
+    processes = int(os.getenv("OBSIDIAN_API_PARSE_PROCESSES", "0"))
+    if processes < 1:
+        return None
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            # Raises for an unknown codec here rather than in every worker.
+            codec = get_frontmatter_codec()
+            # Forking a process that runs the watcher and worker threads could
+            # copy a held lock into the child, so workers are spawned.
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(codec,)
+            )
+        return _parse_pool
+
+def iter_parsed_notes(pool: ProcessPoolExecutor, full_file_paths: list[str]) -> Iterator[ParsedNote]:
+    """Parse notes on the pool, yielding them batch by batch as the batches finish."""
+    futures = [
+        pool.submit(parse_notes, full_file_paths[start:start + PARSE_BATCH_SIZE])
+        for start in range(0, len(full_file_paths), PARSE_BATCH_SIZE)
+    ]
+    try:
+        for future in as_completed(futures):
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+def close_parse_pool() -> None:
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(cancel_futures=True)
+            _parse_pool = None
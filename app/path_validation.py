@@ -1,24 +1,35 @@
+import binascii
 import os
-from fastapi import HTTPException, Request, status
+import stat
+from fastapi import HTTPException, Query, Request, status
 from fastapi.exceptions import RequestValidationError
-from typing import Optional
-from app.utils import get_vault_path, is_hidden
+from typing import Annotated, Optional, Union
+from app.models import FileMetadata, MarkdownContent
+from app.utils import decode_cursor, get_vault_path, is_hidden
+from app.workers import run_in_worker
 
 def _get_full_path(vault_relative_path: str) -> str:
     return os.path.join(get_vault_path(), vault_relative_path)
 
-def _validate_path(
-    vault_relative_path: str,
-    must_exist: bool = True,
-    must_be_markdown: bool = False
-) -> str:
+def _check_path(vault_relative_path: str, is_folder: bool) -> str:
+    # The checks that need no filesystem access.
     full_path = _get_full_path(vault_relative_path)
 
     if not os.path.abspath(full_path).startswith(os.path.abspath(get_vault_path())):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid path")
     
-    if is_hidden(full_path):
+    if is_hidden(full_path, is_folder=is_folder):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Path not found: {vault_relative_path}")
+
+    return full_path
+
+def _validate_path(
+    vault_relative_path: str,
+    must_exist: bool = True,
+    must_be_markdown: bool = False,
+    is_folder: Optional[bool] = None
+) -> str:
+    full_path = _check_path(vault_relative_path, is_folder=not must_be_markdown if is_folder is None else is_folder)
     
     path_exists = os.path.exists(full_path)
     
@@ -51,7 +62,58 @@ def validate_new_folder(vault_folder_path: str) -> str:
     return _validate_path(vault_folder_path, must_exist=False)
 
 def validate_destination_path(vault_destination_path: str, vault_source_path: Optional[str] = None) -> str:
-    return _validate_path(vault_destination_path, must_exist=False)
+    # A move keeps the type of its source, so a file may be renamed to a
+    # dot-file just as one may be created, while a folder may not.
+    if vault_source_path is not None:
+        is_folder = os.path.isdir(_get_full_path(vault_source_path))
+    else:
+        is_folder = not vault_destination_path.endswith('.md')
+    return _validate_path(vault_destination_path, must_exist=False, is_folder=is_folder)
+
+# Read routes only check the path string in their dependency, which is async
+# so FastAPI does not hand it to a thread, and check the file itself with a
+# single stat in the worker call that reads it.
+
+async def validate_markdown_file_path(vault_file_path: str) -> str:
+    return _check_path(vault_file_path, is_folder=False)
+
+async def validate_folder_path(vault_folder_path: str) -> str:
+    return _check_path(vault_folder_path, is_folder=True)
+
+# Write routes check the path against the filesystem in their dependency, in
+# a single hop to the workers rather than on FastAPI's thread pool.
+
+async def validate_existing_markdown_file_path(vault_file_path: str) -> str:
+    return await run_in_worker(validate_existing_markdown_file, vault_file_path)
+
+async def validate_new_markdown_file_path(vault_file_path: str) -> str:
+    return await run_in_worker(validate_new_markdown_file, vault_file_path)
+
+async def validate_existing_folder_path(vault_folder_path: str) -> str:
+    return await run_in_worker(validate_existing_folder, vault_folder_path)
+
+async def validate_new_folder_path(vault_folder_path: str) -> str:
+    return await run_in_worker(validate_new_folder, vault_folder_path)
+
+def stat_markdown_file(vault_file_path: str, full_file_path: str) -> os.stat_result:
+    try:
+        stats = os.stat(full_file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Path not found: {vault_file_path}")
+    if not full_file_path.endswith('.md'):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"File must have .md extension: {vault_file_path}")
+    if not stat.S_ISREG(stats.st_mode):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Path is not a file: {vault_file_path}")
+    return stats
+
+def stat_folder(vault_folder_path: str, full_folder_path: str) -> os.stat_result:
+    try:
+        stats = os.stat(full_folder_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Path not found: {vault_folder_path}")
+    if not stat.S_ISDIR(stats.st_mode):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Path is not a folder: {vault_folder_path}")
+    return stats
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail={"errors": exc.errors()})
@@ -61,4 +123,40 @@ async def validate_utf8_content(request: Request) -> str:
     try:
         return content.decode('utf-8')
     except UnicodeDecodeError:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Content must be UTF-8 encoded text")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Content must be UTF-8 encoded text")
+
+async def validate_cursor(
+    cursor: Annotated[Optional[str], Query(description="Opaque cursor returned in the X-Next-Cursor header of the previous page")] = None
+) -> Optional[str]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def check_fields(fields: list[str]) -> Optional[list[str]]:
+    known_fields = {"metadata": FileMetadata.model_fields, "content": MarkdownContent.model_fields}
+    selected = [field.strip() for field in fields if field.strip()]
+    for field in selected:
+        parts = field.split('.')
+        if parts[0] not in known_fields or (len(parts) > 1 and parts[1] not in known_fields[parts[0]]):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown field: {field}")
+    return selected or None
+
+async def validate_fields(
+    fields: Annotated[Optional[str], Query(description="Comma-separated fields to return, e.g. `metadata,content.frontmatter.tags`. Omit to return the whole file.")] = None
+) -> Optional[list[str]]:
+    if not fields:
+        return None
+    return check_fields(fields.split(','))
+
+def validate_markdown_file_batch(vault_file_paths: list[str]) -> list[Union[str, HTTPException]]:
+    """Validate many existing markdown file paths at once, returning the full path or the error of each."""
+    results = []
+    for vault_file_path in vault_file_paths:
+        try:
+            results.append(validate_existing_markdown_file(vault_file_path))
+        except HTTPException as exc:
+            results.append(exc)
+    return results
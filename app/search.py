@@ -0,0 +1,158 @@
+"""
+Full-text search over note bodies and frontmatter.
+
+SearchIndex keeps a SQLite FTS5 table in step with the vault index: every file
+the vault index stores or drops is forwarded here. Each document remembers the
+(mtime, size) it was indexed at, so a persisted database only re-indexes the
+notes that changed while the API was down.
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from app.utils import read_text, split_markdown_body
+
+if TYPE_CHECKING:
+    from app.index import FileEntry
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes USING fts5(title, frontmatter, body, tokenize='unicode61');
+"""
+
+# Title matches outrank frontmatter matches, which outrank body matches.
+SEARCH_QUERY = """
+SELECT documents.path, -bm25(notes, 10.0, 2.0, 1.0) AS score, snippet(notes, -1, '**', '**', '…', 16)
+FROM notes JOIN documents ON documents.id = notes.rowid
+WHERE notes MATCH ?
+ORDER BY score DESC, documents.path
+LIMIT ? OFFSET ?
+"""
+
+def build_match_query(query: str) -> str:
+    # Every whitespace-separated term is quoted so user input can never be
+    # parsed as FTS5 syntax; a trailing * still makes a term a prefix match.
+    terms = []
+    for term in query.split():
+        prefix = term.endswith('*')
+        term = term.rstrip('*')
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return " ".join(terms)
+
+def get_search_database_path() -> str:
+    state_path = os.getenv("OBSIDIAN_API_STATE_PATH")
+    if not state_path:
+        return ":memory:"
+    os.makedirs(state_path, exist_ok=True)
+    return os.path.join(state_path, "search.sqlite3")
+
+class SearchIndex:
+    def __init__(self, vault_path: str, database_path: str = ":memory:"):
+        self.vault_path = vault_path
+        self._db = sqlite3.connect(database_path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._deferred = False
+        # The (mtime, size) of every document, loaded in one query while the
+        # vault index builds, so unchanged notes cost no query each.
+        self._build_stamps: Optional[dict[str, tuple[int, int]]] = None
+
+    # Vault Index Events
+
+    def build_started(self) -> None:
+        self._deferred = True
+        with self._lock:
+            self._build_stamps = {path: (mtime_ns, size) for path, mtime_ns, size in self._db.execute("SELECT path, mtime_ns, size FROM documents")}
+
+    def build_finished(self, paths: set[str]) -> None:
+        with self._lock:
+            stale = [(doc_id, path) for doc_id, path in self._db.execute("SELECT id, path FROM documents") if path not in paths]
+            for doc_id, _ in stale:
+                self._delete(doc_id)
+            self._db.commit()
+            self._deferred = False
+            self._build_stamps = None
+
+    def file_updated(self, entry: "FileEntry", body: Optional[str]) -> None:
+        path = entry.metadata["path"]
+        build_stamps = self._build_stamps
+        if build_stamps is not None:
+            if build_stamps.get(path) == (entry.mtime_ns, entry.size):
+                return
+        else:
+            with self._lock:
+                row = self._db.execute("SELECT id, mtime_ns, size FROM documents WHERE path = ?", (path,)).fetchone()
+            if row is not None and (row[1], row[2]) == (entry.mtime_ns, entry.size):
+                return
+
+        if body is None:
+            try:
+                body = split_markdown_body(read_text(os.path.join(self.vault_path, path)))
+            except (FileNotFoundError, UnicodeDecodeError):
+                return
+
+        title = os.path.splitext(entry.metadata["name"])[0]
+        frontmatter_text = json.dumps(entry.frontmatter, ensure_ascii=False, default=str) if entry.frontmatter else ""
+        with self._lock:
+            row = self._db.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()
+            if row is not None:
+                self._delete(row[0])
+            cursor = self._db.execute(
+                "INSERT INTO documents (path, mtime_ns, size) VALUES (?, ?, ?)",
+                (path, entry.mtime_ns, entry.size)
+            )
+            self._db.execute(
+                "INSERT INTO notes (rowid, title, frontmatter, body) VALUES (?, ?, ?, ?)",
+                (cursor.lastrowid, title, frontmatter_text, body)
+            )
+            self._commit()
+
+    def file_removed(self, path: str) -> None:
+        with self._lock:
+            row = self._db.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()
+            if row is not None:
+                self._delete(row[0])
+                self._commit()
+
+    # Snapshots
+    #
+    # The search index persists itself in its database, so it adds nothing to
+    # the vault index snapshot.
+
+    def export_state(self) -> None:
+        return None
+
+    def restore_state(self, state: None) -> None:
+        pass
+
+    # Queries
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> list[dict]:
+        match_query = build_match_query(query)
+        if not match_query:
+            return []
+        with self._lock:
+            rows = self._db.execute(SEARCH_QUERY, (match_query, limit, offset)).fetchall()
+        return [{"path": path, "score": score, "snippet": snippet} for path, score, snippet in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # Internal Helpers
+
+    def _delete(self, doc_id: int) -> None:
+        self._db.execute("DELETE FROM notes WHERE rowid = ?", (doc_id,))
+        self._db.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    def _commit(self) -> None:
+        if not self._deferred:
+            self._db.commit()
@@ -0,0 +1,32 @@
+# Third-party imports
+from fastapi import APIRouter, Depends, Query
+from typing import Annotated
+
+# Local application imports
+from app.authentication import ObsidianHTTPBearer
+from app.index import get_vault_index
+from app.models import SearchResult
+from app.workers import run_in_worker
+
+# Router setup
+obsidian_security = ObsidianHTTPBearer()
+search_router = APIRouter(
+    prefix="/search",
+    tags=["search"],
+    dependencies=[Depends(obsidian_security)]
+)
+
+# Read operations
+@search_router.get(
+    "/",
+    operation_id="searchFiles",
+    summary="Search Files",
+    description="Full-text search across the body and frontmatter of every markdown file in your vault. Returns matching paths ranked by relevance, each with a snippet around the best match. Terms are combined with AND; end a term with * for a prefix match."
+)
+async def search_files(
+    q: Annotated[str, Query(min_length=1, description="The terms to search for")],
+    limit: Annotated[int, Query(ge=1, le=100, description="Maximum number of results to return")] = 20,
+    offset: Annotated[int, Query(ge=0, description="Number of results to skip, for paging through results")] = 0
+) -> list[SearchResult]:
+    index = await get_vault_index()
+    return await run_in_worker(index.search.search, q, limit, offset)
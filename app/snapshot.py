@@ -0,0 +1,55 @@
+"""
+Snapshots of the vault index for warm restarts.
+
+With OBSIDIAN_API_STATE_PATH set, the vault index pickles its files, folders,
+note hashes, derived link and tag state and change journal to a snapshot in
+the state folder after it is built, every OBSIDIAN_API_SNAPSHOT_INTERVAL
+seconds while it changes, and when it is closed. The next build restores the
+snapshot and only re-reads the notes whose (mtime, size) differ from it.
+The search index persists itself.
+"""
+import logging
+import os
+import pickle
+import tempfile
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the layout of the snapshot changes; older snapshots are ignored.
+SNAPSHOT_VERSION = 4
+DEFAULT_SNAPSHOT_INTERVAL = 30.0
+
+def get_snapshot_path() -> Optional[str]:
+    state_path = os.getenv("OBSIDIAN_API_STATE_PATH")
+    if not state_path:
+        return None
+    os.makedirs(state_path, exist_ok=True)
+    return os.path.join(state_path, "index.snapshot")
+
+def get_snapshot_interval() -> float:
+    return float(os.getenv("OBSIDIAN_API_SNAPSHOT_INTERVAL", DEFAULT_SNAPSHOT_INTERVAL))
+
+def save_snapshot(snapshot_path: str, vault_path: str, state: dict) -> None:
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(snapshot_path), prefix=".index-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump({"version": SNAPSHOT_VERSION, "vault_path": vault_path, "state": state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, snapshot_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def load_snapshot(snapshot_path: str, vault_path: str) -> Optional[dict]:
+    """Return the state saved for vault_path, or None if there is no usable snapshot."""
+    try:
+        with open(snapshot_path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("Ignoring unreadable index snapshot %s", snapshot_path)
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("vault_path") != vault_path:
+        return None
+    return snapshot["state"]
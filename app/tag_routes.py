@@ -0,0 +1,45 @@
+# Third-party imports
+from fastapi import APIRouter, Depends, Path, Query, Response
+from typing import Annotated, Optional
+
+# Local application imports
+from app.authentication import ObsidianHTTPBearer
+from app.index import get_tag_counts, get_tagged_file_metadata
+from app.models import FileMetadata, TagCount
+from app.path_validation import validate_cursor
+from app.utils import encode_cursor
+
+# Router setup
+obsidian_security = ObsidianHTTPBearer()
+tag_router = APIRouter(
+    prefix="/tags",
+    tags=["tags"],
+    dependencies=[Depends(obsidian_security)]
+)
+
+# List operations
+@tag_router.get(
+    "/",
+    operation_id="getAllTags",
+    summary="Get All Tags",
+    description="List every tag used in your vault, from inline #tags and the `tags` frontmatter field, with the number of files carrying it. Tags are case-insensitive, and a file tagged #project/alpha also counts towards #project."
+)
+async def list_tags() -> list[TagCount]:
+    return await get_tag_counts()
+
+@tag_router.get(
+    "/{tag:path}/files",
+    operation_id="getTaggedFiles",
+    summary="Get Tagged Files",
+    description="List the metadata of the files carrying a tag or one of its nested tags, in path order. Pass `limit` to page through them with the cursor returned in the `X-Next-Cursor` header."
+)
+async def list_tagged_files(
+    response: Response,
+    tag: Annotated[str, Path(..., description="The tag to look up, with or without the leading #, e.g. project/alpha")],
+    limit: Annotated[Optional[int], Query(ge=1, description="Maximum number of files to return")] = None,
+    after_path: Annotated[Optional[str], Depends(validate_cursor)] = None
+) -> list[FileMetadata]:
+    files, next_path = await get_tagged_file_metadata(tag, after_path, limit)
+    if next_path:
+        response.headers["X-Next-Cursor"] = encode_cursor(next_path)
+    return files
@@ -0,0 +1,127 @@
+"""
+Tag index over inline #tags and frontmatter tags.
+
+Tags are case-insensitive and nested: a note tagged #project/alpha is also
+counted under #project, as in Obsidian's tag pane. Each tag keeps a sorted list
+of the notes carrying it or one of its nested tags, so counts and pages of
+files are answered without touching the notes.
+"""
+import bisect
+import os
+import re
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from app.links import strip_code
+from app.utils import read_text, split_markdown_body
+
+if TYPE_CHECKING:
+    from app.index import FileEntry
+
+# A tag starts after whitespace or at the start of a line and needs at least
+# one character that is not a digit, so "#1" and "issue#12" are not tags.
+INLINE_TAG_PATTERN = re.compile(r"(?<!\S)#([\w/-]*[^\W\d][\w/-]*)")
+
+def normalize_tag(tag: str) -> str:
+    return tag.strip().lstrip('#').strip('/').lower()
+
+def _expand_tag(tag: str) -> list[str]:
+    # "a/b/c" -> ["a", "a/b", "a/b/c"]
+    parts = [part for part in tag.split('/') if part]
+    return ['/'.join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+def _frontmatter_tags(frontmatter_data: Optional[dict]) -> list[str]:
+    if not frontmatter_data:
+        return []
+    tags = []
+    for key in ("tags", "tag"):
+        value = frontmatter_data.get(key)
+        if isinstance(value, str):
+            tags.extend(re.split(r"[,\s]+", value))
+        elif isinstance(value, list):
+            tags.extend(str(tag) for tag in value if tag is not None)
+    return tags
+
+def parse_tags(body: str, frontmatter_data: Optional[dict] = None) -> set[str]:
+    """Return the normalized tags of a note, including the parents of nested tags."""
+    tags = set()
+    for tag in _frontmatter_tags(frontmatter_data) + INLINE_TAG_PATTERN.findall(strip_code(body)):
+        tags.update(_expand_tag(normalize_tag(tag)))
+    return tags
+
+class TagIndex:
+    def __init__(self, vault_path: str):
+        self.vault_path = vault_path
+        self._note_tags: dict[str, set[str]] = {}
+        self._tag_files: dict[str, list[str]] = {}
+        self._stamps: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    # Vault Index Events
+
+    def build_started(self) -> None:
+        pass
+
+    def build_finished(self, paths: set[str]) -> None:
+        pass
+
+    def file_updated(self, entry: "FileEntry", body: Optional[str]) -> None:
+        path = entry.metadata["path"]
+        if self._stamps.get(path) == (entry.mtime_ns, entry.size):
+            return
+        if body is None:
+            try:
+                body = split_markdown_body(read_text(os.path.join(self.vault_path, path)))
+            except (FileNotFoundError, UnicodeDecodeError):
+                return
+
+        tags = parse_tags(body, entry.frontmatter)
+        with self._lock:
+            self._drop(path)
+            self._stamps[path] = (entry.mtime_ns, entry.size)
+            self._note_tags[path] = tags
+            for tag in tags:
+                bisect.insort(self._tag_files.setdefault(tag, []), path)
+
+    def file_removed(self, path: str) -> None:
+        with self._lock:
+            self._drop(path)
+
+    # Snapshots
+
+    def export_state(self) -> dict:
+        with self._lock:
+            return {
+                "note_tags": dict(self._note_tags),
+                "tag_files": {tag: list(paths) for tag, paths in self._tag_files.items()},
+                "stamps": dict(self._stamps)
+            }
+
+    def restore_state(self, state: dict) -> None:
+        with self._lock:
+            self._note_tags = state["note_tags"]
+            self._tag_files = state["tag_files"]
+            self._stamps = state["stamps"]
+
+    # Queries
+
+    def tags(self) -> list[dict]:
+        with self._lock:
+            return [{"tag": tag, "count": len(paths)} for tag, paths in sorted(self._tag_files.items())]
+
+    def files(self, tag: str, after: Optional[str] = None, limit: Optional[int] = None) -> list[str]:
+        with self._lock:
+            paths = self._tag_files.get(normalize_tag(tag), [])
+            start = bisect.bisect_right(paths, after) if after is not None else 0
+            stop = start + limit if limit is not None else None
+            return paths[start:stop]
+
+    # Internal Helpers
+
+    def _drop(self, path: str) -> None:
+        self._stamps.pop(path, None)
+        for tag in self._note_tags.pop(path, ()):
+            paths = self._tag_files[tag]
+            del paths[bisect.bisect_left(paths, path)]
+            if not paths:
+                del self._tag_files[tag]
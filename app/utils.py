@@ -1,10 +1,25 @@
 import os
-import anyio
-from pathlib import Path
+import stat
+import base64
+import contextlib
+import re
+import tempfile
+from dataclasses import dataclass
+from functools import partial
 from datetime import datetime
 import frontmatter
-from typing import Optional
-from app.models import ResourceType, Folder, MarkdownFile, FileMetadata, MarkdownContent, FolderMetadata
+import yaml
+from fastapi import HTTPException, status
+from typing import Any, Callable, Optional
+from app.cache import CachedContent, get_content_cache
+from app.compression import identity_etag
+from app.locks import get_path_locks
+from app.workers import run_in_worker
+from app.models import FileMetadata, MarkdownContent, MarkdownFile, ResourceType
+
+# Permission bits of newly created notes. os.umask() can only be read by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
 # Core Utilities
 
@@ -12,118 +27,361 @@ def get_vault_path() -> str:
     path = os.getenv("OBSIDIAN_API_VAULT_PATH")
     return path
 
-def is_hidden(path: str) -> bool:
-    path_parts = Path(path).parts
-    current_path = Path(get_vault_path())
-    
-    for part in path_parts:
-        current_path = current_path / part
-        if part.startswith('.') and current_path.is_dir():
+def is_hidden(path: str, is_folder: bool = False) -> bool:
+    # A pure string check on the vault-relative path: a path is hidden when one
+    # of its folders, or the path itself if it is a folder, starts with a dot.
+    path_parts = os.path.relpath(path, get_vault_path()).split(os.sep)
+    if not is_folder:
+        path_parts = path_parts[:-1]
+
+    return any(part.startswith('.') for part in path_parts)
+
+def stat_etag(stats: os.stat_result) -> str:
+    return f'"{stats.st_ino:x}-{stats.st_mtime_ns:x}-{stats.st_size:x}"'
+
+def file_etag(full_file_path: str) -> str:
+    return stat_etag(os.stat(full_file_path))
+
+def etag_matches(header: str, etag: str, weak: bool = True) -> bool:
+    # If-None-Match uses weak comparison, so a W/ prefix is ignored; If-Match
+    # uses strong comparison, so a weak ETag never matches. ETags of compressed
+    # responses stand for the identity representation they were made from.
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/") and weak:
+            tag = tag[2:]
+        if identity_etag(tag) == etag:
             return True
-            
     return False
 
-# Read Operations
+def check_if_match(full_file_path: str, if_match: Optional[str]) -> None:
+    # Writers call this while holding the path lock, so no other write can
+    # land between the check and their own write.
+    if if_match is not None and not etag_matches(if_match, file_etag(full_file_path), weak=False):
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="File has changed since it was read")
+
+def encode_cursor(vault_relative_path: str) -> str:
+    return base64.urlsafe_b64encode(vault_relative_path.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> str:
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+
+def fields_overlap(fields: list[str], field: str) -> bool:
+    # True if any selected field is the given dotted field, one of its parents or one of its children.
+    parts = field.split('.')
+    for selected in fields:
+        selected_parts = selected.split('.')
+        common = min(len(parts), len(selected_parts))
+        if parts[:common] == selected_parts[:common]:
+            return True
+    return False
+
+def project_fields(data: dict, fields: list[str]) -> dict:
+    projected = {}
+    for field in fields:
+        source, target = data, projected
+        *parents, leaf = field.split('.')
+        for part in parents:
+            if not isinstance(source.get(part), dict):
+                break
+            source = source[part]
+            target = target.setdefault(part, {})
+        else:
+            if leaf in source:
+                target[leaf] = source[leaf]
+    return projected
+
+# Frontmatter Codecs
+#
+# Notes are split and joined here, and a codec only turns a YAML frontmatter
+# block into a dict and back. Notes without a block, which a check of their
+# first character rules out, and notes with an empty block never reach the
+# codec. JSON and TOML frontmatter still go through python-frontmatter.
+# Parse processes get the codec pickled, so a registered codec's functions
+# must be importable, like the partials of the YAML codecs.
 
-async def read_file(full_file_path: str) -> str:
-    async with await anyio.open_file(full_file_path, 'r', encoding='utf-8') as f:
-        return await f.read()
+@dataclass(frozen=True)
+class FrontmatterCodec:
+    name: str
+    load: Callable[[str], Any]
+    dump: Callable[[dict], str]
 
-async def read_markdown_file(full_file_path: str) -> tuple[str, Optional[dict]]:
-    content = await read_file(full_file_path)
-    post = frontmatter.loads(content)
-    return post.content, post.metadata if post.metadata else None
+def _yaml_dump(data: dict, dumper: type) -> str:
+    # The options of python-frontmatter's YAMLHandler, so the output is byte-identical.
+    return yaml.dump(data, Dumper=dumper, default_flow_style=False, allow_unicode=True).strip()
 
-async def read_stats(full_path: str) -> dict:
+def _yaml_codec(name: str, loader: type, dumper: type) -> FrontmatterCodec:
+    return FrontmatterCodec(
+        name=name,
+        load=partial(yaml.load, Loader=loader),
+        dump=partial(_yaml_dump, dumper=dumper)
+    )
+
+FRONTMATTER_CODECS: dict[str, FrontmatterCodec] = {
+    "pyyaml": _yaml_codec("pyyaml", yaml.SafeLoader, yaml.SafeDumper)
+}
+if yaml.__with_libyaml__:
+    FRONTMATTER_CODECS["libyaml"] = _yaml_codec("libyaml", yaml.CSafeLoader, yaml.CSafeDumper)
+
+def register_frontmatter_codec(codec: FrontmatterCodec) -> None:
+    FRONTMATTER_CODECS[codec.name] = codec
+
+def get_frontmatter_codec() -> FrontmatterCodec:
+    name = os.getenv("OBSIDIAN_API_FRONTMATTER_CODEC")
+    if name is None:
+        return FRONTMATTER_CODECS.get("libyaml") or FRONTMATTER_CODECS["pyyaml"]
+    if name not in FRONTMATTER_CODECS:
+        raise ValueError(f"Unknown frontmatter codec: {name}")
+    return FRONTMATTER_CODECS[name]
+
+# Frontmatter in any format python-frontmatter knows starts with one of these.
+FRONTMATTER_PREFIXES = ("-", "+", "{")
+YAML_FRONTMATTER_BOUNDARY = frontmatter.YAMLHandler.FM_BOUNDARY
+
+# Parse Operations
+
+def parse_markdown(content: str) -> tuple[str, Optional[dict]]:
+    text = content.strip()
+    if not text.startswith(FRONTMATTER_PREFIXES):
+        return text, None
+    if not YAML_FRONTMATTER_BOUNDARY.match(text):
+        post = frontmatter.loads(content)
+        return post.content, post.metadata if post.metadata else None
+    try:
+        _, block, body = YAML_FRONTMATTER_BOUNDARY.split(text, 2)
+    except ValueError:
+        return text, None
+    metadata = get_frontmatter_codec().load(block) if block.strip() else None
+    return body.strip(), metadata if isinstance(metadata, dict) and metadata else None
+
+def markdown_body_offset(content: str) -> int:
+    # Mirrors frontmatter.parse() without loading the YAML: the body of the
+    # note is content[offset:].strip().
+    text = content.strip()
+    start = len(content) - len(content.lstrip())
+    if not text.startswith(FRONTMATTER_PREFIXES):
+        return start
+    handler = frontmatter.detect_format(text, frontmatter.handlers)
+    if handler is None:
+        return start
+    try:
+        _, body = handler.split(text)
+    except ValueError:
+        return start
+    return start + len(text) - len(body)
+
+def split_markdown_body(content: str) -> str:
+    # For callers that already hold the parsed frontmatter of the file.
+    return content[markdown_body_offset(content):].strip()
+
+def build_stats(full_path: str, stats: os.stat_result) -> dict:
     path = os.path.relpath(full_path, get_vault_path())
-    stats = os.stat(full_path)
-    
+
     return {
         "name": os.path.basename(path),
         "path": path,
-        "type": ResourceType.FILE if os.path.isfile(full_path) else ResourceType.FOLDER,
-        "size": stats.st_size,
+        # In the field order of the metadata models, which the read routes skip.
         "created": datetime.fromtimestamp(stats.st_ctime),
-        "modified": datetime.fromtimestamp(stats.st_mtime)
+        "modified": datetime.fromtimestamp(stats.st_mtime),
+        "type": ResourceType.FOLDER if stat.S_ISDIR(stats.st_mode) else ResourceType.FILE,
+        "size": stats.st_size
     }
 
+# Read Operations
+
+YAML_BOUNDARY = re.compile(r"^-{3,}\s*$")
+
+def read_frontmatter(full_file_path: str) -> Optional[dict]:
+    # Reads a YAML frontmatter block line by line and stops at its closing
+    # delimiter, so the body of the note is never loaded.
+    with open(full_file_path, 'r', encoding='utf-8') as f:
+        head = []
+        for line in f:
+            if not head and not line.strip():
+                continue
+            head.append(line)
+            if len(head) == 1 and not YAML_BOUNDARY.match(line):
+                if frontmatter.detect_format(line.strip(), frontmatter.handlers) is None:
+                    return None
+                return parse_markdown(line + f.read())[1]
+            if len(head) > 1 and YAML_BOUNDARY.match(line):
+                break
+    return parse_markdown("".join(head))[1]
+
+def read_text(full_file_path: str) -> str:
+    with open(full_file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def read_text_with_stats(full_file_path: str) -> tuple[str, os.stat_result]:
+    with open(full_file_path, 'r', encoding='utf-8') as f:
+        return f.read(), os.fstat(f.fileno())
+
+def load_content(full_file_path: str, stats: Optional[os.stat_result] = None) -> CachedContent:
+    cache = get_content_cache()
+    stats = stats or os.stat(full_file_path)
+    content = cache.get(full_file_path, stats)
+    if content is None:
+        content = cache.put(full_file_path, stats, read_text(full_file_path))
+    return content
+
+def load_markdown(full_file_path: str, stats: Optional[os.stat_result] = None) -> tuple[str, Optional[dict]]:
+    content = load_content(full_file_path, stats)
+    if not content.parsed:
+        body, frontmatter_data = parse_markdown(content.text)
+        get_content_cache().set_parsed(full_file_path, content, body, frontmatter_data)
+    return content.body, content.frontmatter
+
 # Write Operations
 
-async def write_content(full_file_path: str, content: str) -> None:
-    async with await anyio.open_file(full_file_path, 'w', encoding='utf-8') as f:
-        await f.write(content)
+def write_text(full_file_path: str, content: str) -> os.stat_result:
+    """Atomically replace a file and return the stat of what was written."""
+    # Write to a temporary file next to the note and rename it over the note,
+    # so a crash leaves either the old or the new content, never a mix.
+    folder = os.path.dirname(full_file_path)
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix=f".{os.path.basename(full_file_path)}.", suffix=".tmp")
+    try:
+        with open(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            try:
+                mode = stat.S_IMODE(os.stat(full_file_path).st_mode)
+            except FileNotFoundError:
+                mode = 0o666 & ~_UMASK
+            os.fchmod(f.fileno(), mode)
+            os.fsync(f.fileno())
+            get_content_cache().invalidate(full_file_path)
+            os.replace(temp_path, full_file_path)
+            # The rename changes the ctime, so stat the handle after it.
+            stats = os.fstat(f.fileno())
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
+    get_content_cache().invalidate(full_file_path)
+    _fsync_folder(folder)
+    return stats
 
-async def write_frontmatter(full_file_path: str, frontmatter_data: dict) -> None:
-    content = await read_file(full_file_path)
-    post = frontmatter.loads(content)
+def _fsync_folder(full_folder_path: str) -> None:
+    # Makes the rename itself durable; not every platform can open a folder.
+    try:
+        fd = os.open(full_folder_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _replace_frontmatter(post: frontmatter.Post, frontmatter_data: dict) -> None:
     post.metadata = frontmatter_data
-    await write_content(full_file_path, frontmatter.dumps(post))
 
-async def merge_frontmatter(full_file_path: str, frontmatter_data: dict) -> None:
-    content = await read_file(full_file_path)
-    post = frontmatter.loads(content)
+def _merge_frontmatter(post: frontmatter.Post, frontmatter_data: dict) -> None:
     current_metadata = post.metadata or {}
     post.metadata = {**current_metadata, **frontmatter_data}
-    await write_content(full_file_path, frontmatter.dumps(post))
 
-async def write_body(full_file_path: str, body: str) -> None:
-    content = await read_file(full_file_path)
-    post = frontmatter.loads(content)
+def _replace_body(post: frontmatter.Post, body: str) -> None:
     post.content = body
-    await write_content(full_file_path, frontmatter.dumps(post))
 
-async def write_markdown_file(full_file_path: str, file_frontmatter: Optional[dict] = {}, file_body: Optional[str] = None) -> None:
-    os.makedirs(os.path.dirname(full_file_path), exist_ok=True)
+def _load_post(content: str) -> frontmatter.Post:
+    text = content.strip()
+    if text.startswith(FRONTMATTER_PREFIXES) and not YAML_FRONTMATTER_BOUNDARY.match(text):
+        # Keeps the handler, so JSON or TOML frontmatter is written back as such.
+        return frontmatter.loads(content)
+    body, frontmatter_data = parse_markdown(content)
+    return _new_post(frontmatter_data, body)
 
-    post = frontmatter.Post(
-        content=file_body or "",
-        **file_frontmatter if file_frontmatter else {}
-    )
-    dumped = frontmatter.dumps(post)
-    await write_content(full_file_path, dumped)
+def _dump_post(post: frontmatter.Post) -> str:
+    if post.handler is not None and not isinstance(post.handler, frontmatter.YAMLHandler):
+        return frontmatter.dumps(post)
+    # python-frontmatter's post template; YAML dumps empty frontmatter as {}.
+    block = get_frontmatter_codec().dump(post.metadata) if post.metadata else "{}"
+    return f"---\n{block}\n---\n\n{post.content}\n".strip()
+
+def _update_text(content: str, update: Callable[[frontmatter.Post], None]) -> str:
+    post = _load_post(content)
+    update(post)
+    return _dump_post(post)
+
+def merge_frontmatter_text(content: str, frontmatter_data: dict) -> str:
+    return _update_text(content, lambda post: _merge_frontmatter(post, frontmatter_data))
+
+def replace_body_text(content: str, body: str) -> str:
+    return _update_text(content, lambda post: _replace_body(post, body))
 
-# Response Generators
+def _new_post(file_frontmatter: Optional[dict] = None, file_body: Optional[str] = None) -> frontmatter.Post:
+    post = frontmatter.Post(content=file_body or "")
+    post.metadata = dict(file_frontmatter) if file_frontmatter else {}
+    return post
 
-async def get_markdown_file_model(full_file_path: str) -> MarkdownFile:
-    stats = await read_stats(full_file_path)
-    body, frontmatter_data = await read_markdown_file(full_file_path)
+def dump_markdown(file_frontmatter: Optional[dict] = None, file_body: Optional[str] = None) -> str:
+    return _dump_post(_new_post(file_frontmatter, file_body))
+
+def save_markdown(full_file_path: str, content: str, frontmatter_data: Optional[dict]) -> MarkdownFile:
+    """Write a note and describe it from what was written, without reading it back."""
+    stats = write_text(full_file_path, content)
     return MarkdownFile(
-        metadata=FileMetadata(**stats),
+        metadata=FileMetadata(**build_stats(full_file_path, stats)),
         content=MarkdownContent(
-            body=body,
-            frontmatter=frontmatter_data
+            frontmatter=frontmatter_data or None,
+            body=split_markdown_body(content)
         )
     )
 
-async def get_folder_model(full_folder_path: str) -> Folder:
-    stats = await read_stats(full_folder_path)
-    return Folder(
-        metadata=FolderMetadata(**stats)
-    )
+def _save_text(full_file_path: str, content: str, if_match: Optional[str] = None) -> MarkdownFile:
+    check_if_match(full_file_path, if_match)
+    try:
+        _, frontmatter_data = parse_markdown(content)
+    except Exception:
+        frontmatter_data = None
+    return save_markdown(full_file_path, content, frontmatter_data)
+
+def _save_post(full_file_path: str, post: frontmatter.Post) -> MarkdownFile:
+    return save_markdown(full_file_path, _dump_post(post), post.metadata)
+
+def _save_new_post(full_file_path: str, post: frontmatter.Post) -> MarkdownFile:
+    os.makedirs(os.path.dirname(full_file_path), exist_ok=True)
+    return _save_post(full_file_path, post)
+
+def _save_update(full_file_path: str, update: Callable[[frontmatter.Post], None], if_match: Optional[str] = None) -> MarkdownFile:
+    check_if_match(full_file_path, if_match)
+    post = _load_post(load_content(full_file_path).text)
+    update(post)
+    return _save_post(full_file_path, post)
+
+# The async write helpers hold the path lock around the whole read-modify-write,
+# so concurrent writers to one note cannot lose each other's updates, check
+# If-Match under that lock, and return the written file built from the
+# in-memory post.
+
+async def write_content(full_file_path: str, content: str, if_match: Optional[str] = None) -> MarkdownFile:
+    async with get_path_locks().hold(full_file_path):
+        return await run_in_worker(_save_text, full_file_path, content, if_match)
+
+async def write_frontmatter(full_file_path: str, frontmatter_data: dict, if_match: Optional[str] = None) -> MarkdownFile:
+    async with get_path_locks().hold(full_file_path):
+        return await run_in_worker(_save_update, full_file_path, lambda post: _replace_frontmatter(post, frontmatter_data), if_match)
+
+async def merge_frontmatter(full_file_path: str, frontmatter_data: dict, if_match: Optional[str] = None) -> MarkdownFile:
+    if if_match is not None:
+        # A preconditioned merge must be checked against the note as it was
+        # before its own write, so it is never coalesced with other merges.
+        async with get_path_locks().hold(full_file_path):
+            return await run_in_worker(_save_update, full_file_path, lambda post: _merge_frontmatter(post, frontmatter_data), if_match)
+
+    async def write(full_path: str, merged_data: dict) -> MarkdownFile:
+        return await run_in_worker(_save_update, full_path, lambda post: _merge_frontmatter(post, merged_data))
+    return await get_path_locks().merge(full_file_path, frontmatter_data, write)
+
+async def write_body(full_file_path: str, body: str, if_match: Optional[str] = None) -> MarkdownFile:
+    async with get_path_locks().hold(full_file_path):
+        return await run_in_worker(_save_update, full_file_path, lambda post: _replace_body(post, body), if_match)
 
-# Walk Helpers
-
-async def walk_folders() -> list[Folder]:
-    vault_path = get_vault_path()
-    items = []
-    
-    for root, dirs, _ in os.walk(vault_path):
-        for dir_name in dirs:
-            full_dir_path = os.path.join(root, dir_name)
-            if not is_hidden(full_dir_path):
-                items.append(await get_folder_model(full_dir_path))
-    
-    return items
-
-async def walk_files() -> list[MarkdownFile]:
-    vault_path = get_vault_path()
-    items = []
-    
-    for root, _, files in os.walk(vault_path):
-        for file in files:
-            if file.endswith('.md'):
-                full_file_path = os.path.join(root, file)
-                if not is_hidden(full_file_path):
-                    items.append(await get_markdown_file_model(full_file_path))
-    
-    return items
+async def write_markdown_file(full_file_path: str, file_frontmatter: Optional[dict] = {}, file_body: Optional[str] = None) -> MarkdownFile:
+    post = _new_post(file_frontmatter, file_body)
+    async with get_path_locks().hold(full_file_path):
+        return await run_in_worker(_save_new_post, full_file_path, post)
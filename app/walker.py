@@ -0,0 +1,125 @@
+"""
+Parallel vault walker.
+
+Walks a folder tree with os.scandir, one folder per task, fanning subfolders
+out across a pool of threads so a cold or networked disk serves many
+directory reads at once. Every entry carries the stat taken through its
+DirEntry, so callers never stat a walked path a second time. Hidden folders
+are pruned before they are scanned. Entries come in no particular order.
+
+walk_tree is for worker threads, like the index's scans: it scans on one
+walker pool shared by every walk, started on first use. iter_tree is the
+async form for the event loop, and scans on the API's worker threads.
+"""
+import asyncio
+import os
+import queue
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, Optional
+
+from app.workers import run_in_worker
+
+# Threads of the shared walker pool.
+WALK_THREADS = 8
+
+@dataclass(slots=True)
+class WalkEntry:
+    path: str
+    stats: os.stat_result
+    is_folder: bool
+
+def scan_folder(full_folder_path: str) -> tuple[list[WalkEntry], list[str]]:
+    """Scan one folder, returning its visible subfolders and markdown files, and the subfolders to descend into."""
+    entries: list[WalkEntry] = []
+    subfolders: list[str] = []
+    try:
+        iterator = os.scandir(full_folder_path)
+    except (FileNotFoundError, NotADirectoryError):
+        return entries, subfolders
+    with iterator:
+        for entry in iterator:
+            try:
+                if entry.is_dir():
+                    if entry.name.startswith('.'):
+                        continue
+                    entries.append(WalkEntry(entry.path, entry.stat(), True))
+                    # Like os.walk, list symlinked folders but do not descend into them.
+                    if not entry.is_symlink():
+                        subfolders.append(entry.path)
+                elif entry.name.endswith('.md'):
+                    entries.append(WalkEntry(entry.path, entry.stat(), False))
+            except FileNotFoundError:
+                # Removed, or a dangling symlink, between the scan and the stat.
+                continue
+    return entries, subfolders
+
+_walker_pool: Optional[ThreadPoolExecutor] = None
+_walker_pool_lock = threading.Lock()
+
+def get_walker_pool() -> ThreadPoolExecutor:
+    global _walker_pool
+    with _walker_pool_lock:
+        if _walker_pool is None:
+            _walker_pool = ThreadPoolExecutor(max_workers=WALK_THREADS, thread_name_prefix="vault-walker")
+        return _walker_pool
+
+def close_walker_pool() -> None:
+    global _walker_pool
+    with _walker_pool_lock:
+        if _walker_pool is not None:
+            _walker_pool.shutdown(cancel_futures=True)
+            _walker_pool = None
+
+def walk_tree(root_path: str, executor: Optional[Executor] = None) -> Iterator[WalkEntry]:
+    """Walk the folders and markdown files below root_path, yielding each folder's entries as soon as it is scanned."""
+    if executor is None:
+        executor = get_walker_pool()
+    # Finished scans are collected through a queue rather than by waiting on
+    # the pending futures, which would cost a pass over all of them per scan.
+    scanned: queue.SimpleQueue[Future] = queue.SimpleQueue()
+    pending: set[Future] = set()
+
+    def submit(full_folder_path: str) -> None:
+        future = executor.submit(scan_folder, full_folder_path)
+        pending.add(future)
+        future.add_done_callback(scanned.put)
+
+    try:
+        submit(root_path)
+        while pending:
+            future = scanned.get()
+            pending.discard(future)
+            entries, subfolders = future.result()
+            for subfolder in subfolders:
+                submit(subfolder)
+            yield from entries
+    finally:
+        # The pool is shared, so a walk abandoned early only cancels its own scans.
+        for future in pending:
+            future.cancel()
+
+async def iter_tree(root_path: str) -> AsyncIterator[WalkEntry]:
+    """Walk like walk_tree, scanning folders on the worker threads so the event loop never blocks."""
+    scanned: asyncio.Queue[asyncio.Future] = asyncio.Queue()
+    pending: set[asyncio.Future] = set()
+
+    def submit(full_folder_path: str) -> None:
+        task = asyncio.ensure_future(run_in_worker(scan_folder, full_folder_path))
+        task.add_done_callback(scanned.put_nowait)
+        pending.add(task)
+
+    try:
+        submit(root_path)
+        while pending:
+            task = await scanned.get()
+            pending.discard(task)
+            entries, subfolders = task.result()
+            for subfolder in subfolders:
+                submit(subfolder)
+            for entry in entries:
+                yield entry
+    finally:
+        for task in pending:
+            task.cancel()
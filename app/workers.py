@@ -0,0 +1,99 @@
+"""
+Worker threads for blocking filesystem work, and an event loop lag monitor.
+
+Every blocking call the API makes (stat, read, parse, write, rename) runs
+through run_in_worker. The workers have their own capacity limiter, sized by
+OBSIDIAN_API_WORKER_THREADS, so file I/O never competes with the thread pool
+FastAPI uses for sync dependencies, and a slow disk only ever blocks workers,
+never the event loop.
+
+The lag monitor proves the second part: a background thread schedules a
+callback on the loop every interval and records how late it runs.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional, TypeVar
+
+import anyio
+from anyio.lowlevel import RunVar
+
+T = TypeVar("T")
+
+DEFAULT_WORKER_THREADS = min(32, (os.cpu_count() or 1) + 4)
+LOOP_LAG_INTERVAL = 0.1
+LOOP_LAG_SAMPLES = 600
+
+_worker_limiter: RunVar[anyio.CapacityLimiter] = RunVar("_worker_limiter")
+
+def get_worker_limiter() -> anyio.CapacityLimiter:
+    # One limiter per event loop, as anyio does for its default limiter.
+    try:
+        return _worker_limiter.get()
+    except LookupError:
+        limiter = anyio.CapacityLimiter(int(os.getenv("OBSIDIAN_API_WORKER_THREADS", DEFAULT_WORKER_THREADS)))
+        _worker_limiter.set(limiter)
+        return limiter
+
+async def run_in_worker(func: Callable[..., T], *args) -> T:
+    get_loop_lag_monitor().watch(asyncio.get_running_loop())
+    return await anyio.to_thread.run_sync(func, *args, limiter=get_worker_limiter())
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, samples: int = LOOP_LAG_SAMPLES):
+        self.interval = interval
+        self._samples: deque[float] = deque(maxlen=samples)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.max_lag = 0.0
+
+    def watch(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._loop is loop:
+            return
+        with self._lock:
+            self._loop = loop
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="loop-lag-monitor", daemon=True)
+                self._thread.start()
+
+    def stats(self) -> dict:
+        with self._lock:
+            samples = sorted(self._samples)
+            last = self._samples[-1] if self._samples else None
+        if not samples:
+            return {"samples": 0, "last_ms": None, "p99_ms": None, "max_ms": None}
+        return {
+            "samples": len(samples),
+            "last_ms": round(last * 1000, 3),
+            "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+            "max_ms": round(self.max_lag * 1000, 3)
+        }
+
+    def _record(self, scheduled: float) -> None:
+        lag = time.perf_counter() - scheduled
+        with self._lock:
+            self._samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            loop = self._loop
+            if loop is None or not loop.is_running():
+                continue
+            try:
+                loop.call_soon_threadsafe(self._record, time.perf_counter())
+            except RuntimeError:
+                # The loop closed between the check and the call.
+                continue
+
+_loop_lag_monitor: Optional[LoopLagMonitor] = None
+
+def get_loop_lag_monitor() -> LoopLagMonitor:
+    global _loop_lag_monitor
+    if _loop_lag_monitor is None:
+        _loop_lag_monitor = LoopLagMonitor()
+    return _loop_lag_monitor
@@ -0,0 +1,58 @@
+"""
+Compare two result files from benchmarks.routes, scenario by scenario and
+concurrency level by level, and flag the latencies that grew by more than
+the threshold. Exits with status 1 when any did, so a CI job can fail on a
+regression.
+
+    uv run python -m benchmarks.compare baseline.json results.json --threshold 1.2
+"""
+import argparse
+import json
+import sys
+
+PERCENTILES = ("p50", "p99")
+
+def compare(baseline: dict, current: dict, threshold: float) -> dict:
+    scenarios, regressions = {}, []
+    for name, scenario in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        for concurrency, level in scenario["concurrency"].items():
+            previous = before["concurrency"].get(concurrency)
+            if previous is None:
+                continue
+            ratios = {}
+            for percentile in PERCENTILES:
+                old, new = previous["latency_ms"][percentile], level["latency_ms"][percentile]
+                ratios[percentile] = round(new / old, 2) if old else None
+                if old and new / old > threshold:
+                    regressions.append(f"{name} at {concurrency} clients: {percentile} {old} -> {new} ms")
+            scenarios.setdefault(name, {})[concurrency] = ratios
+    return {
+        "baseline": baseline.get("revision"),
+        "current": current.get("revision"),
+        "same_spec": baseline.get("spec") == current.get("spec"),
+        "threshold": threshold,
+        "ratios": scenarios,
+        "regressions": regressions
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Latency ratio above which a percentile counts as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    results = compare(baseline, current, args.threshold)
+    print(json.dumps(results, indent=2))
+    if results["regressions"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
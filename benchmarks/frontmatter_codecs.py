@@ -0,0 +1,74 @@
+"""
+Compare parsing and dumping notes with python-frontmatter, as the API did
+before the codec layer, against each registered frontmatter codec, on a mix
+of notes shaped like a real vault: most without frontmatter, some with an
+empty block and the rest with typical properties.
+
+    uv run python -m benchmarks.frontmatter_codecs --notes 5000
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+import frontmatter
+
+from app.utils import FRONTMATTER_CODECS, dump_markdown, parse_markdown
+
+def make_notes(count: int, seed: int = 0) -> list[str]:
+    generator = random.Random(seed)
+    notes = []
+    for i in range(count):
+        body = "\n\n".join(f"Paragraph {j} of note {i} linking [[Note {generator.randrange(count)}]] #tag{j}." for j in range(generator.randint(1, 12)))
+        kind = generator.random()
+        if kind < 0.6:
+            notes.append(f"# Note {i}\n\n{body}\n")
+        elif kind < 0.7:
+            notes.append(f"---\n---\n\n{body}\n")
+        else:
+            tags = ", ".join(f"topic{generator.randrange(40)}" for _ in range(generator.randint(1, 5)))
+            notes.append(
+                f"---\ntitle: Note {i}\ncreated: 2024-0{1 + i % 9}-1{i % 10}\ntags: [{tags}]\n"
+                f"aliases:\n  - N{i}\nstatus: {generator.choice(['draft', 'done', 'idea'])}\n"
+                f"rating: {generator.randint(1, 5)}\nsource:\n  url: https://example.com/{i}\n  author: Someone\n---\n\n{body}\n"
+            )
+    return notes
+
+def measure(notes: list[str], parse, dump) -> dict:
+    start = time.perf_counter()
+    parsed = [parse(note) for note in notes]
+    parse_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for body, metadata in parsed:
+        dump(metadata, body)
+    dump_seconds = time.perf_counter() - start
+    return {
+        "parse_us_per_note": round(parse_seconds / len(notes) * 1e6, 2),
+        "dump_us_per_note": round(dump_seconds / len(notes) * 1e6, 2)
+    }
+
+def legacy_parse(note: str) -> tuple[str, dict]:
+    post = frontmatter.loads(note)
+    return post.content, post.metadata
+
+def legacy_dump(metadata: dict, body: str) -> str:
+    return frontmatter.dumps(frontmatter.Post(body, **(metadata or {})))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=5000)
+    args = parser.parse_args()
+
+    notes = make_notes(args.notes)
+    results = {"notes": args.notes, "python_frontmatter": measure(notes, legacy_parse, legacy_dump)}
+    for name in sorted(FRONTMATTER_CODECS):
+        os.environ["OBSIDIAN_API_FRONTMATTER_CODEC"] = name
+        for note in notes[:200]:
+            body, metadata = legacy_parse(note)
+            assert dump_markdown(metadata, body) == legacy_dump(metadata, body)
+        results[name] = measure(notes, parse_markdown, dump_markdown)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
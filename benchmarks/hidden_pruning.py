@@ -0,0 +1,163 @@
+"""
+Count the filesystem calls made to list a vault and to validate a path,
+before and after hidden folders are pruned during traversal. Stats taken
+through the DirEntry objects os.scandir yields are counted too, under
+dir_entry_stat: on Linux and macOS the first stat() of an entry is a stat
+call of its own, and only on Windows does it come with the scan.
+
+    uv run python -m benchmarks.hidden_pruning --notes 2000 --git-objects 20000
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from app.utils import is_hidden
+from app.walker import walk_tree
+
+COUNTED_CALLS = ("stat", "lstat", "scandir")
+
+class _CountingDirEntry:
+    def __init__(self, entry: os.DirEntry, count):
+        self._entry = entry
+        self._count = count
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def __fspath__(self):
+        return self._entry.path
+
+    def stat(self, *, follow_symlinks=True):
+        self._count("dir_entry_stat")
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+class _CountingScandir:
+    def __init__(self, iterator, count):
+        self._iterator = iterator
+        self._count = count
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return _CountingDirEntry(next(self._iterator), self._count)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._iterator.close()
+
+@contextmanager
+def count_calls():
+    counts = dict.fromkeys((*COUNTED_CALLS, "dir_entry_stat"), 0)
+    originals = {name: getattr(os, name) for name in COUNTED_CALLS}
+    # The walker calls from several threads at once.
+    lock = threading.Lock()
+
+    def count(name):
+        with lock:
+            counts[name] += 1
+
+    def counting(name):
+        def wrapper(*args, **kwargs):
+            count(name)
+            result = originals[name](*args, **kwargs)
+            return _CountingScandir(result, count) if name == "scandir" else result
+        return wrapper
+
+    for name in COUNTED_CALLS:
+        setattr(os, name, counting(name))
+    try:
+        yield counts
+    finally:
+        for name, original in originals.items():
+            setattr(os, name, original)
+
+# The implementation before pruning, kept here as the baseline.
+
+def legacy_is_hidden(path: str) -> bool:
+    current_path = Path(os.getenv("OBSIDIAN_API_VAULT_PATH"))
+    for part in Path(path).parts:
+        current_path = current_path / part
+        if part.startswith('.') and current_path.is_dir():
+            return True
+    return False
+
+def legacy_list(vault_path: str) -> tuple[list[str], list[str]]:
+    folders, files = [], []
+    for root, dirs, _ in os.walk(vault_path):
+        for dir_name in dirs:
+            if not legacy_is_hidden(os.path.join(root, dir_name)):
+                folders.append(os.path.join(root, dir_name))
+    for root, _, names in os.walk(vault_path):
+        for name in names:
+            if name.endswith('.md') and not legacy_is_hidden(os.path.join(root, name)):
+                files.append(os.path.join(root, name))
+    return folders, files
+
+def pruned_list(vault_path: str) -> tuple[list[str], list[str]]:
+    folders, files = [], []
+    for entry in walk_tree(vault_path):
+        (folders if entry.is_folder else files).append(entry.path)
+    return folders, files
+
+def build_vault(vault_path: str, notes: int, git_objects: int) -> None:
+    for i in range(notes):
+        folder = Path(vault_path, f"Area {i % 10}", f"Topic {i % 7}")
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"Note {i}.md").write_text(f"# Note {i}\n")
+    for folder, count in ((".git/objects", git_objects), (".obsidian/plugins", 50), (".trash", 100)):
+        for i in range(count):
+            path = Path(vault_path, folder, f"{i % 256:02x}", f"{i:08x}.md")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("")
+
+def measure(function, *args) -> dict:
+    with count_calls() as counts:
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+    return {**counts, "total": sum(counts.values()), "seconds": round(elapsed, 4)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--git-objects", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as vault_path:
+        os.environ["OBSIDIAN_API_VAULT_PATH"] = vault_path
+        build_vault(vault_path, args.notes, args.git_objects)
+        assert [sorted(paths) for paths in legacy_list(vault_path)] == [sorted(paths) for paths in pruned_list(vault_path)]
+
+        visible_path = os.path.join(vault_path, "Area 1", "Topic 1", "Note 1.md")
+        hidden_path = os.path.join(vault_path, ".obsidian", "plugins", "01", "00000001.md")
+        results = {
+            "notes": args.notes,
+            "git_objects": args.git_objects,
+            "listing": {
+                "before": measure(legacy_list, vault_path),
+                "after": measure(pruned_list, vault_path)
+            },
+            "validate_visible_path": {
+                "before": measure(legacy_is_hidden, visible_path),
+                "after": measure(is_hidden, visible_path)
+            },
+            "validate_hidden_path": {
+                "before": measure(legacy_is_hidden, hidden_path),
+                "after": measure(is_hidden, hidden_path)
+            }
+        }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Time the manifest side of syncing a synthetic vault: the first manifest,
+which hashes every note, a sync round on the unchanged vault, and a round
+after editing a few notes, which descends only into the folders whose
+digest changed.
+
+    uv run python -m benchmarks.manifest_sync --notes 50000 --edits 10
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.index import VaultIndex
+from app.models import FolderManifest, ManifestEntry, ResourceType
+
+def build_vault(vault_path: str, notes: int) -> None:
+    for i in range(notes):
+        folder = Path(vault_path, f"Area {i % 10}", f"Topic {i % 100}")
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"Note {i}.md").write_text(f"---\ntitle: Note {i}\n---\n# Note {i}\n\nSee [[Note {(i + 1) % notes}]]\n")
+
+def manifest_bytes(index: VaultIndex, folder: str) -> tuple[FolderManifest, int]:
+    digest, entries = index.manifest(folder)
+    manifest = FolderManifest(
+        path=folder,
+        digest=digest,
+        entries=[ManifestEntry(name=name, type=resource_type, hash=content_hash) for name, resource_type, content_hash in entries]
+    )
+    return manifest, len(manifest.model_dump_json())
+
+def sync_round(index: VaultIndex, known: dict[str, str]) -> dict:
+    """Descend from the root into the folders whose digest differs from known, as a mirroring client does."""
+    start = time.perf_counter()
+    requests, response_bytes = 0, 0
+    pending = [""]
+    while pending:
+        folder = pending.pop()
+        manifest, size = manifest_bytes(index, folder)
+        requests += 1
+        response_bytes += size
+        known[folder] = manifest.digest
+        for entry in manifest.entries:
+            path = os.path.join(folder, entry.name)
+            if entry.type == ResourceType.FOLDER and known.get(path) != entry.hash:
+                pending.append(path)
+    return {"requests": requests, "response_bytes": response_bytes, "seconds": round(time.perf_counter() - start, 4)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=50000)
+    parser.add_argument("--edits", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as vault_path:
+        os.environ["OBSIDIAN_API_VAULT_PATH"] = vault_path
+        build_vault(vault_path, args.notes)
+        index = VaultIndex(vault_path)
+        index.build()
+
+        known: dict[str, str] = {}
+        results = {"notes": args.notes, "first_sync": sync_round(index, known), "unchanged_sync": sync_round(index, known)}
+        for i in range(args.edits):
+            note = os.path.join(vault_path, f"Area {i % 10}", f"Topic {i % 100}", f"Note {i}.md")
+            with open(note, "a") as f:
+                f.write("Edited\n")
+            index.update_file(note)
+        results[f"sync_after_{args.edits}_edits"] = sync_round(index, known)
+        index.close()
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
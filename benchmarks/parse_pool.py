@@ -0,0 +1,59 @@
+"""
+Time a cold index build of a synthetic vault whose notes carry sizeable YAML
+frontmatter, parsing in-process and on worker processes.
+
+    uv run python -m benchmarks.parse_pool --notes 20000 --processes 1 4 16
+
+On a host with enough cores, notes per second should grow roughly with the
+number of processes until the parent, which receives the parsed notes and
+updates the index and its tag, link and search indexes, becomes the
+bottleneck. The parent opens no notes itself.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.index import VaultIndex
+from app.parse_pool import close_parse_pool
+
+def build_vault(vault_path: str, notes: int) -> None:
+    for i in range(notes):
+        folder = Path(vault_path, f"Area {i % 10}", f"Topic {i % 50}")
+        folder.mkdir(parents=True, exist_ok=True)
+        properties = "\n".join(f"field{j}: value {i} {j}" for j in range(20))
+        (folder / f"Note {i}.md").write_text(
+            f"---\ntitle: Note {i}\ntags: [area{i % 10}, topic{i % 50}]\naliases:\n  - N{i}\n{properties}\n---\n"
+            f"# Note {i}\n\nSee [[Note {(i + 1) % notes}]] #inline{i % 7}\n"
+        )
+
+def measure_build(vault_path: str, processes: int) -> dict:
+    os.environ["OBSIDIAN_API_PARSE_PROCESSES"] = str(processes)
+    index = VaultIndex(vault_path)
+    start = time.perf_counter()
+    index.build()
+    elapsed = time.perf_counter() - start
+    notes = len(index.files())
+    index.close()
+    close_parse_pool()
+    return {"notes": notes, "seconds": round(elapsed, 3), "notes_per_second": round(notes / elapsed)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=20000)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as vault_path:
+        os.environ["OBSIDIAN_API_VAULT_PATH"] = vault_path
+        build_vault(vault_path, args.notes)
+        # Processes start on first use, so each build includes their start-up.
+        results = {"in_process": measure_build(vault_path, 0)}
+        for processes in args.processes:
+            results[f"{processes}_processes"] = measure_build(vault_path, processes)
+    print(json.dumps({"notes": args.notes, "cpu_count": os.cpu_count(), "builds": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
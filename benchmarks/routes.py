@@ -0,0 +1,242 @@
+"""
+Latency of every route in file_routes.py and folder_routes.py at increasing
+numbers of concurrent clients, measured in-process through httpx's ASGI
+transport against a vault from benchmarks.vault, so no network or server
+process adds noise.
+
+Read scenarios run first, on the vault as generated; write scenarios then
+each act on their own notes or folders, so no request depends on another.
+Every request of a run is numbered, and targets are picked from that number,
+so two runs of the same spec send the same requests. The JSON result records
+the commit and the spec, for comparing runs with benchmarks.compare.
+
+    uv run python -m benchmarks.routes --notes 10000 --concurrency 1 8 32 --output results.json
+"""
+import argparse
+import asyncio
+import fnmatch
+import json
+import math
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Optional
+from urllib.parse import quote
+
+import httpx
+
+from benchmarks.vault import add_spec_arguments, generate_vault, spec_from_arguments
+
+# A prime stride spreads consecutive requests over the vault.
+STRIDE = 7919
+BATCH_SIZE = 50
+# Write scenarios create their notes and folders below these.
+BENCH_FOLDERS = ["Bench", "Bench/Raw", "Bench/Json", "Bench/Move", "Bench/New", "Bench/Folders"]
+
+EDITED_BODY = "# Edited\n\n" + " ".join(["Edited by the route benchmark, see [[Elsewhere]] and #bench."] * 20) + "\n"
+
+@dataclass
+class Scenario:
+    name: str
+    route: str
+    # URL and httpx request arguments for request number i.
+    request: Callable[[int], tuple[str, dict]]
+    # Creates what requests 0 to count - 1 act on, before any is timed.
+    prepare: Optional[Callable[[httpx.AsyncClient, int], Awaitable[None]]] = None
+
+    @property
+    def method(self) -> str:
+        return self.route.split()[0]
+
+def file_url(path: str, suffix: str = "") -> str:
+    return f"/files/{quote(path)}{suffix}"
+
+def make_scenarios(paths: list[str], folders: list[str]) -> list[Scenario]:
+    def note(i: int) -> str:
+        return paths[(i * STRIDE) % len(paths)]
+
+    def folder(i: int) -> str:
+        return folders[(i * STRIDE) % len(folders)]
+
+    def get(suffix: str = "", headers: Optional[dict] = None) -> Callable[[int], tuple[str, dict]]:
+        return lambda i: (file_url(note(i), suffix), {"headers": headers or {}})
+
+    async def create_notes(client: httpx.AsyncClient, count: int) -> None:
+        for i in range(count):
+            response = await client.post(file_url(f"Bench/Move/{i}.md", "/raw"), content=f"# Note {i}\n")
+            response.raise_for_status()
+
+    async def create_folders(client: httpx.AsyncClient, count: int) -> None:
+        for i in range(count):
+            response = await client.post(f"/folders/{quote(f'Bench/Folders/{i}')}")
+            response.raise_for_status()
+
+    return [
+        Scenario("list_files_page", "GET /files/", lambda i: ("/files/", {"params": {"limit": 100}})),
+        Scenario("list_files_paths", "GET /files/", lambda i: ("/files/", {"params": {"fields": "metadata.path"}})),
+        Scenario("list_files_ndjson", "GET /files/", lambda i: ("/files/", {"params": {"limit": 1000}, "headers": {"Accept": "application/x-ndjson"}})),
+        Scenario("read_raw", "GET /files/{path}/raw", get("/raw")),
+        Scenario("read_raw_range", "GET /files/{path}/raw", get("/raw", {"Range": "bytes=0-1023"})),
+        Scenario("read_metadata", "GET /files/{path}/metadata", get("/metadata")),
+        Scenario("read_frontmatter", "GET /files/{path}/frontmatter", get("/frontmatter")),
+        Scenario("read_body", "GET /files/{path}/body", get("/body")),
+        Scenario("read_links", "GET /files/{path}/links", get("/links")),
+        Scenario("read_backlinks", "GET /files/{path}/backlinks", get("/backlinks")),
+        Scenario("read_file", "GET /files/{path}", get()),
+        Scenario("batch_get", "POST /files/batch:get", lambda i: (
+            "/files/batch:get", {"json": {"paths": [note(i * BATCH_SIZE + j) for j in range(BATCH_SIZE)]}}
+        )),
+        Scenario("list_folders", "GET /folders/", lambda i: ("/folders/", {})),
+        Scenario("read_folder", "GET /folders/{path}", lambda i: (f"/folders/{quote(folder(i))}", {})),
+        Scenario("create_file_raw", "POST /files/{path}/raw", lambda i: (
+            file_url(f"Bench/Raw/{i}.md", "/raw"), {"content": f"---\ntitle: Raw {i}\n---\n{EDITED_BODY}"}
+        )),
+        Scenario("create_file_json", "POST /files/{path}", lambda i: (
+            file_url(f"Bench/Json/{i}.md"), {"json": {"frontmatter": {"title": f"Json {i}", "tags": ["bench"]}, "body": EDITED_BODY}}
+        )),
+        Scenario("put_raw", "PUT /files/{path}/raw", lambda i: (file_url(note(i), "/raw"), {"content": f"---\ntitle: Put {i}\n---\n{EDITED_BODY}"})),
+        Scenario("put_frontmatter", "PUT /files/{path}/frontmatter", lambda i: (
+            file_url(note(i), "/frontmatter"), {"json": {"title": f"Put {i}", "status": "done"}}
+        )),
+        Scenario("put_body", "PUT /files/{path}/body", lambda i: (file_url(note(i), "/body"), {"content": EDITED_BODY})),
+        Scenario("patch_frontmatter", "PATCH /files/{path}/frontmatter", lambda i: (
+            file_url(note(i), "/frontmatter"), {"json": {"reviewed": True, "rating": i % 5}}
+        )),
+        Scenario("move_file", "PATCH /files/{path}/metadata", lambda i: (
+            file_url(f"Bench/Move/{i}.md", "/metadata"), {"json": {"path": f"Bench/Move/{i} moved.md"}}
+        ), prepare=create_notes),
+        Scenario("create_folder", "POST /folders/{path}", lambda i: (f"/folders/{quote(f'Bench/New/{i}')}", {})),
+        Scenario("move_folder", "PATCH /folders/{path}", lambda i: (
+            f"/folders/{quote(f'Bench/Folders/{i}')}", {"json": {"path": f"Bench/Folders/{i} moved"}}
+        ), prepare=create_folders)
+    ]
+
+def percentile(ordered: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+async def run_level(client: httpx.AsyncClient, scenario: Scenario, numbers: range, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    response_bytes = 0
+    pending = iter(numbers)
+
+    async def worker() -> None:
+        nonlocal response_bytes
+        for i in pending:
+            url, kwargs = scenario.request(i)
+            start = time.perf_counter()
+            response = await client.request(scenario.method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            response_bytes += len(response.content)
+            if response.status_code >= 400:
+                errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / seconds, 1),
+        "mean_response_bytes": round(response_bytes / len(latencies)),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p90": round(percentile(latencies, 90) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3)
+        }
+    }
+
+async def run_scenarios(app, scenarios: list[Scenario], levels: list[int], requests: int, warmup: int, accept_encoding: str) -> dict:
+    from app.index import get_vault_index
+
+    start = time.perf_counter()
+    await get_vault_index()
+    results = {"index_build_seconds": round(time.perf_counter() - start, 3), "scenarios": {}}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers={"Accept-Encoding": accept_encoding}) as client:
+        for folder in BENCH_FOLDERS:
+            (await client.post(f"/folders/{quote(folder)}")).raise_for_status()
+        for scenario in scenarios:
+            total = warmup + requests * len(levels)
+            if scenario.prepare is not None:
+                await scenario.prepare(client, total)
+            await run_level(client, scenario, range(warmup), 1)
+            measured = {}
+            for number, concurrency in enumerate(levels):
+                first = warmup + number * requests
+                measured[str(concurrency)] = await run_level(client, scenario, range(first, first + requests), concurrency)
+            results["scenarios"][scenario.name] = {"route": scenario.route, "concurrency": measured}
+    return results
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_spec_arguments(parser)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per scenario and concurrency level")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="+", default=["*"], help="Names or glob patterns of the scenarios to run")
+    parser.add_argument("--accept-encoding", default="gzip", help="Sent with every request; 'identity' turns compression off")
+    parser.add_argument("--watch", action="store_true", help="Keep the file watcher running, as a server does")
+    parser.add_argument("--output", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    spec = spec_from_arguments(args)
+    with tempfile.TemporaryDirectory() as vault_path:
+        os.environ["OBSIDIAN_API_VAULT_PATH"] = vault_path
+        os.environ["OBSIDIAN_API_WATCH_ENABLED"] = "true" if args.watch else "false"
+        os.environ.pop("OBSIDIAN_API_STATE_PATH", None)
+        start = time.perf_counter()
+        summary = generate_vault(vault_path, spec)
+        generate_seconds = time.perf_counter() - start
+        paths = summary.pop("paths")
+        folders = sorted({os.path.dirname(path) for path in paths} - {""}) or [""]
+
+        from app.index import close_vault_index
+        from app.main import app
+
+        scenarios = [
+            scenario for scenario in make_scenarios(paths, folders)
+            if any(fnmatch.fnmatch(scenario.name, pattern) for pattern in args.scenarios)
+        ]
+        try:
+            measured = asyncio.run(run_scenarios(app, scenarios, args.concurrency, args.requests, args.warmup, args.accept_encoding))
+        finally:
+            close_vault_index()
+
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "spec": asdict(spec),
+        "vault": summary,
+        "generate_seconds": round(generate_seconds, 3),
+        "requests": args.requests,
+        "accept_encoding": args.accept_encoding,
+        **measured
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare the per-note cost of serializing a listing as the read routes did
+before the fast path, building MarkdownFile models and letting FastAPI
+validate and encode them against the response model, with encoding the
+index's dicts directly with pydantic-core, on notes shaped like a real vault.
+
+    uv run python -m benchmarks.serialization --notes 5000
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.index import FileEntry, encode_json, markdown_file_data
+from app.models import FileMetadata, MarkdownContent, MarkdownFile, ResourceType
+from app.utils import parse_markdown
+from benchmarks.frontmatter_codecs import make_notes
+
+def make_entries(count: int) -> list[tuple[FileEntry, str]]:
+    items = []
+    for i, note in enumerate(make_notes(count)):
+        body, frontmatter_data = parse_markdown(note)
+        metadata = {
+            "name": f"Note {i}.md",
+            "path": f"Area {i % 10}/Note {i}.md",
+            "created": datetime(2024, 1, 1 + i % 28, 12, 0, 0, 123456),
+            "modified": datetime(2024, 6, 1 + i % 28, 8, 30, 0, 654321),
+            "type": ResourceType.FILE,
+            "size": len(note)
+        }
+        items.append((FileEntry(metadata=metadata, frontmatter=frontmatter_data, mtime_ns=0, size=len(note)), body))
+    return items
+
+def legacy_listing(items: list[tuple[FileEntry, str]], field) -> bytes:
+    # get_markdown_file_models, then FastAPI's response handling for a route
+    # returning list[MarkdownFile].
+    models = [
+        MarkdownFile(metadata=FileMetadata(**entry.metadata), content=MarkdownContent(body=body, frontmatter=entry.frontmatter))
+        for entry, body in items
+    ]
+    content = asyncio.run(serialize_response(field=field, response_content=models))
+    return JSONResponse(content).body
+
+def fast_listing(items: list[tuple[FileEntry, str]]) -> bytes:
+    return encode_json([markdown_file_data(entry, body) for entry, body in items])
+
+def measure(function, *args, repeat: int = 3) -> tuple[bytes, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=5000)
+    args = parser.parse_args()
+
+    items = make_entries(args.notes)
+    field = create_model_field("Response_list_files", list[MarkdownFile], mode="serialization")
+    legacy, legacy_seconds = measure(legacy_listing, items, field)
+    fast, fast_seconds = measure(fast_listing, items)
+    assert legacy == fast
+
+    print(json.dumps({
+        "notes": args.notes,
+        "response_bytes": len(fast),
+        "models_and_response_model": {"us_per_note": round(legacy_seconds / args.notes * 1e6, 2)},
+        "pydantic_core_to_json": {"us_per_note": round(fast_seconds / args.notes * 1e6, 2)},
+        "speedup": round(legacy_seconds / fast_seconds, 1)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Deterministic generator of synthetic vaults shaped like real ones.
+
+A spec and its seed always produce the same folders and notes, byte for byte,
+with the same modification times, so benchmark results are comparable across
+commits and hosts. Notes mix the frontmatter shapes found in real vaults,
+from none at all to nested properties, and their bodies carry headings,
+lists, code blocks, wikilinks between notes and nested #tags. Hidden
+.obsidian and .git folders add the noise the API has to skip.
+
+    uv run python -m benchmarks.vault /tmp/vault --notes 10000 --depth 3
+"""
+import argparse
+import json
+import os
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+WORDS = (
+    "project plan meeting note idea draft review research reading book paper "
+    "design system garden recipe travel journal weekly daily goal habit health "
+    "budget finance client team roadmap release bug feature question answer "
+    "summary outline lecture course exam topic concept theory method result "
+    "experiment data model analysis chart report archive inbox reference quote "
+    "person place event history future memory task list tool workflow process "
+    "language music film article podcast interview guide tutorial checklist"
+).split()
+
+STATUSES = ("draft", "active", "done", "archived", "idea")
+
+# Share of notes per frontmatter shape when the spec asks for a mix.
+FRONTMATTER_MIX = (("none", 0.5), ("empty", 0.05), ("simple", 0.3), ("rich", 0.15))
+FRONTMATTER_SHAPES = ("mixed",) + tuple(shape for shape, _ in FRONTMATTER_MIX)
+
+# Modification times count up from here, one second per note.
+BASE_MTIME = 1700000000
+
+@dataclass
+class VaultSpec:
+    notes: int = 1000
+    # Folder levels below the root, and subfolders per folder.
+    depth: int = 3
+    fanout: int = 6
+    frontmatter: str = "mixed"
+    min_paragraphs: int = 1
+    max_paragraphs: int = 20
+    # Averages per note.
+    links: int = 5
+    tags: int = 3
+    tag_vocabulary: int = 200
+    # Files under .obsidian and .git.
+    hidden_files: int = 500
+    seed: int = 0
+
+def _title(rng: random.Random, number: int) -> str:
+    return f"{' '.join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 3)))} {number}"
+
+def _folders(rng: random.Random, spec: VaultSpec) -> list[str]:
+    folders, level = [], [""]
+    for _ in range(spec.depth):
+        next_level = []
+        for parent in level:
+            for number in range(spec.fanout):
+                next_level.append(os.path.join(parent, _title(rng, number)))
+        folders.extend(next_level)
+        level = next_level
+    return folders
+
+def _tag(rng: random.Random, spec: VaultSpec) -> str:
+    number = rng.randrange(spec.tag_vocabulary)
+    word = WORDS[number % len(WORDS)]
+    # A quarter of the tags are nested.
+    return f"{word}/{WORDS[(number * 7) % len(WORDS)]}" if number % 4 == 0 else f"{word}{number // len(WORDS) or ''}"
+
+def _frontmatter(rng: random.Random, spec: VaultSpec, title: str, titles: list[str], number: int) -> str:
+    shape = spec.frontmatter
+    if shape == "mixed":
+        shape = rng.choices([shape for shape, _ in FRONTMATTER_MIX], [weight for _, weight in FRONTMATTER_MIX])[0]
+    if shape == "none":
+        return ""
+    if shape == "empty":
+        return "---\n---\n"
+    tags = ", ".join(_tag(rng, spec) for _ in range(rng.randint(1, max(1, spec.tags))))
+    lines = [f"title: {title}", f"created: 2024-{1 + number % 12:02d}-{1 + number % 28:02d}", f"tags: [{tags}]"]
+    if shape == "rich":
+        lines += [
+            "aliases:",
+            f"  - {title.split()[0]} {number}",
+            f"status: {rng.choice(STATUSES)}",
+            f"rating: {rng.randint(1, 10) / 2}",
+            "source:",
+            f"  url: https://example.com/{number}",
+            f"  author: {rng.choice(WORDS).capitalize()} {rng.choice(WORDS).capitalize()}",
+            f"related: [\"[[{rng.choice(titles)}]]\", \"[[{rng.choice(titles)}]]\"]"
+        ]
+    return "---\n" + "\n".join(lines) + "\n---\n"
+
+def _paragraph(rng: random.Random, spec: VaultSpec, titles: list[str], links: float, tags: float) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(20, 80))]
+    for _ in range(int(links) + (rng.random() < links % 1)):
+        target = rng.choice(titles)
+        link = f"[[{target}|{rng.choice(WORDS)}]]" if rng.random() < 0.2 else f"[[{target}]]"
+        words.insert(rng.randrange(len(words) + 1), link)
+    for _ in range(int(tags) + (rng.random() < tags % 1)):
+        words.insert(rng.randrange(len(words) + 1), f"#{_tag(rng, spec)}")
+    text = " ".join(words)
+    return text[0].upper() + text[1:] + "."
+
+def _body(rng: random.Random, spec: VaultSpec, title: str, titles: list[str]) -> str:
+    paragraphs = rng.randint(spec.min_paragraphs, spec.max_paragraphs)
+    links, tags = spec.links / paragraphs, spec.tags / paragraphs
+    blocks = [f"# {title}"]
+    for number in range(paragraphs):
+        kind = rng.random()
+        if kind < 0.1:
+            blocks.append(f"## {rng.choice(WORDS).capitalize()} {number}")
+        elif kind < 0.2:
+            blocks.append("\n".join(f"- [ ] {rng.choice(WORDS)} {rng.choice(WORDS)}" for _ in range(rng.randint(2, 6))))
+        elif kind < 0.25:
+            blocks.append(f"```python\ndef {rng.choice(WORDS)}():\n    return {number}\n```")
+        blocks.append(_paragraph(rng, spec, titles, links, tags))
+    return "\n\n".join(blocks) + "\n"
+
+def _write_hidden(rng: random.Random, vault: Path, count: int) -> None:
+    obsidian = vault / ".obsidian"
+    (obsidian / "plugins").mkdir(parents=True, exist_ok=True)
+    (obsidian / "app.json").write_text('{"livePreview": true}')
+    (obsidian / "workspace.md").write_text("# Not a note\n")
+    for number in range(count // 5):
+        plugin = obsidian / "plugins" / f"plugin-{number % 20}"
+        plugin.mkdir(exist_ok=True)
+        (plugin / f"data-{number}.json").write_text(json.dumps({"setting": number}))
+    objects = vault / ".git" / "objects"
+    for number in range(count - count // 5):
+        folder = objects / f"{number % 256:02x}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"{rng.getrandbits(152):038x}").write_bytes(rng.randbytes(rng.randint(64, 512)))
+    (vault / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+
+def generate_vault(vault_path: str, spec: VaultSpec) -> dict:
+    """Write a vault for spec below vault_path and return a summary, with the relative path of every note."""
+    if spec.frontmatter not in FRONTMATTER_SHAPES:
+        raise ValueError(f"Unknown frontmatter shape {spec.frontmatter!r}; expected one of {', '.join(FRONTMATTER_SHAPES)}")
+    rng = random.Random(spec.seed)
+    vault = Path(vault_path)
+    folders = _folders(rng, spec)
+    for folder in folders:
+        (vault / folder).mkdir(parents=True, exist_ok=True)
+
+    # Titles first, so notes can link to notes written after them.
+    titles = [_title(rng, number) for number in range(spec.notes)]
+    places = [rng.choice(folders) if folders and rng.random() < 0.9 else "" for _ in range(spec.notes)]
+    paths, total_bytes = [], 0
+    for number, (title, folder) in enumerate(zip(titles, places)):
+        content = _frontmatter(rng, spec, title, titles, number) + _body(rng, spec, title, titles)
+        path = os.path.join(folder, f"{title}.md")
+        full_path = vault / path
+        full_path.write_text(content, encoding="utf-8")
+        os.utime(full_path, (BASE_MTIME + number, BASE_MTIME + number))
+        paths.append(path)
+        total_bytes += len(content.encode("utf-8"))
+    _write_hidden(rng, vault, spec.hidden_files)
+    return {"notes": len(paths), "folders": len(folders), "note_bytes": total_bytes, "paths": paths}
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = VaultSpec()
+    parser.add_argument("--notes", type=int, default=defaults.notes)
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--fanout", type=int, default=defaults.fanout)
+    parser.add_argument("--frontmatter", choices=FRONTMATTER_SHAPES, default=defaults.frontmatter)
+    parser.add_argument("--min-paragraphs", type=int, default=defaults.min_paragraphs)
+    parser.add_argument("--max-paragraphs", type=int, default=defaults.max_paragraphs)
+    parser.add_argument("--links", type=int, default=defaults.links)
+    parser.add_argument("--tags", type=int, default=defaults.tags)
+    parser.add_argument("--tag-vocabulary", type=int, default=defaults.tag_vocabulary)
+    parser.add_argument("--hidden-files", type=int, default=defaults.hidden_files)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+def spec_from_arguments(args: argparse.Namespace) -> VaultSpec:
+    return VaultSpec(**{name: getattr(args, name) for name in asdict(VaultSpec())})
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("vault_path")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    spec = spec_from_arguments(args)
+    summary = generate_vault(args.vault_path, spec)
+    del summary["paths"]
+    print(json.dumps({"spec": asdict(spec), **summary}, indent=2))
+
+if __name__ == "__main__":
+    main()
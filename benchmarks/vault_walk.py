@@ -0,0 +1,88 @@
+"""
+Time walking a synthetic vault and collecting the stat of every folder and
+note, as the index build did before the scandir walker and with the walker on
+one thread, on a pool and on the API's worker threads. The pool only pays off
+with several cores or a disk with real latency.
+
+    uv run python -m benchmarks.vault_walk --files 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app.walker import iter_tree, walk_tree
+from benchmarks.hidden_pruning import count_calls
+
+# The index build before the scandir walker, kept here as the baseline: one
+# os.walk for folders, another for notes, and an os.stat per path.
+
+def legacy_walk(vault_path: str) -> dict[str, os.stat_result]:
+    stats = {}
+    for root, dirs, _ in os.walk(vault_path):
+        dirs[:] = [dir_name for dir_name in dirs if not dir_name.startswith('.')]
+        for dir_name in dirs:
+            full_path = os.path.join(root, dir_name)
+            stats[full_path] = os.stat(full_path)
+    for root, dirs, files in os.walk(vault_path):
+        dirs[:] = [dir_name for dir_name in dirs if not dir_name.startswith('.')]
+        for file in files:
+            if file.endswith('.md'):
+                full_path = os.path.join(root, file)
+                stats[full_path] = os.stat(full_path)
+    return stats
+
+def tree_walk(vault_path: str, threads: int) -> dict[str, os.stat_result]:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return {entry.path: entry.stats for entry in walk_tree(vault_path, executor)}
+
+def async_walk(vault_path: str) -> dict[str, os.stat_result]:
+    async def walk() -> dict[str, os.stat_result]:
+        return {entry.path: entry.stats async for entry in iter_tree(vault_path)}
+    return asyncio.run(walk())
+
+def build_vault(vault_path: str, files: int, files_per_folder: int) -> None:
+    # Three levels of folders, so subtrees can be scanned in parallel.
+    for i in range(files):
+        folder_number = i // files_per_folder
+        folder = Path(vault_path, f"Area {folder_number % 10}", f"Topic {folder_number % 100}", f"Folder {folder_number}")
+        if i % files_per_folder == 0:
+            folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"Note {i}.md").write_text(f"# Note {i}\n")
+    hidden = Path(vault_path, ".obsidian")
+    hidden.mkdir()
+    (hidden / "workspace.md").write_text("")
+
+def measure(function, *args) -> dict:
+    with count_calls() as counts:
+        start = time.perf_counter()
+        entries = function(*args)
+        elapsed = time.perf_counter() - start
+    return {"entries": len(entries), "os_stat_calls": counts["stat"], "dir_entry_stat_calls": counts["dir_entry_stat"], "scandir_calls": counts["scandir"], "seconds": round(elapsed, 4)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--files-per-folder", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as vault_path:
+        build_vault(vault_path, args.files, args.files_per_folder)
+        assert legacy_walk(vault_path).keys() == tree_walk(vault_path, args.threads).keys()
+
+        results = {
+            "files": args.files,
+            "two_os_walks_and_stat": measure(legacy_walk, vault_path),
+            "scandir_walker_1_thread": measure(tree_walk, vault_path, 1),
+            f"scandir_walker_{args.threads}_threads": measure(tree_walk, vault_path, args.threads),
+            "scandir_walker_async": measure(async_walk, vault_path)
+        }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Time a cold index build of a synthetic vault against a warm one restored from
+the snapshot in the state folder, with a few notes edited in between.
+
+    uv run python -m benchmarks.warm_restart --notes 50000 --edits 100
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.index import VaultIndex
+
+def build_vault(vault_path: str, notes: int) -> None:
+    for i in range(notes):
+        folder = Path(vault_path, f"Area {i % 10}", f"Topic {i % 100}")
+        folder.mkdir(parents=True, exist_ok=True)
+        frontmatter = f"---\ntitle: Note {i}\ntags: [area{i % 10}]\n---\n" if i % 3 == 0 else ""
+        (folder / f"Note {i}.md").write_text(f"{frontmatter}# Note {i}\n\nSee [[Note {(i + 1) % notes}]] #topic{i % 100}\n")
+
+def measure_build(vault_path: str) -> dict:
+    start = time.perf_counter()
+    index = VaultIndex(vault_path)
+    index.build()
+    elapsed = time.perf_counter() - start
+    notes = len(index.files())
+    index.close()
+    return {"notes": notes, "seconds": round(elapsed, 3)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=50000)
+    parser.add_argument("--edits", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as vault_path, tempfile.TemporaryDirectory() as state_path:
+        os.environ["OBSIDIAN_API_VAULT_PATH"] = vault_path
+        os.environ["OBSIDIAN_API_STATE_PATH"] = state_path
+        build_vault(vault_path, args.notes)
+        cold = measure_build(vault_path)
+        unchanged = measure_build(vault_path)
+        for i in range(args.edits):
+            with open(os.path.join(vault_path, f"Area {i % 10}", f"Topic {i % 100}", f"Note {i}.md"), "a") as f:
+                f.write(f"\nEdited #edit{i}\n")
+        edited = measure_build(vault_path)
+        snapshot_bytes = os.path.getsize(os.path.join(state_path, "index.snapshot"))
+    print(json.dumps({
+        "notes": args.notes,
+        "snapshot_bytes": snapshot_bytes,
+        "cold_build": cold,
+        "warm_build": unchanged,
+        f"warm_build_after_{args.edits}_edits": edited
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
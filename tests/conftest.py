@@ -3,6 +3,7 @@ import tempfile
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.index import close_vault_index
 
 @pytest.fixture
 def test_vault():
@@ -33,4 +34,5 @@ def test_vault():
 def client(test_vault, monkeypatch):
     """Create a test client with a temporary vault."""
     monkeypatch.setenv("OBSIDIAN_API_VAULT_PATH", test_vault)
-    return TestClient(app) 
\ No newline at end of file
+    yield TestClient(app)
+    close_vault_index()
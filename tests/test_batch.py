@@ -0,0 +1,153 @@
+import asyncio
+import os
+import threading
+import frontmatter
+from app import batch as batch_module
+from app.batch import apply_batch, plan_waves
+from app.models import BatchRequest
+from app.utils import merge_frontmatter
+
+def test_batch_get_returns_items_in_order_with_status(client):
+    response = client.post("/files/batch:get", json={"paths": [
+        "Projects/test3.md",
+        "Notes/missing.md",
+        "../outside.md",
+        "Notes/file_with_frontmatter.md"
+    ]})
+    assert response.status_code == 200
+    results = response.json()
+    assert [(r["path"], r["status"]) for r in results] == [
+        ("Projects/test3.md", 200),
+        ("Notes/missing.md", 404),
+        ("../outside.md", 400),
+        ("Notes/file_with_frontmatter.md", 200)
+    ]
+    assert results[0]["file"]["content"]["body"] == "# Test File 3"
+    assert results[1]["file"] is None and "not found" in results[1]["detail"]
+    assert results[3]["file"]["content"]["frontmatter"] == {"title": "New Note", "tags": ["note", "test"]}
+
+def test_batch_get_fields(client):
+    response = client.post("/files/batch:get", json={
+        "paths": ["Notes/test1.md", "Notes/file_with_frontmatter.md"],
+        "fields": ["metadata.path", "content.frontmatter"]
+    })
+    assert response.status_code == 200
+    assert [r["file"] for r in response.json()] == [
+        {"metadata": {"path": "Notes/test1.md"}, "content": {"frontmatter": None}},
+        {"metadata": {"path": "Notes/file_with_frontmatter.md"}, "content": {"frontmatter": {"title": "New Note", "tags": ["note", "test"]}}}
+    ]
+
+    assert client.post("/files/batch:get", json={"paths": ["Notes/test1.md"], "fields": ["nope"]}).status_code == 400
+
+def test_batch_applies_operations_in_order(client):
+    response = client.post("/batch", json={"operations": [
+        {"op": "create", "path": "Inbox/new.md", "frontmatter": {"status": "draft"}, "body": "Hello"},
+        {"op": "merge_frontmatter", "path": "Inbox/new.md", "frontmatter": {"project": "alpha"}},
+        {"op": "put_body", "path": "Notes/test1.md", "body": "Rewritten"},
+        {"op": "merge_frontmatter", "path": "Notes/missing.md", "frontmatter": {"project": "alpha"}},
+        {"op": "move", "path": "Projects", "destination": "Archive/Projects"},
+        {"op": "move", "path": "Inbox/new.md", "destination": "Archive/new.md"}
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["committed"] is True
+    assert [(r["status"], r["path"]) for r in data["results"]] == [
+        (200, "Inbox/new.md"),
+        (200, "Inbox/new.md"),
+        (200, "Notes/test1.md"),
+        (404, "Notes/missing.md"),
+        (200, "Archive/Projects"),
+        (200, "Archive/new.md")
+    ]
+
+    moved = client.get("/files/Archive/new.md").json()
+    assert moved["content"] == {"frontmatter": {"status": "draft", "project": "alpha"}, "body": "Hello"}
+    assert client.get("/files/Notes/test1.md/body").text == "Rewritten"
+    assert client.get("/files/Archive/Projects/test3.md").status_code == 200
+    paths = {f["metadata"]["path"] for f in client.get("/files").json()}
+    assert "Projects/test3.md" not in paths and "Inbox/new.md" not in paths
+
+def test_atomic_batch_rolls_back(client):
+    before = {f["metadata"]["path"]: f["content"] for f in client.get("/files").json()}
+    folders_before = {f["metadata"]["path"] for f in client.get("/folders").json()}
+
+    response = client.post("/batch", json={"atomic": True, "operations": [
+        {"op": "create", "path": "Inbox/Deep/new.md", "body": "Hello"},
+        {"op": "merge_frontmatter", "path": "Notes/file_with_frontmatter.md", "frontmatter": {"title": "Changed"}},
+        {"op": "move", "path": "Notes/test2.md", "destination": "Archive/test2.md"},
+        {"op": "create", "path": "Notes/test1.md", "body": "Already exists"},
+        {"op": "put_body", "path": "Projects/test3.md", "body": "Never applied"}
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["committed"] is False
+    assert [r["status"] for r in data["results"]] == [424, 424, 424, 409, 424]
+
+    assert {f["metadata"]["path"]: f["content"] for f in client.get("/files").json()} == before
+    assert {f["metadata"]["path"] for f in client.get("/folders").json()} == folders_before
+
+def test_atomic_batch_holds_its_locks_until_it_rolls_back(client, test_vault, monkeypatch):
+    client.get("/files")
+    path = os.path.join(test_vault, "Notes", "test1.md")
+    operations = BatchRequest(operations=[
+        {"op": "merge_frontmatter", "path": "Notes/test1.md", "frontmatter": {"batch": True}},
+        {"op": "move", "path": "Notes/test1.md", "destination": "Notes/test2.md"}
+    ]).operations
+    rolling_back = threading.Event()
+    resume = threading.Event()
+    rollback = batch_module._rollback
+
+    def paused_rollback(applied):
+        rolling_back.set()
+        resume.wait(5)
+        rollback(applied)
+    monkeypatch.setattr(batch_module, "_rollback", paused_rollback)
+
+    async def main():
+        batch = asyncio.create_task(apply_batch(operations, atomic=True))
+        while not rolling_back.is_set():
+            await asyncio.sleep(0.01)
+        # Lands while the batch rolls back, so it must wait for the rollback to finish.
+        merge = asyncio.create_task(merge_frontmatter(path, {"concurrent": True}))
+        await asyncio.sleep(0.1)
+        resume.set()
+        return await asyncio.gather(batch, merge)
+    response, _ = asyncio.run(main())
+
+    assert response.committed is False
+    assert frontmatter.load(path).metadata == {"concurrent": True}
+
+def test_rollback_skips_files_changed_outside_the_batch(client, test_vault, monkeypatch):
+    changed_path = os.path.join(test_vault, "Notes", "test1.md")
+    create = batch_module.OPERATIONS["create"]
+
+    def create_after_an_outside_edit(index, operation):
+        if operation.path == "Inbox/moved.md":
+            with open(changed_path, "w") as f:
+                f.write("Edited elsewhere")
+        return create(index, operation)
+    monkeypatch.setitem(batch_module.OPERATIONS, "create", create_after_an_outside_edit)
+
+    response = client.post("/batch", json={"atomic": True, "operations": [
+        {"op": "create", "path": "Inbox/new.md", "body": "Hello"},
+        {"op": "put_body", "path": "Notes/test1.md", "body": "Batch"},
+        {"op": "merge_frontmatter", "path": "Inbox/new.md", "frontmatter": {"status": "draft"}},
+        {"op": "move", "path": "Inbox/new.md", "destination": "Inbox/moved.md"},
+        {"op": "merge_frontmatter", "path": "Inbox/moved.md", "frontmatter": {"status": "done"}},
+        {"op": "create", "path": "Inbox/moved.md", "body": "Already exists"}
+    ]})
+    assert [r["status"] for r in response.json()["results"]] == [424, 424, 424, 424, 424, 409]
+
+    # Everything the batch wrote is undone, through the move, except the note edited since.
+    assert not os.path.exists(os.path.join(test_vault, "Inbox"))
+    assert open(changed_path).read() == "Edited elsewhere"
+
+def test_plan_waves_orders_related_paths():
+    operations = BatchRequest(operations=[
+        {"op": "put_body", "path": "a/one.md", "body": ""},
+        {"op": "put_body", "path": "b/two.md", "body": ""},
+        {"op": "move", "path": "a", "destination": "c"},
+        {"op": "put_body", "path": "c/one.md", "body": ""},
+        {"op": "put_body", "path": "d.md", "body": ""}
+    ]).operations
+    assert plan_waves(operations) == [[0, 1], [2], [3, 4]]
@@ -0,0 +1,47 @@
+import os
+from app.cache import CachedContent, ContentCache, get_content_cache
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.md"
+        path.write_text(name * 100)
+        paths.append(str(path))
+
+    cache = ContentCache(max_bytes=2 * CachedContent(text="a" * 100, mtime_ns=0, size=0).cost)
+    for path in paths[:2]:
+        cache.put(path, os.stat(path), open(path).read())
+    assert cache.get(paths[0], os.stat(paths[0])) is not None
+
+    cache.put(paths[2], os.stat(paths[2]), open(paths[2]).read())
+    assert cache.get(paths[1], os.stat(paths[1])) is None
+    assert cache.get(paths[0], os.stat(paths[0])) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+def test_cache_is_validated_against_stat(tmp_path):
+    path = tmp_path / "note.md"
+    path.write_text("# One")
+    cache = ContentCache(max_bytes=1024 * 1024)
+    cache.put(str(path), os.stat(path), "# One")
+
+    path.write_text("# Two, longer")
+    assert cache.get(str(path), os.stat(path)) is None
+    assert cache.stats()["misses"] == 1
+
+def test_read_routes_share_cache(client):
+    get_content_cache().clear()
+    stats = client.get("/metrics").json()["content_cache"]
+
+    # /raw streams straight from disk and leaves the cache alone.
+    assert client.get("/files/Notes/file_with_frontmatter.md/raw").status_code == 200
+    assert client.get("/files/Notes/file_with_frontmatter.md/body").text == "# New File"
+    assert client.get("/files/Notes/file_with_frontmatter.md/frontmatter").json() == {"title": "New Note", "tags": ["note", "test"]}
+    assert client.get("/files/Notes/file_with_frontmatter.md").json()["content"]["body"] == "# New File"
+
+    after = client.get("/metrics").json()["content_cache"]
+    assert after["misses"] - stats["misses"] == 1
+    assert after["hits"] - stats["hits"] == 2
+
+    client.put("/files/Notes/file_with_frontmatter.md/body", content="# Changed")
+    assert client.get("/files/Notes/file_with_frontmatter.md/body").text == "# Changed"
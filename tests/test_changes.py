@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+from app.changes import ChangeJournal
+from app.index import VaultIndex
+from app.models import ResourceType
+from tests.test_index import wait_for
+
+def read_changes(client, since):
+    params = {"follow": "false"} if since is None else {"since": since, "follow": "false"}
+    response = client.get("/changes", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for block in response.text.split("\n\n"):
+        if block:
+            fields = dict(line.split(": ", 1) for line in block.split("\n"))
+            data = json.loads(fields["data"])
+            assert int(fields["id"]) == data["seq"] and fields["event"] == data["change"]
+            events.append(data)
+    return events, int(response.headers["X-Last-Sequence"])
+
+def summary(events):
+    return [(event["change"], event["type"], event["path"], event["previous_path"]) for event in events]
+
+def test_write_routes_are_journaled(client):
+    _, cursor = read_changes(client, None)
+
+    client.post("/files/Ideas/new.md", json={"body": "# New"})
+    client.put("/files/Notes/test1.md/body", content="Updated")
+    client.patch("/folders/Projects", json={"path": "Done"})
+    events, next_cursor = read_changes(client, cursor)
+
+    assert summary(events) == [
+        ("created", "folder", "Ideas", None),
+        ("created", "file", "Ideas/new.md", None),
+        ("modified", "file", "Notes/test1.md", None),
+        ("moved", "folder", "Done", "Projects"),
+        ("moved", "file", "Done/test3.md", "Projects/test3.md")
+    ]
+    assert [event["seq"] for event in events] == sorted({event["seq"] for event in events})
+    assert next_cursor == events[-1]["seq"]
+    # Resuming from the middle replays only what came after.
+    assert read_changes(client, events[2]["seq"])[0] == events[3:]
+    assert read_changes(client, next_cursor)[0] == []
+
+def test_external_edits_are_journaled(client):
+    _, cursor = read_changes(client, None)
+    vault = Path(os.getenv("OBSIDIAN_API_VAULT_PATH"))
+
+    (vault / "Notes" / "external.md").write_text("# External")
+    (vault / "Notes" / "test2.md").unlink()
+    assert wait_for(lambda: len(read_changes(client, cursor)[0]) == 2)
+    assert sorted(summary(read_changes(client, cursor)[0])) == [
+        ("created", "file", "Notes/external.md", None),
+        ("deleted", "file", "Notes/test2.md", None)
+    ]
+
+def test_cursors_older_than_the_journal_are_gone(client, monkeypatch):
+    monkeypatch.setenv("OBSIDIAN_API_CHANGE_JOURNAL_SIZE", "2")
+    _, cursor = read_changes(client, None)
+    assert client.get("/changes", params={"since": cursor - 1, "follow": "false"}).status_code == 410
+
+    client.post("/files/Notes/new0.md", json={"body": "# New"})
+    (first,), _ = read_changes(client, cursor)
+    for i in range(1, 3):
+        client.post(f"/files/Notes/new{i}.md", json={"body": "# New"})
+    assert client.get("/changes", params={"since": cursor, "follow": "false"}).status_code == 410
+    events, _ = read_changes(client, first["seq"])
+    assert [event["path"] for event in events] == ["Notes/new1.md", "Notes/new2.md"]
+    # An EventSource reconnecting sends the id of the last event it saw.
+    response = client.get("/changes", params={"since": cursor, "follow": "false"}, headers={"Last-Event-ID": str(events[0]["seq"])})
+    assert response.status_code == 200 and "Notes/new2.md" in response.text and "Notes/new1.md" not in response.text
+
+def test_journal_wakes_waiting_streams():
+    journal = ChangeJournal(10)
+    _, cursor = journal.since(None)
+
+    async def wait():
+        waiting = asyncio.create_task(journal.wait(cursor))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        threading.Thread(target=journal.record, args=("created", ResourceType.FILE, "a.md")).start()
+        await asyncio.wait_for(waiting, 5)
+
+    asyncio.run(wait())
+    changes, _ = journal.since(cursor)
+    assert [change.path for change in changes] == ["a.md"]
+
+def test_journal_survives_warm_restart(test_vault, tmp_path, monkeypatch):
+    monkeypatch.setenv("OBSIDIAN_API_VAULT_PATH", test_vault)
+    monkeypatch.setenv("OBSIDIAN_API_STATE_PATH", str(tmp_path / "state"))
+    index = VaultIndex(test_vault)
+    index.build()
+    assert index.changes.since(index.changes.horizon) == ([], index.changes.last_seq)
+    index.update_file(os.path.join(test_vault, "Notes", "test1.md"))
+    _, cursor = index.changes.since(None)
+    index.close()
+
+    os.remove(os.path.join(test_vault, "Notes", "test2.md"))
+    index = VaultIndex(test_vault)
+    index.build()
+    changes, _ = index.changes.since(cursor - 1)
+    assert [(change.change, change.path) for change in changes] == [("modified", "Notes/test1.md"), ("deleted", "Notes/test2.md")]
+    index.close()
@@ -0,0 +1,45 @@
+import frontmatter
+import pytest
+from app.utils import (
+    FRONTMATTER_CODECS,
+    FrontmatterCodec,
+    dump_markdown,
+    merge_frontmatter_text,
+    parse_markdown,
+    register_frontmatter_codec,
+)
+
+NOTES = [
+    "# Plain note\n\nNo frontmatter here.\n",
+    "\n\n  Leading whitespace  \n",
+    "---\n---\n\nEmpty block",
+    "---\ntitle: Note\ntags: [a, b]\ncreated: 2024-01-02\nnested:\n  key: value\n---\n\n# Body\n",
+    "---\ntitle: Ünïcödé ✓\naliases:\n  - Other\n---\nBody",
+    "---\nnot closed",
+    "- a list item\n- another",
+    "{\n\"title\": \"JSON\"\n}\nBody",
+    "---\n- just\n- a list\n---\nBody",
+]
+
+@pytest.mark.parametrize("codec", sorted(FRONTMATTER_CODECS))
+@pytest.mark.parametrize("note", NOTES)
+def test_codecs_match_python_frontmatter(codec, note, monkeypatch):
+    monkeypatch.setenv("OBSIDIAN_API_FRONTMATTER_CODEC", codec)
+    post = frontmatter.loads(note)
+
+    assert parse_markdown(note) == (post.content, post.metadata or None)
+    assert dump_markdown(post.metadata, post.content) == frontmatter.dumps(frontmatter.Post(post.content, **post.metadata))
+
+    post.metadata = {**post.metadata, "status": "done"}
+    assert merge_frontmatter_text(note, {"status": "done"}) == frontmatter.dumps(post)
+
+def test_notes_without_frontmatter_skip_the_codec(monkeypatch):
+    def fail(*args):
+        raise AssertionError("codec called")
+    register_frontmatter_codec(FrontmatterCodec("failing", fail, fail))
+    monkeypatch.setenv("OBSIDIAN_API_FRONTMATTER_CODEC", "failing")
+    try:
+        assert parse_markdown("# Just a body") == ("# Just a body", None)
+        assert parse_markdown("---\n---\nBody") == ("Body", None)
+    finally:
+        del FRONTMATTER_CODECS["failing"]
@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+from pathlib import Path
+import pytest
+from app import compression
+from app.compression import get_compression_cache, negotiate_encoding
+
+@pytest.fixture
+def big_note(client, monkeypatch):
+    vault = Path(os.getenv("OBSIDIAN_API_VAULT_PATH"))
+    body = "\n\n".join(f"Paragraph {i} about [[test1]] and #topic{i % 5}." for i in range(500))
+    (vault / "Notes" / "big.md").write_text(body)
+    monkeypatch.setattr(compression, "_compression_cache", None)
+    return body
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("zstd;q=0, gzip;q=0.5") == "gzip"
+    assert negotiate_encoding("*;q=0.5, zstd;q=0") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("") is None
+
+def test_zstd_is_preferred():
+    assert negotiate_encoding("gzip, zstd") == "zstd"
+    assert negotiate_encoding("gzip, zstd;q=0.1") == "gzip"
+    assert negotiate_encoding("br;q=1, *;q=0.5") == "zstd"
+
+def test_json_listing_is_compressed_and_cached_by_etag(client, big_note):
+    headers = {"Accept-Encoding": "gzip"}
+    response = client.get("/files", headers=headers)
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(response.content)
+    listing = response.json()
+    assert any(item["content"]["body"] == big_note for item in listing)
+    assert get_compression_cache().stats()["misses"] == 1
+
+    again = client.get("/files", headers=headers)
+    assert again.json() == listing and again.headers["etag"] == response.headers["etag"]
+    assert get_compression_cache().stats()["hits"] == 1
+    # Conditional requests compare the ETag of the uncompressed representation.
+    assert client.get("/files", headers={**headers, "If-None-Match": response.headers["etag"]}).status_code == 304
+
+    client.put("/files/Notes/test1.md/body", content="Edited")
+    changed = client.get("/files", headers=headers)
+    assert changed.headers["etag"] != response.headers["etag"]
+    assert get_compression_cache().stats()["misses"] == 2
+
+def test_small_and_unaccepted_responses_are_not_compressed(client, big_note):
+    assert "content-encoding" not in client.get("/files/Notes/test1.md/body", headers={"Accept-Encoding": "gzip"}).headers
+    response = client.get("/files", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+def test_streams_are_compressed_chunk_by_chunk(client, big_note):
+    with client.stream("GET", "/files", headers={"Accept": "application/x-ndjson", "Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert len(lines) == 5 and json.loads(lines[0])["metadata"]["path"] == "Notes/big.md"
+
+def test_raw_notes_are_compressed_and_cached(client, big_note):
+    for encoding in compression.SUPPORTED_ENCODINGS:
+        first = client.get("/files/Notes/big.md/raw", headers={"Accept-Encoding": encoding})
+        second = client.get("/files/Notes/big.md/raw", headers={"Accept-Encoding": encoding})
+        assert first.headers["content-encoding"] == second.headers["content-encoding"] == encoding
+        assert first.text == second.text == big_note
+    assert get_compression_cache().stats()["hits"] == len(compression.SUPPORTED_ENCODINGS)
+    # Ranges address the identity bytes, so partial responses are never compressed.
+    partial = client.get("/files/Notes/big.md/raw", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-9"})
+    assert partial.status_code == 206 and partial.content == big_note[:10].encode()
+
+def test_compressed_bodies_are_separate_representations(client, big_note):
+    identity = client.get("/files/Notes/big.md/raw", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/files/Notes/big.md/raw", headers={"Accept-Encoding": "gzip"})
+    assert identity.headers["accept-ranges"] == "bytes"
+    assert "accept-ranges" not in compressed.headers
+    assert compressed.headers["etag"] == identity.headers["etag"][:-1] + '-gzip"'
+
+    # Resuming a compressed download must not splice in identity bytes.
+    resumed = client.get("/files/Notes/big.md/raw", headers={"Accept-Encoding": "identity", "Range": "bytes=100-", "If-Range": compressed.headers["etag"]})
+    assert resumed.status_code == 200 and resumed.text == big_note
+    resumed = client.get("/files/Notes/big.md/raw", headers={"Accept-Encoding": "identity", "Range": "bytes=100-", "If-Range": identity.headers["etag"]})
+    assert resumed.status_code == 206 and resumed.text == big_note[100:]
+
+    # Validators accept the ETag of either representation.
+    assert client.get("/files/Notes/big.md/raw", headers={"If-None-Match": compressed.headers["etag"]}).status_code == 304
+    assert client.put("/files/Notes/big.md/body", content="Edited", headers={"If-Match": compressed.headers["etag"]}).status_code == 200
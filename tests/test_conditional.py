@@ -0,0 +1,102 @@
+import asyncio
+import os
+import httpx
+from app.main import app
+from email.utils import formatdate
+
+def test_file_routes_return_304_for_current_etag(client):
+    for route in ["", "/raw", "/metadata", "/frontmatter", "/body"]:
+        response = client.get(f"/files/Notes/test1.md{route}")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert "Last-Modified" in response.headers
+
+        not_modified = client.get(f"/files/Notes/test1.md{route}", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["ETag"] == etag
+
+    etag = client.get("/files/Notes/test1.md", params={"fields": "metadata.path"}).headers["ETag"]
+    assert client.get("/files/Notes/test1.md", params={"fields": "metadata.path"}, headers={"If-None-Match": etag}).status_code == 304
+
+def test_file_etag_changes_after_write(client):
+    etag = client.get("/files/Notes/test1.md").headers["ETag"]
+    client.put("/files/Notes/test1.md/body", content="Changed")
+    response = client.get("/files/Notes/test1.md", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_if_modified_since(client, test_vault):
+    mtime = os.stat(os.path.join(test_vault, "Notes", "test1.md")).st_mtime
+    assert client.get("/files/Notes/test1.md", headers={"If-Modified-Since": formatdate(mtime + 1, usegmt=True)}).status_code == 304
+    assert client.get("/files/Notes/test1.md", headers={"If-Modified-Since": formatdate(mtime - 10, usegmt=True)}).status_code == 200
+    assert client.get("/files/Notes/test1.md", headers={"If-Modified-Since": "not a date"}).status_code == 200
+
+def test_listings_use_vault_generation(client):
+    response = client.get("/files")
+    etag = response.headers["ETag"]
+    assert client.get("/files", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/folders", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/files/Notes/test1.md/backlinks", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/files/Notes/new.md", json={"body": "New"})
+    assert client.get("/files", headers={"If-None-Match": etag}).status_code == 200
+
+def test_folder_etag(client):
+    etag = client.get("/folders/Notes").headers["ETag"]
+    assert client.get("/folders/Notes", headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+
+def test_raw_file_supports_ranges(client):
+    client.put("/files/Notes/test1.md/raw", content="0123456789" * 10000)
+
+    response = client.get("/files/Notes/test1.md/raw", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.text == "0123456789"
+    assert response.headers["Content-Range"] == "bytes 0-9/100000"
+
+    etag = response.headers["ETag"]
+    assert client.get("/files/Notes/test1.md/raw", headers={"Range": "bytes=99995-"}).text == "56789"
+    assert client.get("/files/Notes/test1.md/raw", headers={"Range": "bytes=0-9", "If-Range": etag}).status_code == 206
+    assert client.get("/files/Notes/test1.md/raw", headers={"Range": "bytes=0-9", "If-Range": '"stale"'}).status_code == 200
+    assert client.get("/files/Notes/test1.md/raw", headers={"Range": "bytes=200000-"}).status_code == 416
+
+def test_writes_honor_if_match(client):
+    etag = client.get("/files/Notes/test1.md").headers["ETag"]
+
+    response = client.put("/files/Notes/test1.md/body", content="First", headers={"If-Match": etag})
+    assert response.status_code == 200
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+    assert client.get("/files/Notes/test1.md").headers["ETag"] == new_etag
+
+    # A second writer still holding the old ETag loses instead of overwriting.
+    response = client.patch("/files/Notes/test1.md/frontmatter", json={"status": "done"}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert client.get("/files/Notes/test1.md/body").text == "First"
+
+    assert client.put("/files/Notes/test1.md/frontmatter", json={}, headers={"If-Match": f"W/{new_etag}"}).status_code == 412
+    assert client.patch("/files/Notes/test1.md/frontmatter", json={"status": "done"}, headers={"If-Match": "*"}).status_code == 200
+
+def test_concurrent_writers_with_the_same_etag_let_exactly_one_win(client):
+    etag = client.get("/files/Notes/test1.md").headers["ETag"]
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as async_client:
+            return await asyncio.gather(
+                *(async_client.put("/files/Notes/test1.md/frontmatter", json={"writer": i}, headers={"If-Match": etag}) for i in range(5)),
+                *(async_client.patch("/files/Notes/test1.md/frontmatter", json={"patcher": i}, headers={"If-Match": etag}) for i in range(5))
+            )
+    responses = asyncio.run(main())
+
+    assert sorted(response.status_code for response in responses) == [200] + [412] * 9
+    winner = next(response for response in responses if response.status_code == 200)
+    assert client.get("/files/Notes/test1.md/frontmatter").json() == winner.json()["content"]["frontmatter"]
+
+def test_writes_replace_files_atomically(client, test_vault):
+    path = os.path.join(test_vault, "Notes", "test1.md")
+    os.chmod(path, 0o640)
+    client.put("/files/Notes/test1.md/raw", content="Replaced")
+
+    assert open(path).read() == "Replaced"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert sorted(os.listdir(os.path.join(test_vault, "Notes"))) == ["file_with_frontmatter.md", "test1.md", "test2.md"]
@@ -0,0 +1,57 @@
+import os
+import time
+from pathlib import Path
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+def listed_paths(client, route):
+    return {item["metadata"]["path"] for item in client.get(route).json()}
+
+def test_listing_does_not_walk_vault(client, monkeypatch):
+    assert "Notes/test1.md" in listed_paths(client, "/files")
+
+    def fail_walk(*args, **kwargs):
+        raise AssertionError("listing walked the vault")
+    monkeypatch.setattr(os, "walk", fail_walk)
+
+    assert len(listed_paths(client, "/files")) == 4
+    assert listed_paths(client, "/folders") == {"Notes", "Projects"}
+
+def test_writes_are_visible_immediately(client):
+    client.get("/files")
+
+    response = client.post("/files/Ideas/Sub/idea.md", json={"frontmatter": {"status": "draft"}, "body": "# Idea"})
+    assert response.status_code == 200
+    assert "Ideas/Sub/idea.md" in listed_paths(client, "/files")
+    assert {"Ideas", "Ideas/Sub"} <= listed_paths(client, "/folders")
+
+    response = client.patch("/files/Ideas/Sub/idea.md/frontmatter", json={"status": "done"})
+    files = {f["metadata"]["path"]: f for f in client.get("/files").json()}
+    assert files["Ideas/Sub/idea.md"]["content"]["frontmatter"] == {"status": "done"}
+
+    response = client.patch("/folders/Ideas", json={"path": "Archive/Ideas"})
+    assert response.status_code == 200
+    paths = listed_paths(client, "/files")
+    assert "Archive/Ideas/Sub/idea.md" in paths
+    assert "Ideas/Sub/idea.md" not in paths
+    assert "Ideas" not in listed_paths(client, "/folders")
+
+def test_external_edits_are_picked_up(client):
+    client.get("/files")
+    vault = Path(os.getenv("OBSIDIAN_API_VAULT_PATH"))
+
+    (vault / "Notes" / "external.md").write_text("---\ntitle: External\n---\n# External")
+    assert wait_for(lambda: "Notes/external.md" in listed_paths(client, "/files"))
+
+    (vault / "Notes" / "test2.md").unlink()
+    assert wait_for(lambda: "Notes/test2.md" not in listed_paths(client, "/files"))
+
+    (vault / "Projects").rename(vault / "Done")
+    assert wait_for(lambda: "Done/test3.md" in listed_paths(client, "/files"))
+    assert "Projects" not in listed_paths(client, "/folders")
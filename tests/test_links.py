@@ -0,0 +1,43 @@
+from app.links import parse_links
+
+def test_links_resolve_and_report_unresolved(client):
+    client.post("/files/Notes/hub.md", json={
+        "frontmatter": {"related": "[[test2]]"},
+        "body": "See [[test1|the first test]], ![[Projects/test3#Heading]], [raw](../Projects/test3.md) and [[Missing Note]]."
+    })
+
+    response = client.get("/files/Notes/hub.md/links")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"target": "test2", "path": "Notes/test2.md"},
+        {"target": "test1", "path": "Notes/test1.md"},
+        {"target": "Projects/test3", "path": "Projects/test3.md"},
+        {"target": "Missing Note", "path": None},
+        {"target": "../Projects/test3.md", "path": "Projects/test3.md"}
+    ]
+
+    assert client.get("/files/Projects/test3.md/backlinks").json() == [
+        {"path": "Notes/hub.md", "target": "../Projects/test3.md"},
+        {"path": "Notes/hub.md", "target": "Projects/test3"}
+    ]
+    assert client.get("/files/Notes/missing.md/links").status_code == 404
+
+def test_links_follow_creates_and_moves(client):
+    client.post("/files/Notes/hub.md", json={"body": "Waiting for [[Later]]"})
+    assert client.get("/files/Notes/hub.md/links").json() == [{"target": "Later", "path": None}]
+
+    client.post("/files/Projects/Later.md", json={"body": "Here now"})
+    assert client.get("/files/Notes/hub.md/links").json() == [{"target": "Later", "path": "Projects/Later.md"}]
+    assert client.get("/files/Projects/Later.md/backlinks").json() == [{"path": "Notes/hub.md", "target": "Later"}]
+
+    client.patch("/files/Notes/hub.md/metadata", json={"path": "Archive/hub.md"})
+    assert client.get("/files/Projects/Later.md/backlinks").json() == [{"path": "Archive/hub.md", "target": "Later"}]
+
+    # A note next to the linking note wins over one elsewhere in the vault.
+    client.post("/files/Archive/Later.md", json={"body": "Closer"})
+    assert client.get("/files/Archive/hub.md/links").json() == [{"target": "Later", "path": "Archive/Later.md"}]
+    assert client.get("/files/Projects/Later.md/backlinks").json() == []
+
+def test_parse_links_skips_code_and_attachments():
+    body = "[[real]] `[[inline]]`\n```\n[[fenced]]\n```\n![[image.png]] [site](https://example.com/page.md)"
+    assert parse_links("Notes/a.md", body) == [("real", "real")]
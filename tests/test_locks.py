@@ -0,0 +1,92 @@
+import asyncio
+import os
+import frontmatter
+from app.locks import PathLockManager, get_path_locks
+from app.utils import merge_frontmatter, write_frontmatter
+
+def test_concurrent_merges_are_coalesced_without_lost_updates(tmp_path):
+    path = str(tmp_path / "note.md")
+    with open(path, "w") as f:
+        f.write("---\ntitle: Note\n---\nBody")
+    locks = get_path_locks()
+    coalesced = locks.coalesced_writes
+
+    async def main():
+        await asyncio.gather(*(merge_frontmatter(path, {f"key{i}": i, "last": i}) for i in range(20)))
+    asyncio.run(main())
+
+    post = frontmatter.load(path)
+    assert post.metadata == {"title": "Note", "last": 19, **{f"key{i}": i for i in range(20)}}
+    assert post.content == "Body"
+    assert locks.coalesced_writes > coalesced
+    assert locks.stats()["locked_paths"] == 0
+
+def test_locks_serialize_same_path_only():
+    locks = PathLockManager()
+    events = []
+
+    async def hold(path, name, delay):
+        async with locks.hold(path):
+            events.append(f"{name} start")
+            await asyncio.sleep(delay)
+            events.append(f"{name} end")
+
+    async def main():
+        task_a = asyncio.create_task(hold("/vault/a.md", "a1", 0.02))
+        task_b = asyncio.create_task(hold(os.path.join("/vault", ".", "a.md"), "a2", 0))
+        task_c = asyncio.create_task(hold("/vault/c.md", "c", 0))
+        await asyncio.sleep(0.01)
+        assert locks.queue_depth() == 1
+        await asyncio.gather(task_a, task_b, task_c)
+    asyncio.run(main())
+
+    assert events.index("c end") < events.index("a1 end")
+    assert events.index("a1 end") < events.index("a2 start")
+    assert locks.stats() == {"locked_paths": 0, "queue_depth": 0, "max_queue_depth": 1, "coalesced_writes": 0}
+
+def test_cancelled_merges_are_not_applied(tmp_path):
+    path = str(tmp_path / "note.md")
+    with open(path, "w") as f:
+        f.write("---\ntitle: Note\n---\nBody")
+    locks = PathLockManager()
+
+    async def write(full_path, merged_data):
+        post = frontmatter.load(full_path)
+        post.metadata.update(merged_data)
+        frontmatter.dump(post, full_path)
+        return merged_data
+
+    async def main():
+        async with locks.hold(path):
+            cancelled = asyncio.create_task(locks.merge(path, {"cancelled": True}, write))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            await asyncio.gather(cancelled, return_exceptions=True)
+        return await locks.merge(path, {"status": "done"}, write)
+    assert asyncio.run(main()) == {"status": "done"}
+
+    assert frontmatter.load(path).metadata == {"title": "Note", "status": "done"}
+    assert locks._open_batches == {}
+
+def test_merges_are_not_coalesced_across_other_writers(tmp_path):
+    path = str(tmp_path / "note.md")
+    with open(path, "w") as f:
+        f.write("---\ntitle: Note\n---\nBody")
+    locks = get_path_locks()
+
+    async def main():
+        async with locks.hold(path):
+            early = asyncio.create_task(merge_frontmatter(path, {"early": True}))
+            await asyncio.sleep(0)
+            replace = asyncio.create_task(write_frontmatter(path, {"replaced": True}))
+            await asyncio.sleep(0)
+            late = asyncio.create_task(merge_frontmatter(path, {"late": True}))
+            await asyncio.sleep(0)
+        return await asyncio.gather(early, replace, late)
+    early, replace, late = asyncio.run(main())
+
+    assert early.content.frontmatter == {"title": "Note", "early": True}
+    assert replace.content.frontmatter == {"replaced": True}
+    assert late.content.frontmatter == {"replaced": True, "late": True}
+    assert frontmatter.load(path).metadata == {"replaced": True, "late": True}
+    assert locks.stats()["locked_paths"] == 0
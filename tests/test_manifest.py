@@ -0,0 +1,54 @@
+import hashlib
+import os
+from pathlib import Path
+from app import index as index_module
+
+def disk_digest(folder: Path) -> str:
+    # The digest as a client computes it over its own copy of the vault.
+    lines = []
+    for child in sorted(folder.iterdir(), key=lambda child: child.name):
+        if child.is_dir():
+            lines.append(f"folder {disk_digest(child)} {child.name}\n")
+        elif child.suffix == ".md":
+            lines.append(f"file {hashlib.sha256(child.read_bytes()).hexdigest()} {child.name}\n")
+    return hashlib.sha256("".join(lines).encode()).hexdigest()
+
+def test_manifest_digests_roll_up_child_hashes(client):
+    vault = Path(os.getenv("OBSIDIAN_API_VAULT_PATH"))
+    os.makedirs(vault / "Projects" / "Empty")
+
+    root = client.get("/manifest").json()
+    assert root["path"] == "" and root["digest"] == disk_digest(vault)
+    assert [(entry["name"], entry["type"]) for entry in root["entries"]] == [("Notes", "folder"), ("Projects", "folder")]
+
+    notes = client.get("/manifest/Notes").json()
+    assert notes["digest"] == root["entries"][0]["hash"] == disk_digest(vault / "Notes")
+    test1 = next(entry for entry in notes["entries"] if entry["name"] == "test1.md")
+    assert test1 == {"name": "test1.md", "type": "file", "hash": hashlib.sha256(b"# Test File 1").hexdigest()}
+
+    client.put("/files/Notes/test1.md/body", content="Edited")
+    edited = client.get("/manifest").json()
+    assert edited["digest"] == disk_digest(vault) != root["digest"]
+    assert edited["entries"][0]["hash"] != root["entries"][0]["hash"]
+    assert edited["entries"][1] == root["entries"][1]
+
+def test_manifest_hashes_only_changed_notes(client, monkeypatch):
+    vault = Path(os.getenv("OBSIDIAN_API_VAULT_PATH"))
+    hashed = []
+    original_hash_note = index_module.hash_note
+    monkeypatch.setattr(index_module, "hash_note", lambda path: hashed.append(os.path.basename(path)) or original_hash_note(path))
+
+    response = client.get("/manifest/Notes")
+    assert len(hashed) == 4
+    assert client.get("/manifest/Notes", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+    hashed.clear()
+    client.put("/files/Notes/test2.md/body", content="Edited")
+    client.get("/manifest/Projects")
+    assert hashed == ["test2.md"]
+    assert client.get("/manifest/Projects", headers={"If-None-Match": f'"{disk_digest(vault / "Projects")}"'}).status_code == 304
+    assert client.get("/manifest/Notes", headers={"If-None-Match": response.headers["ETag"]}).status_code == 200
+
+def test_manifest_of_missing_folder(client):
+    assert client.get("/manifest/Missing").status_code == 404
+    assert client.get("/manifest/.obsidian").status_code == 404
@@ -0,0 +1,95 @@
+import builtins
+import pytest
+from app import index as index_module
+from app import parse_pool as parse_pool_module
+from app.parse_pool import close_parse_pool, get_parse_pool, parse_notes
+from app.utils import FRONTMATTER_CODECS, FrontmatterCodec, parse_markdown, register_frontmatter_codec
+
+# Module-level, so the codec pickles into the worker processes.
+def load_marked(block):
+    return {"codec": "marked"}
+
+def dump_marked(data):
+    return "codec: marked"
+
+def test_parse_notes_returns_stats_frontmatter_and_body(tmp_path):
+    path = tmp_path / "note.md"
+    content = "\n---\ntitle: Note\ntags: [a, b]\n---\n\n# Body\n"
+    path.write_text(content)
+
+    [note] = parse_notes([str(path), str(tmp_path / "missing.md")])
+    assert note.frontmatter == {"title": "Note", "tags": ["a", "b"]}
+    assert note.body == parse_markdown(content)[0] == "# Body"
+    assert note.stats.st_mtime_ns == path.stat().st_mtime_ns
+
+def test_index_build_parses_in_worker_processes(test_vault, monkeypatch):
+    monkeypatch.setenv("OBSIDIAN_API_VAULT_PATH", test_vault)
+    monkeypatch.setenv("OBSIDIAN_API_PARSE_PROCESSES", "2")
+    monkeypatch.setattr(index_module, "PARSE_BATCH_SIZE", 1)
+    try:
+        index = index_module.VaultIndex(test_vault)
+        index.build()
+    finally:
+        close_parse_pool()
+
+    entries = {entry.metadata["path"]: entry for entry in index.files()}
+    assert set(entries) == {"Notes/test1.md", "Notes/test2.md", "Notes/file_with_frontmatter.md", "Projects/test3.md"}
+    assert entries["Notes/file_with_frontmatter.md"].frontmatter == {"title": "New Note", "tags": ["note", "test"]}
+    assert index.tags.files("note") == ["Notes/file_with_frontmatter.md"]
+    index.close()
+
+def test_index_build_does_not_read_parsed_notes_again(test_vault, monkeypatch):
+    monkeypatch.setenv("OBSIDIAN_API_VAULT_PATH", test_vault)
+    monkeypatch.setenv("OBSIDIAN_API_PARSE_PROCESSES", "2")
+    monkeypatch.setattr(index_module, "PARSE_BATCH_SIZE", 1)
+    index = index_module.VaultIndex(test_vault)
+    opened = []
+    original_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        if str(file).endswith(".md"):
+            opened.append(file)
+        return original_open(file, *args, **kwargs)
+    # Worker processes are spawned, so only the parent's opens are counted.
+    monkeypatch.setattr(builtins, "open", counting_open)
+    try:
+        index.build()
+    finally:
+        close_parse_pool()
+
+    assert opened == []
+    assert index.tags.files("note") == ["Notes/file_with_frontmatter.md"]
+    index.close()
+
+def test_registered_codecs_reach_worker_processes(test_vault, monkeypatch):
+    monkeypatch.setenv("OBSIDIAN_API_VAULT_PATH", test_vault)
+    monkeypatch.setenv("OBSIDIAN_API_PARSE_PROCESSES", "1")
+    monkeypatch.setenv("OBSIDIAN_API_FRONTMATTER_CODEC", "marked")
+    monkeypatch.setattr(index_module, "PARSE_BATCH_SIZE", 1)
+    register_frontmatter_codec(FrontmatterCodec("marked", load_marked, dump_marked))
+    try:
+        index = index_module.VaultIndex(test_vault)
+        index.build()
+    finally:
+        close_parse_pool()
+        del FRONTMATTER_CODECS["marked"]
+
+    entries = {entry.metadata["path"]: entry for entry in index.files()}
+    assert entries["Notes/file_with_frontmatter.md"].frontmatter == {"codec": "marked"}
+    index.close()
+
+def test_unknown_codecs_fail_before_the_pool_starts(monkeypatch):
+    monkeypatch.setenv("OBSIDIAN_API_PARSE_PROCESSES", "1")
+    monkeypatch.setenv("OBSIDIAN_API_FRONTMATTER_CODEC", "missing")
+    with pytest.raises(ValueError, match="Unknown frontmatter codec"):
+        get_parse_pool()
+    close_parse_pool()
+
+def test_closing_the_vault_index_shuts_down_the_parse_pool(client, monkeypatch):
+    monkeypatch.setenv("OBSIDIAN_API_PARSE_PROCESSES", "1")
+    monkeypatch.setattr(index_module, "PARSE_BATCH_SIZE", 1)
+    assert len(client.get("/files").json()) == 4
+    assert parse_pool_module._parse_pool is not None
+
+    index_module.close_vault_index()
+    assert parse_pool_module._parse_pool is None
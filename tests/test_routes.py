@@ -3,6 +3,8 @@ from pathlib import Path
 import pytest
 from datetime import datetime
 import re
+import json
+from app.models import MarkdownFile
 
 # Add at the top of the file
 ISO_TIMESTAMP_PATTERN = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:?\d{2})?$'
@@ -514,6 +516,17 @@ def test_hidden_directories(client):
     response = client.get("/folders/.hidden")
     assert response.status_code == 404
 
+def test_dot_files_can_be_renamed_like_they_are_created(client):
+    # Only dot-folders are hidden: a note may be renamed to a dot-file, as it may be created as one.
+    assert client.post("/files/Notes/.created.md", json={"frontmatter": {}, "body": "# Created"}).status_code == 200
+    response = client.patch("/files/Notes/test1.md/metadata", json={"path": "Notes/.renamed.md"})
+    assert response.status_code == 200
+    assert response.json()["metadata"]["path"] == "Notes/.renamed.md"
+
+    assert client.post("/folders/Notes/Sub").status_code == 200
+    assert client.patch("/folders/Notes/Sub", json={"path": "Notes/.sub"}).status_code == 404
+    assert client.post("/folders/Notes/.sub").status_code == 404
+
 @pytest.mark.parametrize(
     "path,encoded_path", 
     [
@@ -538,4 +551,96 @@ def test_paths_with_spaces(client, path, encoded_path):
     response = client.get(f"/files/{encoded_path}")
     assert response.status_code == 200
     assert response.json()["content"]["body"] == "# Test Content"
-    assert response.json()["metadata"]["type"] == "file"
\ No newline at end of file
+    assert response.json()["metadata"]["type"] == "file"
+
+def test_list_files_pagination(client):
+    response = client.get("/files", params={"limit": 3})
+    assert response.status_code == 200
+    first_page = [f["metadata"]["path"] for f in response.json()]
+    assert first_page == sorted(first_page) and len(first_page) == 3
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/files", params={"limit": 3, "cursor": cursor})
+    assert response.status_code == 200
+    second_page = [f["metadata"]["path"] for f in response.json()]
+    assert len(second_page) == 1
+    assert "X-Next-Cursor" not in response.headers
+    assert set(first_page + second_page) == {"Notes/test1.md", "Notes/test2.md", "Projects/test3.md", "Notes/file_with_frontmatter.md"}
+
+    response = client.get("/files", params={"cursor": "!!not-a-cursor"})
+    assert response.status_code == 400
+
+def test_list_files_ndjson(client):
+    response = client.get("/files", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [f["metadata"]["path"] for f in lines] == sorted(f["metadata"]["path"] for f in lines)
+    assert len(lines) == 4
+    assert any(f["content"]["frontmatter"] == {"title": "New Note", "tags": ["note", "test"]} for f in lines)
+
+def test_field_projection(client, monkeypatch):
+    response = client.get("/files/Notes/file_with_frontmatter.md", params={"fields": "metadata.path,content.frontmatter.tags"})
+    assert response.status_code == 200
+    assert response.json() == {"metadata": {"path": "Notes/file_with_frontmatter.md"}, "content": {"frontmatter": {"tags": ["note", "test"]}}}
+
+    client.get("/files")
+    def fail_read(*args, **kwargs):
+        raise AssertionError("metadata-only listing opened a file")
+    monkeypatch.setattr("app.index.read_text", fail_read)
+
+    response = client.get("/files", params={"fields": "metadata,content.frontmatter"})
+    assert response.status_code == 200
+    files = response.json()
+    assert len(files) == 4
+    assert all(set(f) == {"metadata", "content"} and set(f["content"]) == {"frontmatter"} for f in files)
+
+    response = client.get("/files", params={"fields": "content.title"})
+    assert response.status_code == 400
+
+def test_write_response_is_built_without_rereading(client, monkeypatch):
+    client.get("/files")
+    def fail_read(*args, **kwargs):
+        raise AssertionError("write re-read the file it wrote")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("app.index.read_text", fail_read)
+        response = client.put("/files/Notes/file_with_frontmatter.md/body", content="  Updated body\n")
+        assert response.status_code == 200
+        assert response.json()["content"] == {"frontmatter": {"title": "New Note", "tags": ["note", "test"]}, "body": "Updated body"}
+
+        response = client.patch("/files/Notes/file_with_frontmatter.md/frontmatter", json={"status": "done"})
+        assert response.json()["content"]["frontmatter"] == {"title": "New Note", "tags": ["note", "test"], "status": "done"}
+
+    assert client.get("/files/Notes/file_with_frontmatter.md").json() == response.json()
+
+def test_prefer_return_minimal(client):
+    response = client.put("/files/Notes/test1.md/body", content="Quiet", headers={"Prefer": "return=minimal"})
+    assert response.status_code == 204
+    assert response.content == b""
+    assert response.headers["Preference-Applied"] == "return=minimal"
+    assert response.headers["ETag"] == client.get("/files/Notes/test1.md").headers["ETag"]
+
+    response = client.post("/files/Notes/quiet.md", json={"body": "Quiet"}, headers={"Prefer": "respond-async, return=minimal"})
+    assert response.status_code == 204
+    assert client.get("/files/Notes/quiet.md/body").text == "Quiet"
+
+def test_read_routes_match_response_models(client, test_vault):
+    with open(os.path.join(test_vault, "Notes", "typed.md"), "w") as f:
+        f.write("---\ncreated: 2024-01-02\nreviewed: 2024-01-02 10:30:00\nrating: 4.5\nnested:\n  tags: [a, b]\n1: one\nratio: .nan\nlimit: -.inf\n---\n# Typed")
+
+    def strict_json(text):
+        # Python's json accepts NaN and Infinity, which strict clients reject.
+        return json.loads(text, parse_constant=lambda constant: pytest.fail(f"Invalid JSON constant {constant}"))
+
+    # The fast path skips the models, so check it encodes what they would.
+    listing = strict_json(client.get("/files").text)
+    single_response = client.get("/files/Notes/typed.md")
+    single = strict_json(single_response.text)
+    streamed = [strict_json(line) for line in client.get("/files", headers={"Accept": "application/x-ndjson"}).text.splitlines()]
+    batch = strict_json(client.post("/files/batch:get", json={"paths": ["Notes/typed.md"]}).text)
+    assert single in listing and single in streamed and batch[0]["file"] == single
+    for item in listing:
+        assert json.loads(MarkdownFile.model_validate(item).model_dump_json()) == item
+    assert single_response.content == MarkdownFile.model_validate(single).model_dump_json().encode()
+    assert single["content"]["frontmatter"] == {"created": "2024-01-02", "reviewed": "2024-01-02T10:30:00", "rating": 4.5, "nested": {"tags": ["a", "b"]}, "1": "one", "ratio": None, "limit": None}
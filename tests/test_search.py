@@ -0,0 +1,55 @@
+from app.search import SearchIndex, build_match_query
+
+def test_search_ranks_and_snippets(client):
+    client.post("/files/Notes/gardening.md", json={"frontmatter": {"tags": ["plants"]}, "body": "Tomatoes need full sun and regular watering."})
+    client.post("/files/Notes/cooking.md", json={"body": "Roast the tomatoes with garlic."})
+
+    response = client.get("/search", params={"q": "tomatoes"})
+    assert response.status_code == 200
+    results = response.json()
+    assert {r["path"] for r in results} == {"Notes/gardening.md", "Notes/cooking.md"}
+    assert all("**tomatoes**" in r["snippet"].lower() for r in results)
+
+    assert [r["path"] for r in client.get("/search", params={"q": "plants"}).json()] == ["Notes/gardening.md"]
+    assert [r["path"] for r in client.get("/search", params={"q": "garl*"}).json()] == ["Notes/cooking.md"]
+    assert len(client.get("/search", params={"q": "tomatoes", "limit": 1, "offset": 1}).json()) == 1
+
+def test_search_follows_writes_and_moves(client):
+    client.put("/files/Notes/test1.md/body", content="Quarterly planning notes")
+    assert [r["path"] for r in client.get("/search", params={"q": "quarterly"}).json()] == ["Notes/test1.md"]
+
+    client.patch("/files/Notes/test1.md/metadata", json={"path": "Archive/test1.md"})
+    assert [r["path"] for r in client.get("/search", params={"q": "quarterly"}).json()] == ["Archive/test1.md"]
+
+    client.put("/files/Archive/test1.md/body", content="Nothing to see")
+    assert client.get("/search", params={"q": "quarterly"}).json() == []
+
+def test_search_query_is_not_fts_syntax(client):
+    for query in ['"unbalanced', "status:done", "a AND OR", "NEAR(", "-"]:
+        assert client.get("/search", params={"q": query}).status_code == 200
+    assert build_match_query('say "hi" pre*') == '"say" """hi""" "pre"*'
+
+def test_search_reconciles_persisted_database(tmp_path):
+    database_path = str(tmp_path / "search.sqlite3")
+    vault_path = tmp_path / "vault"
+    vault_path.mkdir()
+    (vault_path / "kept.md").write_text("kept note")
+
+    class Entry:
+        def __init__(self, path, mtime_ns):
+            self.metadata = {"path": path, "name": path}
+            self.frontmatter = None
+            self.mtime_ns = mtime_ns
+            self.size = 9
+
+    index = SearchIndex(str(vault_path), database_path)
+    index.file_updated(Entry("kept.md", 1), "kept note")
+    index.file_updated(Entry("deleted.md", 1), "deleted note")
+    index.close()
+
+    index = SearchIndex(str(vault_path), database_path)
+    index.build_started()
+    index.file_updated(Entry("kept.md", 1), None)
+    index.build_finished({"kept.md"})
+    assert [r["path"] for r in index.search("note")] == ["kept.md"]
+    index.close()
@@ -0,0 +1,55 @@
+import os
+import time
+from fastapi.testclient import TestClient
+from app import index as index_module
+from app.index import VaultIndex, close_vault_index
+from app.main import app
+
+def build_index(vault):
+    index = VaultIndex(vault)
+    index.build()
+    return index
+
+def test_warm_build_restores_snapshot_and_rereads_only_changes(test_vault, tmp_path, monkeypatch):
+    monkeypatch.setenv("OBSIDIAN_API_VAULT_PATH", test_vault)
+    monkeypatch.setenv("OBSIDIAN_API_STATE_PATH", str(tmp_path / "state"))
+    with open(os.path.join(test_vault, "Notes", "test1.md"), "w") as f:
+        f.write("---\ntags: [alpha]\n---\nSee [[test3]]")
+    build_index(test_vault).close()
+
+    with open(os.path.join(test_vault, "Notes", "test2.md"), "w") as f:
+        f.write("Now links [[test1]] #beta")
+    os.remove(os.path.join(test_vault, "Projects", "test3.md"))
+    os.makedirs(os.path.join(test_vault, "Ideas"))
+    with open(os.path.join(test_vault, "Ideas", "new.md"), "w") as f:
+        f.write("# New")
+
+    read = []
+    original_read_text = index_module.read_text
+    monkeypatch.setattr(index_module, "read_text", lambda path: read.append(os.path.relpath(path, test_vault)) or original_read_text(path))
+    index = build_index(test_vault)
+
+    assert sorted(read) == ["Ideas/new.md", "Notes/test2.md"]
+    assert [entry.metadata["path"] for entry in index.files()] == ["Ideas/new.md", "Notes/file_with_frontmatter.md", "Notes/test1.md", "Notes/test2.md"]
+    assert index.folders()[0]["path"] == "Ideas"
+    assert index.tags.files("alpha") == ["Notes/test1.md"]
+    assert index.tags.files("beta") == ["Notes/test2.md"]
+    assert index.links.backlinks("Notes/test1.md") == [{"path": "Notes/test2.md", "target": "test1"}]
+    assert index.links.links("Notes/test1.md") == [{"target": "test3", "path": None}]
+    index.close()
+
+def test_ready_only_once_index_is_loaded(client):
+    close_vault_index()
+    assert client.get("/health/ready").status_code == 503
+    client.get("/files")
+    assert client.get("/health/ready").json() == {"status": "ready"}
+
+def test_lifespan_warms_index(test_vault, monkeypatch):
+    monkeypatch.setenv("OBSIDIAN_API_VAULT_PATH", test_vault)
+    with TestClient(app) as client:
+        # The warm-up task runs while the first request waits for the lifespan.
+        for _ in range(100):
+            if client.get("/health/ready").status_code == 200:
+                break
+            time.sleep(0.05)
+        assert client.get("/health/ready").status_code == 200
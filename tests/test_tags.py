@@ -0,0 +1,48 @@
+from app.tags import parse_tags
+
+def test_tags_count_inline_frontmatter_and_nested(client):
+    # file_with_frontmatter.md already carries the frontmatter tags "note" and "test"
+    client.post("/files/Notes/alpha.md", json={"frontmatter": {"tags": ["Project/Alpha"]}, "body": "Started #todo"})
+    client.post("/files/Projects/beta.md", json={"frontmatter": {"tags": "project/beta, todo"}, "body": "No inline tags"})
+
+    response = client.get("/tags")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"tag": "note", "count": 1},
+        {"tag": "project", "count": 2},
+        {"tag": "project/alpha", "count": 1},
+        {"tag": "project/beta", "count": 1},
+        {"tag": "test", "count": 1},
+        {"tag": "todo", "count": 2}
+    ]
+
+    assert [f["path"] for f in client.get("/tags/project/files").json()] == ["Notes/alpha.md", "Projects/beta.md"]
+    assert [f["path"] for f in client.get("/tags/project/alpha/files").json()] == ["Notes/alpha.md"]
+    assert client.get("/tags/unused/files").json() == []
+
+def test_tagged_files_pagination(client):
+    for name in ["a", "b", "c"]:
+        client.post(f"/files/Notes/{name}.md", json={"body": "#paged"})
+
+    first = client.get("/tags/paged/files", params={"limit": 2})
+    assert [f["path"] for f in first.json()] == ["Notes/a.md", "Notes/b.md"]
+    second = client.get("/tags/paged/files", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [f["path"] for f in second.json()] == ["Notes/c.md"]
+    assert "X-Next-Cursor" not in second.headers
+
+def test_tag_counts_follow_writes(client):
+    client.put("/files/Notes/test1.md/body", content="Now #draft")
+    assert {"tag": "draft", "count": 1} in client.get("/tags").json()
+
+    client.patch("/files/Notes/test1.md/frontmatter", json={"tags": ["draft", "review"]})
+    tags = client.get("/tags").json()
+    assert {"tag": "draft", "count": 1} in tags
+    assert {"tag": "review", "count": 1} in tags
+
+    client.put("/files/Notes/test1.md/body", content="Done")
+    client.put("/files/Notes/test1.md/frontmatter", json={})
+    assert [t["tag"] for t in client.get("/tags").json()] == ["note", "test"]
+
+def test_parse_tags_skips_code_headings_and_numbers():
+    body = "# Heading\n#real and #nested/tag but not `#inline`, #123, issue#4 or\n```\n#fenced\n```"
+    assert parse_tags(body) == {"real", "nested", "nested/tag"}
@@ -0,0 +1,39 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from app.walker import get_walker_pool, iter_tree, walk_tree
+
+def make_tree(root):
+    for folder in ("A/B/C", "A/D", ".git/objects", "A/.trash"):
+        os.makedirs(os.path.join(root, folder))
+    for path in ("top.md", "A/B/C/deep.md", "A/D/note.md", "A/D/image.png", ".git/objects/x.md", "A/.trash/old.md"):
+        with open(os.path.join(root, path), "w") as f:
+            f.write("# Note")
+    return {os.path.join(root, path) for path in ("A", "A/B", "A/B/C", "A/D", "top.md", "A/B/C/deep.md", "A/D/note.md")}
+
+def test_walk_tree_prunes_hidden_folders_and_keeps_stats(tmp_path):
+    expected = make_tree(str(tmp_path))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        entries = list(walk_tree(str(tmp_path), executor))
+
+    assert {entry.path for entry in entries} == expected
+    for entry in entries:
+        assert entry.is_folder == os.path.isdir(entry.path)
+        assert entry.stats.st_mtime_ns == os.stat(entry.path).st_mtime_ns
+
+def test_walks_share_one_walker_pool(tmp_path):
+    expected = make_tree(str(tmp_path))
+    pool = get_walker_pool()
+
+    assert {entry.path for entry in walk_tree(str(tmp_path))} == expected
+    # A walk abandoned early leaves the pool running for the next one.
+    next(walk_tree(str(tmp_path)))
+    assert {entry.path for entry in walk_tree(str(tmp_path))} == expected
+    assert get_walker_pool() is pool
+
+def test_iter_tree_matches_walk_tree(tmp_path):
+    expected = make_tree(str(tmp_path))
+
+    async def main():
+        return {entry.path async for entry in iter_tree(str(tmp_path))}
+    assert asyncio.run(main()) == expected
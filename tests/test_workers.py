@@ -0,0 +1,51 @@
+import asyncio
+import threading
+import time
+from app.workers import LoopLagMonitor, get_worker_limiter, run_in_worker
+
+def test_run_in_worker_uses_dedicated_limiter(monkeypatch):
+    monkeypatch.setenv("OBSIDIAN_API_WORKER_THREADS", "3")
+
+    async def main():
+        loop_thread = threading.get_ident()
+        worker_thread = await run_in_worker(threading.get_ident)
+        return loop_thread, worker_thread, get_worker_limiter().total_tokens
+    loop_thread, worker_thread, total_tokens = asyncio.run(main())
+
+    assert worker_thread != loop_thread
+    assert total_tokens == 3
+
+def test_loop_lag_monitor_records_blocked_loop():
+    monitor = LoopLagMonitor(interval=0.01)
+
+    async def main():
+        monitor.watch(asyncio.get_running_loop())
+        await asyncio.sleep(0.05)
+        time.sleep(0.1)
+        await asyncio.sleep(0.05)
+    asyncio.run(main())
+
+    stats = monitor.stats()
+    assert stats["samples"] > 0
+    assert stats["max_ms"] >= 50
+
+def test_routes_never_use_fastapi_thread_pool(client, monkeypatch):
+    import fastapi.dependencies.utils
+    calls = []
+
+    async def run_in_threadpool(func, *args, **kwargs):
+        calls.append(func.__name__)
+        return func(*args, **kwargs)
+    monkeypatch.setattr(fastapi.dependencies.utils, "run_in_threadpool", run_in_threadpool)
+
+    etag = client.get("/files/Notes/test1.md").headers["ETag"]
+    responses = [
+        client.get("/files", params={"fields": "metadata"}),
+        client.patch("/files/Notes/test1.md/frontmatter", json={"a": 1}, headers={"If-Match": etag, "Prefer": "return=minimal"}),
+        client.post("/files/Inbox/new.md", json={"frontmatter": {}, "body": "Hello"}),
+        client.post("/folders/Archive"),
+        client.patch("/folders/Archive", json={"path": "Old"})
+    ]
+
+    assert [response.status_code for response in responses] == [200, 204, 200, 200, 200]
+    assert calls == []